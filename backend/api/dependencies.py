@@ -3,12 +3,16 @@ Dependency Injection
 FastAPI dependencies for database, services, and configurations.
 """
 
+import asyncio
 import logging
-from typing import Generator, Optional
-from uuid import UUID
+from typing import AsyncGenerator, Generator, Optional
+from uuid import UUID, uuid4
 
+import orjson
 from fastapi import Cookie, Depends, Header, HTTPException, status
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import Session, sessionmaker
 
 from ..db.models import User
@@ -16,7 +20,7 @@ from ..ml.caching import EmbeddingCache
 from ..ml.retrieval import get_index_manager
 from ..ml.search import SearchService
 from .config import APISettings, get_settings
-from .security import verify_token
+from .security import parse_user_id, verify_token
 
 logger = logging.getLogger(__name__)
 
@@ -24,6 +28,25 @@ logger = logging.getLogger(__name__)
 _engine = None
 _SessionLocal = None
 
+# Async database engine and session factory
+_async_engine = None
+_AsyncSessionLocal = None
+
+# Small async engine reserved for health probes
+_probe_engine = None
+
+# Shared search service
+_search_service: Optional[SearchService] = None
+
+# Serializes on-demand FAISS index loads, so concurrent first requests
+# trigger one download/build instead of one each
+_index_load_lock = asyncio.Lock()
+
+
+def _json_serializer(value) -> str:
+    """Encode JSON/JSONB bind values with orjson (non-string keys coerced as in json)."""
+    return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS).decode()
+
 
 def get_db_engine():
     """Get database engine (singleton)."""
@@ -34,7 +57,12 @@ def get_db_engine():
             settings.database_url,
             pool_size=settings.db_pool_size,
             max_overflow=settings.db_max_overflow,
+            pool_recycle=settings.db_pool_recycle,  # Drop connections before server-side timeouts
+            pool_use_lifo=True,  # Reuse warm connections; lets idle overflow ones time out
             pool_pre_ping=True,  # Verify connections before using
+            query_cache_size=1200,  # Compiled SQL cache (default 500)
+            json_serializer=_json_serializer,
+            json_deserializer=orjson.loads,
         )
         logger.info(f"Database engine created: {settings.database_url}")
     return _engine
@@ -54,6 +82,11 @@ def get_db() -> Generator[Session, None, None]:
     """
     Get database session.
 
+    Each request gets its own session from the shared, pooled engine. A
+    thread-local scoped_session is deliberately not used: sync dependencies
+    run on FastAPI's threadpool, so thread scoping would hand one session to
+    unrelated requests that happen to land on the same worker thread.
+
     Use as FastAPI dependency:
         @app.get("/endpoint")
         def endpoint(db: Session = Depends(get_db)):
@@ -67,7 +100,118 @@ def get_db() -> Generator[Session, None, None]:
         db.close()
 
 
-def get_search_service(db: Session = Depends(get_db)) -> SearchService:
+# Port of Supabase's transaction-mode pooler (PgBouncer/Supavisor)
+TRANSACTION_POOLER_PORT = 6543
+
+
+def _asyncpg_options(settings: APISettings):
+    """
+    Build the asyncpg URL and connect_args for the configured database.
+
+    asyncpg keeps a per-connection cache of prepared statements, enlarged
+    by default so the API's hot statements stay prepared. Behind a
+    transaction pooler a connection's server session changes between
+    transactions, so statement caching is disabled and each statement gets
+    a unique name (otherwise: "prepared statement ... does not exist").
+    """
+    url = make_url(settings.database_url).set(drivername="postgresql+asyncpg")
+    cache_size = settings.db_statement_cache_size
+    if cache_size is None:
+        cache_size = 0 if url.port == TRANSACTION_POOLER_PORT else 256
+
+    url = url.update_query_dict({"prepared_statement_cache_size": str(cache_size)})
+    connect_args = {}
+    if cache_size == 0:
+        connect_args = {
+            "statement_cache_size": 0,
+            "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+        }
+    return url, connect_args
+
+
+def get_async_db_engine():
+    """
+    Get async database engine (singleton).
+
+    Uses the same database URL as the sync engine with the asyncpg driver
+    (see _asyncpg_options for prepared statement handling).
+    """
+    global _async_engine
+    if _async_engine is None:
+        settings = get_settings()
+        url, connect_args = _asyncpg_options(settings)
+        _async_engine = create_async_engine(
+            url,
+            connect_args=connect_args,
+            pool_size=settings.db_pool_size,
+            max_overflow=settings.db_max_overflow,
+            pool_recycle=settings.db_pool_recycle,
+            pool_use_lifo=True,
+            pool_pre_ping=True,
+            query_cache_size=1200,
+            json_serializer=_json_serializer,
+            json_deserializer=orjson.loads,
+        )
+        logger.info(f"Async database engine created: {url.render_as_string(hide_password=True)}")
+    return _async_engine
+
+
+def get_probe_db_engine():
+    """
+    Get async database engine for health probes (singleton).
+
+    Kept separate from the request pool and capped at two connections, so
+    frequent readiness/status probes never take connections from API traffic.
+    """
+    global _probe_engine
+    if _probe_engine is None:
+        settings = get_settings()
+        url, connect_args = _asyncpg_options(settings)
+        _probe_engine = create_async_engine(
+            url,
+            connect_args=connect_args,
+            pool_size=2,
+            max_overflow=0,
+            pool_timeout=5,
+            pool_recycle=settings.db_pool_recycle,
+            pool_pre_ping=True,
+        )
+        logger.info("Probe database engine created")
+    return _probe_engine
+
+
+def get_async_session_factory():
+    """Get async database session factory (singleton)."""
+    global _AsyncSessionLocal
+    if _AsyncSessionLocal is None:
+        engine = get_async_db_engine()
+        # expire_on_commit=False: attribute access after commit must not
+        # trigger an implicit (sync) refresh on an async session
+        _AsyncSessionLocal = async_sessionmaker(
+            engine, autoflush=False, expire_on_commit=False
+        )
+        logger.info("Async database session factory created")
+    return _AsyncSessionLocal
+
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Get async database session.
+
+    Queries are awaited, so the event loop keeps serving other requests
+    while waiting on the database.
+
+    Use as FastAPI dependency:
+        @app.get("/endpoint")
+        async def endpoint(db: AsyncSession = Depends(get_async_db)):
+            ...
+    """
+    AsyncSessionLocal = get_async_session_factory()
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+async def get_search_service() -> SearchService:
     """
     Get search service instance.
 
@@ -76,25 +220,37 @@ def get_search_service(db: Session = Depends(get_db)) -> SearchService:
         def search(service: SearchService = Depends(get_search_service)):
             ...
     """
-    settings = get_settings()
-
-    # Create session factory for the service
+    # The service and its search components hold no per-request state, so
+    # one instance is shared by every request
+    global _search_service
     SessionLocal = get_session_factory()
-
-    service = SearchService(db_session_factory=SessionLocal)
-
-    # Ensure FAISS index is loaded
-    try:
-        index_manager = get_index_manager()
-        index_manager.ensure_index_loaded(session=db)
-    except Exception as e:
-        logger.error(f"Failed to load FAISS index: {e}")
-        # Don't fail the request, but log the error
+    if _search_service is None:
+        _search_service = SearchService(db_session_factory=SessionLocal)
+    service = _search_service
+
+    # Ensure FAISS index is loaded. Only the first request has work to do
+    # (GCS download, disk load or DB build), so only then is a session
+    # opened, on a worker thread to keep the blocking load off the loop.
+    index_manager = get_index_manager()
+    if index_manager.index is None:
+
+        def load_index() -> None:
+            with SessionLocal() as db:
+                index_manager.ensure_index_loaded(session=db)
+
+        async with _index_load_lock:
+            # Another request may have loaded it while this one waited
+            if index_manager.index is None:
+                try:
+                    await asyncio.to_thread(load_index)
+                except Exception as e:
+                    logger.error(f"Failed to load FAISS index: {e}")
+                    # Don't fail the request, but log the error
 
     return service
 
 
-def get_embedding_cache() -> EmbeddingCache:
+async def get_embedding_cache() -> EmbeddingCache:
     """
     Get embedding cache instance.
 
@@ -106,7 +262,7 @@ def get_embedding_cache() -> EmbeddingCache:
     return EmbeddingCache()
 
 
-def verify_api_key(
+async def verify_api_key(
     settings: APISettings = Depends(get_settings), x_api_key: Optional[str] = Header(None)
 ) -> bool:
     """
@@ -136,7 +292,7 @@ def verify_api_key(
     return True
 
 
-def get_current_user_id(x_user_id: Optional[str] = Header(None)) -> Optional[int]:
+async def get_current_user_id(x_user_id: Optional[str] = Header(None)) -> Optional[int]:
     """
     Get current user ID from header.
 
@@ -157,7 +313,7 @@ def get_current_user_id(x_user_id: Optional[str] = Header(None)) -> Optional[int
         )
 
 
-def get_request_id(x_request_id: Optional[str] = Header(None)) -> str:
+async def get_request_id(x_request_id: Optional[str] = Header(None)) -> str:
     """
     Get or generate request ID for tracing.
 
@@ -170,21 +326,12 @@ def get_request_id(x_request_id: Optional[str] = Header(None)) -> str:
         return x_request_id
 
     # Generate UUID if not provided
-    import uuid
-
-    return str(uuid.uuid4())
+    return str(uuid4())
 
 
-def get_current_user(
-    access_token: Optional[str] = Cookie(None), db: Session = Depends(get_db)
-) -> User:
+def _authenticated_user_id(access_token: Optional[str]) -> UUID:
     """
-    Get current authenticated user from JWT token in cookie.
-
-    Use as FastAPI dependency to protect routes:
-        @app.get("/endpoint")
-        def endpoint(current_user: User = Depends(get_current_user)):
-            ...
+    Resolve the user ID from a JWT access token cookie.
 
     Raises:
         HTTPException: 401 if not authenticated or token invalid
@@ -213,16 +360,23 @@ def get_current_user(
             detail="Invalid token payload",
         )
 
-    try:
-        user_id = UUID(user_id_str)
-    except ValueError:
+    user_id = parse_user_id(user_id_str)
+    if user_id is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid user ID in token",
         )
 
-    # Get user from database
-    user = db.query(User).filter(User.id == user_id).first()
+    return user_id
+
+
+def _check_user(user: Optional[User]) -> User:
+    """
+    Ensure a token's user exists and is active.
+
+    Raises:
+        HTTPException: 401 if the user is missing, 403 if disabled
+    """
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -238,6 +392,46 @@ def get_current_user(
     return user
 
 
+def get_current_user(
+    access_token: Optional[str] = Cookie(None), db: Session = Depends(get_db)
+) -> User:
+    """
+    Get current authenticated user from JWT token in cookie.
+
+    Use as FastAPI dependency to protect routes:
+        @app.get("/endpoint")
+        def endpoint(current_user: User = Depends(get_current_user)):
+            ...
+
+    Raises:
+        HTTPException: 401 if not authenticated or token invalid
+    """
+    user_id = _authenticated_user_id(access_token)
+
+    # Get user from database
+    user = db.query(User).filter(User.id == user_id).first()
+    return _check_user(user)
+
+
+async def get_current_user_async(
+    access_token: Optional[str] = Cookie(None), db: AsyncSession = Depends(get_async_db)
+) -> User:
+    """
+    Get current authenticated user, loaded on the request's async session.
+
+    Same checks as get_current_user; use it in routes that depend on
+    get_async_db so the user is attached to the same session.
+
+    Raises:
+        HTTPException: 401 if not authenticated or token invalid
+    """
+    user_id = _authenticated_user_id(access_token)
+
+    # Get user from database
+    user = await db.get(User, user_id)
+    return _check_user(user)
+
+
 def get_current_user_optional(
     access_token: Optional[str] = Cookie(None), db: Session = Depends(get_db)
 ) -> Optional[User]:
@@ -259,7 +453,10 @@ def get_current_user_optional(
         if not user_id_str:
             return None
 
-        user_id = UUID(user_id_str)
+        user_id = parse_user_id(user_id_str)
+        if user_id is None:
+            return None
+
         user = db.query(User).filter(User.id == user_id, User.is_active == True).first()
         return user
     except Exception:
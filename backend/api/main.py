@@ -3,12 +3,15 @@ FastAPI Main Application
 Entry point for the GreenThumb ML API.
 """
 
+import asyncio
 import logging
 from contextlib import asynccontextmanager
 
+import anyio
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse
 
 from ..db.session import SessionLocal
 from ..ml.retrieval import get_index_manager
@@ -35,6 +38,12 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+def _load_faiss_index() -> None:
+    """Load the shared FAISS index, building it from the database if needed."""
+    with SessionLocal() as db:
+        get_index_manager().ensure_index_loaded(session=db)
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """
@@ -47,6 +56,9 @@ async def lifespan(app: FastAPI):
 
     settings = get_settings()
 
+    # Size the threadpool shared by sync endpoints and asyncio.to_thread
+    anyio.to_thread.current_default_thread_limiter().total_tokens = settings.threadpool_size
+
     # Pre-load CLIP model to avoid cold start delays on first search
     try:
         from ..ml.model_loader import model_registry
@@ -57,9 +69,16 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         logger.warning(f"Failed to pre-load CLIP model (will load on-demand): {e}")
 
-    # FAISS index will be loaded lazily on first search request
-    # This prevents memory issues during startup and allows the app to start quickly
-    logger.info("GreenThumb ML API started successfully (FAISS index will load on-demand)")
+    # Load the FAISS index before accepting traffic so the first search does not
+    # pay for reading it from disk (or rebuilding it from the database)
+    try:
+        logger.info("Pre-loading FAISS index...")
+        await asyncio.to_thread(_load_faiss_index)
+        logger.info("FAISS index pre-loaded successfully")
+    except Exception as e:
+        logger.warning(f"Failed to pre-load FAISS index (will load on-demand): {e}")
+
+    logger.info("GreenThumb ML API started successfully")
 
     yield
 
@@ -85,6 +104,7 @@ def create_app() -> FastAPI:
         docs_url="/docs",
         redoc_url="/redoc",
         openapi_url="/openapi.json",
+        default_response_class=ORJSONResponse,  # Serialize JSON bodies with orjson
     )
 
     # Set up CORS
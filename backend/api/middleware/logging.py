@@ -30,7 +30,7 @@ class RequestLoggingMiddleware(BaseHTTPMiddleware):
         request_id = request.headers.get("X-Request-ID", "-")
 
         # Start timer
-        start_time = time.time()
+        start_ns = time.perf_counter_ns()
 
         # Log request
         logger.info(
@@ -49,7 +49,7 @@ class RequestLoggingMiddleware(BaseHTTPMiddleware):
             response = await call_next(request)
         except Exception as e:
             # Log exception
-            duration_ms = (time.time() - start_time) * 1000
+            duration_ms = (time.perf_counter_ns() - start_ns) / 1e6
 
             logger.error(
                 f"Request failed",
@@ -65,7 +65,7 @@ class RequestLoggingMiddleware(BaseHTTPMiddleware):
             raise
 
         # Calculate duration
-        duration_ms = (time.time() - start_time) * 1000
+        duration_ms = (time.perf_counter_ns() - start_ns) / 1e6
 
         # Log response
         logger.info(
@@ -112,13 +112,13 @@ class RequestTimingMiddleware(BaseHTTPMiddleware):
     async def dispatch(self, request: Request, call_next: Callable) -> Response:
         """Process request and track timing."""
         # Start timer
-        start_time = time.time()
+        start_ns = time.perf_counter_ns()
 
         # Process request
         response = await call_next(request)
 
         # Calculate duration
-        duration_ms = (time.time() - start_time) * 1000
+        duration_ms = (time.perf_counter_ns() - start_ns) / 1e6
 
         # Record latency
         self.tracker.record(duration_ms)
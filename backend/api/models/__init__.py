@@ -4,7 +4,13 @@ Request/response models for API endpoints.
 """
 
 from .common import ErrorResponse, PaginationParams
-from .feedback import FeedbackRequest, FeedbackResponse, InteractionType
+from .feedback import (
+    BatchFeedbackRequest,
+    BatchFeedbackResponse,
+    FeedbackRequest,
+    FeedbackResponse,
+    InteractionType,
+)
 from .recommend import RecommendationContext, RecommendRequest, RecommendResponse
 from .search import ProductResult, SearchRequest, SearchResponse
 
@@ -19,5 +25,7 @@ __all__ = [
     "RecommendationContext",
     "FeedbackRequest",
     "FeedbackResponse",
+    "BatchFeedbackRequest",
+    "BatchFeedbackResponse",
     "InteractionType",
 ]
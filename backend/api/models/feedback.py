@@ -5,7 +5,7 @@ Pydantic models for feedback endpoint.
 
 from datetime import datetime
 from enum import Enum
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 
 from pydantic import BaseModel, Field
 
@@ -108,13 +108,14 @@ class FeedbackResponse(BaseModel):
 
     # Update status
     embeddings_updated: bool = Field(
-        default=False, description="Whether user embeddings were updated"
+        default=False, description="Whether a user embedding update was queued"
     )
     session_updated: bool = Field(
         default=False, description="Whether session embeddings were updated"
     )
     cache_invalidated: bool = Field(
-        default=False, description="Whether user's cached recommendations were invalidated"
+        default=False,
+        description="Whether invalidation of user's cached recommendations was scheduled",
     )
 
     # Timestamps
@@ -139,6 +140,51 @@ class FeedbackResponse(BaseModel):
         }
 
 
+class BatchFeedbackRequest(BaseModel):
+    """
+    Batch feedback request model.
+
+    Records several interactions in one call (e.g. a page session's events).
+    """
+
+    items: List[FeedbackRequest] = Field(
+        ..., min_length=1, max_length=100, description="Interactions to record"
+    )
+
+
+class BatchFeedbackResponse(BaseModel):
+    """
+    Batch feedback response model.
+
+    Confirmation of batch feedback recording.
+    """
+
+    # Status
+    success: bool = Field(..., description="Whether the batch was recorded successfully")
+    message: str = Field(default="Feedback recorded", description="Status message")
+
+    # Recorded interactions
+    recorded: int = Field(..., description="Number of interactions recorded")
+    interaction_ids: List[str] = Field(
+        default_factory=list, description="Database IDs of recorded interactions (request order)"
+    )
+
+    # Update status
+    embedding_updates_queued: int = Field(
+        default=0, description="Number of users with an embedding update scheduled"
+    )
+    sessions_updated: int = Field(
+        default=0, description="Number of interactions applied to session embeddings"
+    )
+    caches_invalidated: int = Field(
+        default=0, description="Number of users with cache invalidation scheduled"
+    )
+
+    # Timestamps
+    recorded_at: datetime = Field(..., description="When the feedback was recorded")
+    processing_time_ms: float = Field(..., description="Processing time in milliseconds")
+
+
 # Interaction weights for different types (for embedding updates)
 INTERACTION_WEIGHTS = {
     InteractionType.VIEW: 0.1,
@@ -3,13 +3,16 @@ Authentication routes.
 Handles user registration, login, logout, and profile management.
 """
 
+import asyncio
+import hashlib
+import logging
 import os
 from datetime import datetime, timedelta
 from typing import Optional
-from uuid import UUID
 
-from fastapi import APIRouter, Cookie, Depends, HTTPException, Response, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Cookie, Depends, Header, HTTPException, Response, status
+from sqlalchemy import bindparam, select
+from sqlalchemy.orm import Session, load_only
 
 from ...db.models import User
 from ..dependencies import get_db
@@ -26,13 +29,48 @@ from ..security import (
     ACCESS_TOKEN_EXPIRE_MINUTES,
     create_access_token,
     create_refresh_token,
+    dummy_verify_password,
     hash_password,
+    parse_user_id,
     verify_password,
     verify_token,
 )
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter(prefix="/auth", tags=["Authentication"])
 
+# Columns read by UserResponse. Loading only these avoids hydrating the
+# large JSONB preference columns on every auth request.
+USER_RESPONSE_COLUMNS = (
+    User.id,
+    User.email,
+    User.created_at,
+    User.is_active,
+    User.email_verified,
+    User.last_login,
+    User.total_interactions,
+    User.onboarded,
+)
+
+# Auth lookups are built once at import time. With bound parameters the
+# statements are identical on every call, so SQLAlchemy compiles each once
+# and serves it from the engine's compiled cache afterwards.
+EMAIL_EXISTS = select(User.id).where(User.email == bindparam("email")).limit(1)
+USER_BY_EMAIL = (
+    select(User)
+    .options(load_only(*USER_RESPONSE_COLUMNS, User.password_hash))
+    .where(User.email == bindparam("email"))
+)
+USER_BY_ID = (
+    select(User).options(load_only(*USER_RESPONSE_COLUMNS)).where(User.id == bindparam("user_id"))
+)
+USER_WITH_PASSWORD_BY_ID = (
+    select(User)
+    .options(load_only(User.id, User.password_hash))
+    .where(User.id == bindparam("user_id"))
+)
+
 
 # Helper function to get cookie settings based on environment
 def get_cookie_settings() -> dict:
@@ -77,6 +115,40 @@ def build_cookie_header(key: str, value: str, max_age: int, settings: dict) -> s
     return "; ".join(parts)
 
 
+# /auth/me is polled on every page load; let the browser reuse it briefly
+ME_CACHE_CONTROL = "private, max-age=5"
+
+
+def build_user_etag(user: User) -> str:
+    """
+    Build a weak ETag for a user's /auth/me representation.
+
+    Derived from the fields returned in UserResponse (not last_active, which
+    /auth/me itself updates on every call).
+    """
+    fingerprint = "|".join(
+        str(getattr(user, column.key)) for column in USER_RESPONSE_COLUMNS
+    )
+    digest = hashlib.sha1(fingerprint.encode()).hexdigest()[:16]
+    return f'W/"{user.id}-{digest}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Check an If-None-Match header against an ETag.
+
+    The header may be "*" or a comma-separated list of tags; tags are
+    compared weakly (ignoring a W/ prefix), as RFC 9110 requires for
+    If-None-Match.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in if_none_match.split(","))
+
+
 @router.post(
     "/register",
     response_model=TokenResponse,
@@ -97,7 +169,7 @@ async def register(
     Email must be unique.
     """
     # Check if email already exists
-    existing_user = db.query(User).filter(User.email == request.email).first()
+    existing_user = db.execute(EMAIL_EXISTS, {"email": request.email}).first()
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -118,7 +190,7 @@ async def register(
     db.refresh(new_user)
 
     # Automatically log in the user by creating tokens
-    token_data = {"sub": str(new_user.id), "email": new_user.email}
+    token_data = {"sub": new_user.id.hex, "email": new_user.email}
     access_token = create_access_token(token_data)
     refresh_token = create_refresh_token(token_data)
 
@@ -165,8 +237,12 @@ async def login(
     Validates credentials and issues JWT tokens as httpOnly cookies.
     """
     # Find user by email
-    user = db.query(User).filter(User.email == request.email).first()
-    if not user:
+    user = db.execute(USER_BY_EMAIL, {"email": request.email}).scalar_one_or_none()
+    # Unknown and disabled accounts are rejected without a real bcrypt verify.
+    # A fixed-cost dummy verify keeps timing uniform, and both return the same
+    # 401 so the response does not reveal whether the account exists.
+    if not user or not user.is_active:
+        dummy_verify_password()
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
@@ -179,20 +255,13 @@ async def login(
             detail="Incorrect email or password",
         )
 
-    # Check if user is active
-    if not user.is_active:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Account is disabled",
-        )
-
     # Update last login
     user.last_login = datetime.utcnow()
     user.last_active = datetime.utcnow()
     db.commit()
 
     # Create tokens
-    token_data = {"sub": str(user.id), "email": user.email}
+    token_data = {"sub": user.id.hex, "email": user.email}
     access_token = create_access_token(token_data)
     refresh_token = create_refresh_token(token_data)
 
@@ -200,8 +269,6 @@ async def login(
     cookie_settings = get_cookie_settings()
 
     # Debug logging for cookie troubleshooting
-    import logging
-    logger = logging.getLogger(__name__)
     logger.info(f"POST /auth/login - Setting cookies with settings: {cookie_settings}")
 
     # Set access_token cookie with Partitioned attribute
@@ -242,17 +309,18 @@ async def logout(response: Response) -> dict:
     },
 )
 async def get_current_user(
+    response: Response,
     access_token: Optional[str] = Cookie(None),
+    if_none_match: Optional[str] = Header(None),
     db: Session = Depends(get_db),
 ) -> UserResponse:
     """
     Get current authenticated user.
 
-    Requires valid access token in cookie.
+    Requires valid access token in cookie. The response is privately
+    cacheable for a few seconds and carries an ETag, so repeat polls from
+    the frontend can be answered with 304 Not Modified.
     """
-    import logging
-    logger = logging.getLogger(__name__)
-
     # Debug logging for cookie troubleshooting
     logger.info(f"GET /auth/me - Cookie present: {access_token is not None}")
     if access_token:
@@ -281,16 +349,15 @@ async def get_current_user(
             detail="Invalid token payload",
         )
 
-    try:
-        user_id = UUID(user_id_str)
-    except ValueError:
+    user_id = parse_user_id(user_id_str)
+    if user_id is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid user ID in token",
         )
 
     # Get user from database
-    user = db.query(User).filter(User.id == user_id).first()
+    user = db.execute(USER_BY_ID, {"user_id": user_id}).scalar_one_or_none()
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -303,10 +370,17 @@ async def get_current_user(
             detail="Account is disabled",
         )
 
+    # A matching conditional GET is answered before any write
+    etag = build_user_etag(user)
+    cache_headers = {"Cache-Control": ME_CACHE_CONTROL, "ETag": etag}
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=cache_headers)
+
     # Update last active
     user.last_active = datetime.utcnow()
     db.commit()
 
+    response.headers.update(cache_headers)
     return UserResponse.model_validate(user)
 
 
@@ -349,16 +423,15 @@ async def refresh_access_token(
             detail="Invalid token payload",
         )
 
-    try:
-        user_id = UUID(user_id_str)
-    except ValueError:
+    user_id = parse_user_id(user_id_str)
+    if user_id is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid user ID in token",
         )
 
     # Verify user still exists and is active
-    user = db.query(User).filter(User.id == user_id).first()
+    user = db.execute(USER_BY_ID, {"user_id": user_id}).scalar_one_or_none()
     if not user or not user.is_active:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -366,7 +439,7 @@ async def refresh_access_token(
         )
 
     # Create new access token
-    token_data = {"sub": str(user.id), "email": user.email}
+    token_data = {"sub": user.id.hex, "email": user.email}
     new_access_token = create_access_token(token_data)
 
     # Set new access token cookie with Partitioned attribute for cross-origin support
@@ -414,23 +487,36 @@ async def change_password(
             detail="Invalid or expired token",
         )
 
-    user_id = UUID(payload.get("sub"))
-    user = db.query(User).filter(User.id == user_id).first()
+    user_id = parse_user_id(payload.get("sub") or "")
+    if user_id is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid user ID in token",
+        )
+
+    user = db.execute(
+        USER_WITH_PASSWORD_BY_ID, {"user_id": user_id}
+    ).scalar_one_or_none()
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="User not found",
         )
 
-    # Verify current password
-    if not verify_password(request.current_password, user.password_hash):
+    # Verify current password and hash the new one concurrently. The new hash
+    # uses its own salt, so it is simply discarded if verification fails.
+    password_ok, new_password_hash = await asyncio.gather(
+        asyncio.to_thread(verify_password, request.current_password, user.password_hash),
+        asyncio.to_thread(hash_password, request.new_password),
+    )
+    if not password_ok:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Current password is incorrect",
         )
 
     # Update password
-    user.password_hash = hash_password(request.new_password)
+    user.password_hash = new_password_hash
     user.updated_at = datetime.utcnow()
     db.commit()
 
@@ -4,21 +4,123 @@ Provides fallback when search service is unavailable.
 """
 
 import logging
-from typing import List, Optional
+from typing import Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy import desc, func
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy import text
 from sqlalchemy.orm import Session
 
-from ...db.models import Product, UserInteraction
 from ..dependencies import get_db
-from ..models.search import ProductResult
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/v1", tags=["discover"])
 
 
+# ORDER BY clause for each sort option (p.id breaks ties for stable pagination)
+_DISCOVER_ORDER_BY = {
+    "popular": "COUNT(ui.id) DESC, p.ingested_at DESC, p.id",
+    "recent": "p.ingested_at DESC, p.id",
+    "price_low": "p.search_price ASC, p.id",
+    "price_high": "p.search_price DESC, p.id",
+}
+
+# Product filters shared by the page query and the total count
+_DISCOVER_WHERE = """
+    p.is_active = true
+    AND (
+        p.merchant_image_url IS NOT NULL
+        OR p.aw_image_url IS NOT NULL
+        OR p.large_image IS NOT NULL
+    )
+"""
+
+# Builds the whole response body in Postgres. Each row is emitted with the
+# same keys as ProductResult, so the JSON can be returned without going
+# through Pydantic.
+_DISCOVER_QUERY = """
+    SELECT json_build_object(
+        'results', COALESCE(
+            json_agg(
+                json_build_object(
+                    'product_id', page.id::text,
+                    'title', COALESCE(page.product_name, ''),
+                    'description', COALESCE(page.description, ''),
+                    'price', COALESCE(page.search_price, 0)::float8,
+                    'currency', COALESCE(page.currency, 'USD'),
+                    'image_url', COALESCE(
+                        page.merchant_image_url, page.aw_image_url, page.large_image
+                    ),
+                    'merchant_id', page.merchant_id,
+                    'merchant_name', COALESCE(page.merchant_name, ''),
+                    'brand', page.brand_name,
+                    'brand_id', page.brand_id,
+                    'in_stock', COALESCE(page.in_stock, true),
+                    'stock_quantity', page.stock_quantity,
+                    'category_id', page.category_id,
+                    'category_name', COALESCE(page.category_name, ''),
+                    'product_url', COALESCE(page.aw_deep_link, page.merchant_deep_link, ''),
+                    'rrp_price', page.rrp_price::float8,
+                    'colour', page.colour,
+                    'fashion_category', page.fashion_category,
+                    'fashion_size', page.fashion_size,
+                    'quality_score', page.quality_score,
+                    'rating', NULL,
+                    'review_count', NULL,
+                    'similarity', 0.0,
+                    'rank', page.position - 1 - :offset,
+                    'final_score', NULL,
+                    'popularity_score', NULL,
+                    'price_affinity_score', NULL,
+                    'brand_match_score', NULL
+                )
+                ORDER BY page.position
+            ),
+            '[]'::json
+        ),
+        'total', (SELECT COUNT(*) FROM products p WHERE {where}),
+        'offset', CAST(:offset AS integer),
+        'limit', CAST(:limit AS integer),
+        'page', CAST(:page AS integer),
+        'sort_by', CAST(:sort_by AS text)
+    )::text
+    FROM (
+        SELECT
+            p.id,
+            p.product_name,
+            p.description,
+            p.search_price,
+            p.currency,
+            p.merchant_image_url,
+            p.aw_image_url,
+            p.large_image,
+            p.merchant_id,
+            p.merchant_name,
+            p.brand_name,
+            p.brand_id,
+            p.in_stock,
+            p.stock_quantity,
+            p.category_id,
+            p.category_name,
+            p.aw_deep_link,
+            p.merchant_deep_link,
+            p.rrp_price,
+            p.colour,
+            p.fashion_category,
+            p.fashion_size,
+            p.quality_score,
+            ROW_NUMBER() OVER (ORDER BY {order_by}) AS position
+        FROM products p
+        LEFT JOIN user_interactions ui ON ui.product_id = p.id
+        WHERE {where}
+        GROUP BY p.id
+        ORDER BY {order_by}
+        OFFSET :offset
+        LIMIT :limit
+    ) AS page
+"""
+
+
 @router.get("/discover", status_code=status.HTTP_200_OK)
 async def discover_products(
     limit: int = Query(default=20, ge=1, le=100),
@@ -38,77 +140,28 @@ async def discover_products(
     - price_high: Highest price first
     """
     try:
-        # Base query
-        query = db.query(
-            Product,
-            func.coalesce(func.count(UserInteraction.id), 0).label("interaction_count")
-        ).outerjoin(
-            UserInteraction, Product.id == UserInteraction.product_id
-        ).filter(
-            Product.is_active == True  # noqa: E712
-        ).group_by(Product.id)
+        where = _DISCOVER_WHERE
+        params = {
+            "offset": offset,
+            "limit": limit,
+            "page": (offset // limit) + 1 if limit > 0 else 1,
+            "sort_by": sort_by,
+        }
 
         # Price filters
         if min_price is not None:
-            query = query.filter(Product.search_price >= min_price)
+            where += " AND p.search_price >= :min_price"
+            params["min_price"] = min_price
         if max_price is not None:
-            query = query.filter(Product.search_price <= max_price)
+            where += " AND p.search_price <= :max_price"
+            params["max_price"] = max_price
 
-        # Only show products with images
-        query = query.filter(
-            (Product.merchant_image_url != None) |  # noqa: E711
-            (Product.aw_image_url != None) |  # noqa: E711
-            (Product.large_image != None)  # noqa: E711
-        )
+        query = text(_DISCOVER_QUERY.format(where=where, order_by=_DISCOVER_ORDER_BY[sort_by]))
 
-        # Sorting
-        if sort_by == "popular":
-            query = query.order_by(desc("interaction_count"), desc(Product.ingested_at))
-        elif sort_by == "recent":
-            query = query.order_by(desc(Product.ingested_at))
-        elif sort_by == "price_low":
-            query = query.order_by(Product.search_price.asc())
-        elif sort_by == "price_high":
-            query = query.order_by(Product.search_price.desc())
-
-        # Get total count
-        total = query.count()
-
-        # Pagination
-        products_with_counts = query.offset(offset).limit(limit).all()
-
-        # Build response
-        results: List[ProductResult] = []
-        for product, interaction_count in products_with_counts:
-            image_url = product.merchant_image_url or product.aw_image_url or product.large_image
-
-            results.append(ProductResult(
-                product_id=str(product.id),
-                title=product.product_name or "",
-                description=product.description or "",
-                price=float(product.search_price) if product.search_price else 0.0,
-                currency=product.currency or "USD",
-                merchant_name=product.merchant_name or "",
-                merchant_id=product.merchant_id,  # Keep as int, schema expects Optional[int]
-                category_name=product.category_name or "",
-                category_id=product.category_id,  # Keep as int, schema expects Optional[int]
-                brand_name=product.brand_name or "",
-                image_url=image_url,
-                product_url=product.aw_deep_link or product.merchant_deep_link or "",
-                in_stock=product.in_stock if product.in_stock is not None else True,
-                score=0.0,  # No ML score for simple discover
-                similarity=0.0,  # Default similarity for non-ML results
-                rank=len(results),  # Sequential rank based on position
-            ))
-
-        return {
-            "results": results,
-            "total": total,
-            "offset": offset,
-            "limit": limit,
-            "page": (offset // limit) + 1 if limit > 0 else 1,
-            "sort_by": sort_by,
-        }
+        # Postgres returns the serialized response body
+        body = db.execute(query, params).scalar_one()
+
+        return Response(content=body, media_type="application/json")
 
     except Exception as e:
         logger.error(f"Failed to fetch discover products: {e}", exc_info=True)
@@ -1,37 +1,68 @@
 """
 Feedback Endpoint
 POST /feedback - Record user-product interactions for personalization.
+POST /feedback/batch - Record several interactions in one call.
 """
 
+import asyncio
 import logging
 import time
 from datetime import datetime
-from typing import Optional
+from typing import Dict, List, Optional
+from uuid import UUID
 
-from fastapi import APIRouter, Depends, status
-from sqlalchemy.orm import Session
+import numpy as np
+from fastapi import APIRouter, BackgroundTasks, Depends, status
+from sqlalchemy import bindparam, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from ...db.models import Product, User, UserFavorite, UserInteraction
 from ...ml.caching import EmbeddingCache
 from ..config import APISettings, get_settings
-from ..dependencies import get_db, get_embedding_cache, get_request_id
+from ..dependencies import get_async_db, get_embedding_cache, get_request_id
 from ..errors import APIError
 from ..models.feedback import (
     INTERACTION_WEIGHTS,
     SESSION_DECAY,
+    BatchFeedbackRequest,
+    BatchFeedbackResponse,
     FeedbackRequest,
     FeedbackResponse,
     InteractionType,
 )
+from ..services.cache_service import CacheConfig
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/v1", tags=["feedback"])
 
+# Redis mapping of request user ID (external ID or UUID) -> database user ID
+USER_ID_CACHE_PREFIX = "u2i:"
+USER_ID_CACHE_TTL = 3600
+
+# Cached product embeddings read by the session update
+PRODUCT_EMBEDDING_PREFIX = "product_embedding:"
+
+# Plain string values of interaction types (avoids Enum .value lookups)
+INTERACTION_TYPE_VALUES = {it: it.value for it in InteractionType}
+
+# Hot feedback statements are built once at import time. With bound
+# parameters they are identical on every call, so SQLAlchemy compiles each
+# once and asyncpg can reuse the server-side prepared statement.
+USER_IDS_BY_ID = select(User.id).where(User.id.in_(bindparam("user_ids", expanding=True)))
+PRODUCT_BY_ID = select(Product.id).where(Product.id == bindparam("product_id"))
+PRODUCT_IDS_BY_ID = select(Product.id).where(
+    Product.id.in_(bindparam("product_ids", expanding=True))
+)
+INSERT_FAVORITE = insert(UserFavorite.__table__).on_conflict_do_nothing()
+
 
 @router.post("/feedback", response_model=FeedbackResponse, status_code=status.HTTP_200_OK)
 async def record_feedback(
     request: FeedbackRequest,
-    db: Session = Depends(get_db),
+    background_tasks: BackgroundTasks,
+    db: AsyncSession = Depends(get_async_db),
     cache: EmbeddingCache = Depends(get_embedding_cache),
     settings: APISettings = Depends(get_settings),
     request_id: str = Depends(get_request_id),
@@ -43,14 +74,17 @@ async def record_feedback(
     1. Validate request
     2. Store interaction in database
     3. Update session embeddings (if requested)
-    4. Trigger user embedding update (background if requested)
-    5. Invalidate cached recommendations
+    4. Schedule user embedding update (if requested)
+    5. Schedule invalidation of cached recommendations
     6. Return confirmation
 
+    Steps 4 and 5 run as background tasks after the response is sent, so
+    the client only waits for the database write (and session update).
+
     Args:
         request: Feedback request with user_id, product_id, interaction_type
         background_tasks: FastAPI background tasks
-        db: Database session
+        db: Async database session
         cache: Embedding cache
         settings: API settings
         request_id: Request ID for tracing
@@ -58,11 +92,13 @@ async def record_feedback(
     Returns:
         Feedback response with status and update flags
     """
-    start_time = time.time()
+    start_ns = time.perf_counter_ns()
 
     logger.info(
-        f"Feedback: user={request.user_id}, product={request.product_id}, "
-        f"type={request.interaction_type}",
+        "Feedback: user=%s, product=%s, type=%s",
+        request.user_id,
+        request.product_id,
+        INTERACTION_TYPE_VALUES[request.interaction_type],
         extra={"request_id": request_id},
     )
 
@@ -71,58 +107,42 @@ async def record_feedback(
         raise APIError(message="rating field required for interaction_type=rating", status_code=400)
 
     # Step 2: Store interaction in database
-    interaction_id = _store_interaction(request, db)
+    interaction_id = await _store_interaction(request, db, cache)
 
     # Step 3: Update session embeddings
     session_updated = False
     if request.update_session:
-        session_updated = _update_session_embeddings(
+        session_updated = await asyncio.to_thread(
+            _update_session_embeddings,
             user_id=request.user_id,
             product_id=request.product_id,
             interaction_type=request.interaction_type,
             cache=cache,
-            db=db,
         )
 
-    # Step 4: Trigger user embedding update (Celery task)
+    # Step 4: Schedule user embedding update (Celery task)
     embeddings_updated = False
-    task_id = None
     if request.update_embeddings:
-        try:
-            # Dispatch Celery task for async processing
-            from ...tasks.embeddings import update_user_embedding
+        background_tasks.add_task(_dispatch_embedding_updates, [str(request.user_id)], cache)
+        embeddings_updated = True  # Marked as queued
 
-            result = update_user_embedding.delay(
-                user_external_id=str(request.user_id), max_interactions=50
-            )
-            task_id = result.id
-            embeddings_updated = True  # Marked as queued
-
-            logger.debug(f"Dispatched embedding update task {task_id} for user {request.user_id}")
-        except Exception as e:
-            # Redis/Celery not available (e.g., in Cloud Run without Redis)
-            # Continue without background embedding update
-            logger.warning(
-                f"Failed to dispatch embedding update task for user {request.user_id}: {e}. "
-                "Continuing without background update."
-            )
-            embeddings_updated = False
-
-    # Step 5: Invalidate cached recommendations
+    # Step 5: Schedule invalidation of cached recommendations
     cache_invalidated = False
     if settings.enable_cache:
-        cache_invalidated = _invalidate_user_cache(user_id=request.user_id, cache=cache)
+        background_tasks.add_task(_invalidate_user_cache, str(request.user_id), cache)
+        cache_invalidated = True
 
     # Step 6: Build response
-    processing_time_ms = (time.time() - start_time) * 1000
+    processing_time_ms = (time.perf_counter_ns() - start_ns) / 1_000_000
 
-    response = FeedbackResponse(
+    # Every field is set here from validated inputs, so skip re-validation
+    response = FeedbackResponse.model_construct(
         success=True,
         message="Feedback recorded",
         interaction_id=interaction_id,
         user_id=request.user_id,
         product_id=request.product_id,
-        interaction_type=request.interaction_type.value,
+        interaction_type=INTERACTION_TYPE_VALUES[request.interaction_type],
         embeddings_updated=embeddings_updated,
         session_updated=session_updated,
         cache_invalidated=cache_invalidated,
@@ -131,175 +151,470 @@ async def record_feedback(
     )
 
     logger.info(
-        f"Feedback recorded: id={interaction_id}, processing_time={processing_time_ms:.2f}ms",
+        "Feedback recorded: id=%s, processing_time=%.2fms",
+        interaction_id,
+        processing_time_ms,
         extra={"request_id": request_id},
     )
 
     return response
 
 
-def _store_interaction(request: FeedbackRequest, db: Session) -> Optional[str]:
+@router.post(
+    "/feedback/batch", response_model=BatchFeedbackResponse, status_code=status.HTTP_200_OK
+)
+async def record_feedback_batch(
+    request: BatchFeedbackRequest,
+    background_tasks: BackgroundTasks,
+    db: AsyncSession = Depends(get_async_db),
+    cache: EmbeddingCache = Depends(get_embedding_cache),
+    settings: APISettings = Depends(get_settings),
+    request_id: str = Depends(get_request_id),
+) -> BatchFeedbackResponse:
     """
-    Store interaction in database.
+    Record several user-product interactions in one call.
+
+    Same workflow as POST /feedback, but the database work for all items
+    runs in one transaction, and embedding updates and cache invalidation
+    are scheduled once per distinct user (after the response is sent)
+    rather than once per item.
 
     Args:
-        request: Feedback request
-        db: Database session
+        request: Batch of feedback requests
+        background_tasks: FastAPI background tasks
+        db: Async database session
+        cache: Embedding cache
+        settings: API settings
+        request_id: Request ID for tracing
 
     Returns:
-        Interaction ID (UUID as string) or None if storage failed
+        Batch feedback response with per-batch counts
     """
-    try:
-        from uuid import UUID
+    start_ns = time.perf_counter_ns()
+    items = request.items
+
+    logger.info("Batch feedback: items=%d", len(items), extra={"request_id": request_id})
+
+    # Step 1: Validate interaction types have rating if needed
+    for index, item in enumerate(items):
+        if item.interaction_type == InteractionType.RATING and item.rating is None:
+            raise APIError(
+                message="rating field required for interaction_type=rating",
+                details={"index": index},
+                status_code=400,
+            )
+
+    # Step 2: Store all interactions in database
+    interaction_ids = await _store_interactions(items, db, cache)
+
+    # Step 3: Update session embeddings (per item, in order)
+    sessions_updated = 0
+    for item in items:
+        if item.update_session and await asyncio.to_thread(
+            _update_session_embeddings,
+            user_id=item.user_id,
+            product_id=item.product_id,
+            interaction_type=item.interaction_type,
+            cache=cache,
+        ):
+            sessions_updated += 1
+
+    # Step 4: Schedule one user embedding update per distinct user
+    embedding_users = list(
+        dict.fromkeys(str(item.user_id) for item in items if item.update_embeddings)
+    )
+    if embedding_users:
+        background_tasks.add_task(_dispatch_embedding_updates, embedding_users, cache)
+
+    # Step 5: Schedule invalidation of cached recommendations once per distinct user
+    invalidated_users = []
+    if settings.enable_cache:
+        invalidated_users = list(dict.fromkeys(str(item.user_id) for item in items))
+        for user_id in invalidated_users:
+            background_tasks.add_task(_invalidate_user_cache, user_id, cache)
 
-        from sqlalchemy import select
+    # Step 6: Build response
+    processing_time_ms = (time.perf_counter_ns() - start_ns) / 1_000_000
 
-        from ...db.models import Product, User, UserInteraction
+    response = BatchFeedbackResponse.model_construct(
+        success=True,
+        message="Feedback recorded",
+        recorded=len(interaction_ids),
+        interaction_ids=interaction_ids,
+        embedding_updates_queued=len(embedding_users),
+        sessions_updated=sessions_updated,
+        caches_invalidated=len(invalidated_users),
+        recorded_at=datetime.utcnow(),
+        processing_time_ms=processing_time_ms,
+    )
 
-        # Get or create user
-        # Try to parse as UUID first (database ID), fallback to external_id lookup
-        user_id_str = str(request.user_id)
-        user = None
+    logger.info(
+        "Batch feedback recorded: items=%d, processing_time=%.2fms",
+        len(interaction_ids),
+        processing_time_ms,
+        extra={"request_id": request_id},
+    )
 
+    return response
+
+
+async def _resolve_user_ids(user_id_strs: List[str], db: AsyncSession) -> Dict[str, UUID]:
+    """
+    Map request user IDs to database user IDs, creating unknown users.
+
+    UUID-shaped IDs are first looked up as database IDs (SELECT only).
+    Everything else is treated as an external ID and resolved with a single
+    multi-row INSERT ... ON CONFLICT upsert, which returns the ID of each
+    row whether it was inserted or already existed. Placeholder email and
+    password_hash are used for anonymous/external users.
+
+    Must be called inside the caller's transaction.
+
+    Args:
+        user_id_strs: Distinct user IDs from requests (UUID or external ID)
+        db: Async database session
+
+    Returns:
+        Dict mapping each requested ID to the user's database UUID
+    """
+    resolved: Dict[str, UUID] = {}
+
+    uuid_candidates = {}
+    for user_id_str in user_id_strs:
         try:
-            # Try as UUID (database ID)
-            user_uuid = UUID(user_id_str)
-            user = db.execute(
-                select(User).where(User.id == user_uuid)
-            ).scalar_one_or_none()
-
-            if user:
-                logger.debug(f"Found user by database ID: {user_uuid}")
+            uuid_candidates[UUID(user_id_str)] = user_id_str
         except ValueError:
-            # Not a UUID, try external_id lookup
-            user = db.execute(
-                select(User).where(User.external_id == user_id_str)
-            ).scalar_one_or_none()
-
-            if user:
-                logger.debug(f"Found user by external_id: {user_id_str}")
-
-        if user is None:
-            # Create new user with external_id (for external user systems)
-            # Use placeholder email and password_hash for anonymous/external users
-            user = User(
-                external_id=user_id_str,
-                email=f"{user_id_str}@anonymous.knytt.local",  # Placeholder email
-                password_hash="",  # Empty password hash (external auth)
-            )
-            db.add(user)
-            db.flush()  # Get the user ID
-            logger.info(f"Created new user: external_id={user_id_str}, id={user.id}")
+            pass
+
+    if uuid_candidates:
+        rows = await db.execute(USER_IDS_BY_ID, {"user_ids": list(uuid_candidates)})
+        for (found_id,) in rows:
+            resolved[uuid_candidates[found_id]] = found_id
+            logger.debug("Found user by database ID: %s", found_id)
+
+    external_ids = [u for u in user_id_strs if u not in resolved]
+    if external_ids:
+        upsert = insert(User).values(
+            [
+                {
+                    "external_id": external_id,
+                    "email": f"{external_id}@anonymous.knytt.local",
+                    "password_hash": "",
+                }
+                for external_id in external_ids
+            ]
+        )
+        upsert = upsert.on_conflict_do_update(
+            index_elements=[User.external_id],
+            set_={"external_id": upsert.excluded.external_id},
+        ).returning(User.id, User.external_id)
 
-        # Get product by UUID (assume product_id is a UUID string)
-        try:
-            product_uuid = UUID(str(request.product_id))
-            product = db.execute(
-                select(Product).where(Product.id == product_uuid)
-            ).scalar_one_or_none()
+        for user_id, external_id in await db.execute(upsert):
+            resolved[external_id] = user_id
+            logger.debug("Resolved user by external_id: %s -> %s", external_id, user_id)
+
+    return resolved
+
+
+def _get_cached_user_ids(user_id_strs: List[str], cache: EmbeddingCache) -> Dict[str, UUID]:
+    """
+    Look up already-resolved user IDs in Redis with a single MGET.
+
+    Args:
+        user_id_strs: User IDs from requests (UUID or external ID)
+        cache: Embedding cache
+
+    Returns:
+        Dict mapping each cached request ID to the user's database UUID
+    """
+    try:
+        cached = cache.redis.get_many([f"{USER_ID_CACHE_PREFIX}{u}" for u in user_id_strs])
+    except Exception as e:
+        logger.warning(f"User ID cache lookup failed: {e}")
+        return {}
+
+    prefix_len = len(USER_ID_CACHE_PREFIX)
+    return {key[prefix_len:]: user_id for key, user_id in cached.items()}
+
+
+def _cache_user_ids(user_ids: Dict[str, UUID], cache: EmbeddingCache) -> None:
+    """
+    Remember resolved user IDs so later feedback skips the user lookup.
+
+    Only call this after the transaction that resolved (and possibly
+    created) the users has committed.
+
+    Args:
+        user_ids: Dict mapping request IDs to database UUIDs
+        cache: Embedding cache
+    """
+    try:
+        cache.redis.set_many(
+            {f"{USER_ID_CACHE_PREFIX}{u}": user_id for u, user_id in user_ids.items()},
+            ttl=USER_ID_CACHE_TTL,
+        )
+    except Exception as e:
+        logger.warning(f"User ID cache update failed: {e}")
+
+
+async def _store_interaction(
+    request: FeedbackRequest, db: AsyncSession, cache: EmbeddingCache
+) -> Optional[str]:
+    """
+    Store interaction in database.
+
+    User resolution, the interaction insert, the favorite insert (for likes)
+    and the user stats update all run in a single transaction. Returning
+    users are resolved from the Redis user ID cache, skipping the lookup.
 
-            if product is None:
-                logger.warning(f"Product not found: {request.product_id}")
+    Args:
+        request: Feedback request
+        db: Async database session
+        cache: Embedding cache (for the user ID cache)
+
+    Returns:
+        Interaction ID (UUID as string) or None if storage failed
+    """
+    user_id_str = str(request.user_id)
+    resolved_user_ids = {}
+
+    try:
+        cached_user_ids = await asyncio.to_thread(_get_cached_user_ids, [user_id_str], cache)
+
+        async with db.begin():
+            # Resolve (or create) the user, unless already cached
+            user_id = cached_user_ids.get(user_id_str)
+            if user_id is None:
+                resolved_user_ids = await _resolve_user_ids([user_id_str], db)
+                user_id = resolved_user_ids[user_id_str]
+
+            # Get product by UUID (assume product_id is a UUID string)
+            try:
+                product_uuid = UUID(str(request.product_id))
+                product_id = (
+                    await db.execute(PRODUCT_BY_ID, {"product_id": product_uuid})
+                ).scalar_one_or_none()
+
+                if product_id is None:
+                    logger.warning(f"Product not found: {request.product_id}")
+                    raise APIError(
+                        message="Product not found",
+                        details={"product_id": request.product_id},
+                        status_code=404,
+                    )
+            except ValueError:
+                # Not a valid UUID, try looking up by merchant_product_id
+                logger.warning(
+                    f"Invalid product UUID: {request.product_id}, treating as merchant_product_id"
+                )
                 raise APIError(
-                    message="Product not found",
+                    message="Invalid product ID format (expected UUID)",
                     details={"product_id": request.product_id},
-                    status_code=404,
+                    status_code=400,
                 )
-        except ValueError:
-            # Not a valid UUID, try looking up by merchant_product_id
-            logger.warning(
-                f"Invalid product UUID: {request.product_id}, treating as merchant_product_id"
-            )
-            raise APIError(
-                message="Invalid product ID format (expected UUID)",
-                details={"product_id": request.product_id},
-                status_code=400,
+
+            # Create interaction record
+            interaction = UserInteraction(
+                user_id=user_id,
+                product_id=product_id,
+                interaction_type=INTERACTION_TYPE_VALUES[request.interaction_type],
+                rating=request.rating,
+                session_id=request.session_id,
+                context=request.context,
+                query=request.query,
+                position=request.position,
+                interaction_metadata=request.metadata or {},
             )
+            db.add(interaction)
+            await db.flush()  # Insert and fetch the server-generated ID
+
+            # If it's a like interaction, also add to user_favorites
+            if request.interaction_type == InteractionType.LIKE:
+                await db.execute(INSERT_FAVORITE, {"user_id": user_id, "product_id": product_id})
 
-        # Create interaction record
-        interaction = UserInteraction(
-            user_id=user.id,
-            product_id=product.id,
-            interaction_type=request.interaction_type.value,
-            rating=request.rating,
-            session_id=request.session_id,
-            context=request.context,
-            query=request.query,
-            position=request.position,
-            interaction_metadata=request.metadata or {},
+            # User counters and last_active are updated by the
+            # trg_user_interactions_counters trigger (see db/triggers.py)
+
+        await asyncio.to_thread(_cache_user_ids, resolved_user_ids, cache)
+
+        logger.info(
+            "Stored interaction: id=%s, user=%s, product=%s", interaction.id, user_id, product_id
         )
+        return str(interaction.id)
 
-        db.add(interaction)
-        db.commit()
-        db.refresh(interaction)
+    except APIError:
+        await db.rollback()
+        raise
+    except Exception as e:
+        logger.error(f"Failed to store interaction: {e}", exc_info=True)
+        await db.rollback()
+        raise APIError(
+            message="Failed to record feedback", details={"error": str(e)}, status_code=500
+        )
 
-        # If it's a like interaction, also add to user_favorites
-        if request.interaction_type.value == "like":
-            from ...db.models import UserFavorite
 
-            # Check if favorite already exists (upsert logic)
-            existing_favorite = db.execute(
-                select(UserFavorite).where(
-                    UserFavorite.user_id == user.id, UserFavorite.product_id == product.id
+async def _store_interactions(
+    items: List[FeedbackRequest], db: AsyncSession, cache: EmbeddingCache
+) -> List[str]:
+    """
+    Store a batch of interactions in database.
+
+    Users missing from the Redis user ID cache are resolved with one
+    upsert, products are checked with one
+    SELECT, interactions and favorites are inserted with one multi-row
+    INSERT each, and user stats are updated with one executemany UPDATE.
+    Everything runs in a single transaction, so either the whole batch is
+    recorded or none of it is.
+
+    Args:
+        items: Feedback requests
+        db: Async database session
+        cache: Embedding cache (for the user ID cache)
+
+    Returns:
+        Interaction IDs (UUIDs as strings), in item order
+    """
+    user_id_strs = list(dict.fromkeys(str(item.user_id) for item in items))
+    resolved_user_ids = {}
+
+    try:
+        user_ids = await asyncio.to_thread(_get_cached_user_ids, user_id_strs, cache)
+
+        async with db.begin():
+            # Resolve (or create) all users not already cached
+            uncached = [u for u in user_id_strs if u not in user_ids]
+            if uncached:
+                resolved_user_ids = await _resolve_user_ids(uncached, db)
+                user_ids.update(resolved_user_ids)
+
+            # Validate all products with a single query
+            try:
+                product_uuids = [UUID(str(item.product_id)) for item in items]
+            except ValueError:
+                raise APIError(
+                    message="Invalid product ID format (expected UUID)",
+                    details={
+                        "product_ids": [
+                            item.product_id for item in items if not _is_uuid(item.product_id)
+                        ]
+                    },
+                    status_code=400,
+                )
+
+            found = set(
+                (
+                    await db.execute(
+                        PRODUCT_IDS_BY_ID, {"product_ids": list(set(product_uuids))}
+                    )
+                ).scalars()
+            )
+            missing = [str(p) for p in dict.fromkeys(product_uuids) if p not in found]
+            if missing:
+                logger.warning(f"Products not found: {missing}")
+                raise APIError(
+                    message="Product not found",
+                    details={"product_ids": missing},
+                    status_code=404,
+                )
+
+            # Insert all interactions, returning IDs in item order
+            rows = [
+                {
+                    "user_id": user_ids[str(item.user_id)],
+                    "product_id": product_uuid,
+                    "interaction_type": INTERACTION_TYPE_VALUES[item.interaction_type],
+                    "rating": item.rating,
+                    "session_id": item.session_id,
+                    "context": item.context,
+                    "query": item.query,
+                    "position": item.position,
+                    "interaction_metadata": item.metadata or {},
+                }
+                for item, product_uuid in zip(items, product_uuids)
+            ]
+            interaction_ids = (
+                await db.execute(
+                    insert(UserInteraction).returning(
+                        UserInteraction.id, sort_by_parameter_order=True
+                    ),
+                    rows,
                 )
-            ).scalar_one_or_none()
+            ).scalars().all()
 
-            if not existing_favorite:
-                favorite = UserFavorite(user_id=user.id, product_id=product.id)
-                db.add(favorite)
-                db.commit()
-                logger.info(f"Added to favorites: user={user.id}, product={product.id}")
+            # Add likes to user_favorites
+            favorites = [
+                {"user_id": row["user_id"], "product_id": row["product_id"]}
+                for item, row in zip(items, rows)
+                if item.interaction_type == InteractionType.LIKE
+            ]
+            if favorites:
+                await db.execute(INSERT_FAVORITE, favorites)
 
-        # Update user stats
-        user.total_interactions += 1
-        user.last_active = datetime.utcnow()
-        db.commit()
+            # User counters and last_active are updated once per user by the
+            # trg_user_interactions_counters trigger (see db/triggers.py)
+
+        await asyncio.to_thread(_cache_user_ids, resolved_user_ids, cache)
 
         logger.info(
-            f"Stored interaction: id={interaction.id}, user={user.id}, product={product.id}"
+            "Stored %d interactions for %d users",
+            len(interaction_ids),
+            len({row["user_id"] for row in rows}),
         )
-        return str(interaction.id)
+        return [str(interaction_id) for interaction_id in interaction_ids]
 
     except APIError:
-        db.rollback()
+        await db.rollback()
         raise
     except Exception as e:
-        logger.error(f"Failed to store interaction: {e}", exc_info=True)
-        db.rollback()
+        logger.error(f"Failed to store interactions: {e}", exc_info=True)
+        await db.rollback()
         raise APIError(
             message="Failed to record feedback", details={"error": str(e)}, status_code=500
         )
 
 
+def _is_uuid(value: str) -> bool:
+    """Check whether a string parses as a UUID."""
+    try:
+        UUID(str(value))
+        return True
+    except ValueError:
+        return False
+
+
 def _update_session_embeddings(
     user_id: int,
     product_id: int,
     interaction_type: InteractionType,
     cache: EmbeddingCache,
-    db: Session,
 ) -> bool:
     """
     Update user's session embeddings with new interaction.
 
     Uses exponential moving average to blend current session with new interaction.
+    The current session embedding and the cached product embedding are read
+    with a single MGET. The blend runs in float32 on the dequantized session;
+    the cache requantizes it on write.
 
     Args:
         user_id: User ID
         product_id: Product ID
         interaction_type: Type of interaction
         cache: Embedding cache
-        db: Database session
 
     Returns:
         True if updated, False otherwise
     """
     try:
-        # Get current session embedding
-        user_embeddings = cache.get_user_embeddings(user_id)
-        current_session = user_embeddings.get("session")
+        # Get current session and product embeddings in one round trip
+        session_key = f"{cache.USER_SESSION_PREFIX}{user_id}"
+        product_key = f"{PRODUCT_EMBEDDING_PREFIX}{product_id}"
+        cached = cache.redis.get_many([session_key, product_key])
+        current_session = cache.decode_session_embedding(cached.get(session_key))
 
-        # Get product embedding
-        product_embedding = _get_product_embedding(product_id, cache, db)
+        product_embedding = cached.get(product_key)
+        if product_embedding is None:
+            product_embedding = _get_product_embedding(product_id, cache)
         if product_embedding is None:
             logger.warning(f"Product embedding not found for product {product_id}")
             return False
@@ -307,21 +622,23 @@ def _update_session_embeddings(
         # Get interaction weight
         weight = INTERACTION_WEIGHTS.get(interaction_type, 0.3)
 
-        # Blend with current session (if exists)
+        # Blend into a single float32 buffer, updated in place
+        product_embedding = np.asarray(product_embedding, dtype=np.float32)
+        updated_session = np.empty_like(product_embedding)
+
         if current_session is not None:
             # Exponential moving average: new = alpha * new + (1-alpha) * old
             alpha = 0.3  # Weight for new interaction
-            updated_session = alpha * (weight * product_embedding) + (1 - alpha) * current_session
+            np.multiply(product_embedding, alpha * weight, out=updated_session)
+            updated_session += (1 - alpha) * np.asarray(current_session, dtype=np.float32)
         else:
             # First interaction in session
-            updated_session = weight * product_embedding
+            np.multiply(product_embedding, weight, out=updated_session)
 
         # Normalize
-        import numpy as np
-
         norm = np.linalg.norm(updated_session)
         if norm > 0:
-            updated_session = updated_session / norm
+            updated_session /= norm
 
         # Update cache
         decay_minutes = SESSION_DECAY.get(interaction_type, 10)
@@ -332,7 +649,7 @@ def _update_session_embeddings(
         )
 
         if success:
-            logger.debug(f"Updated session embeddings for user {user_id}")
+            logger.debug("Updated session embeddings for user %s", user_id)
 
         return success
 
@@ -341,14 +658,66 @@ def _update_session_embeddings(
         return False
 
 
-def _invalidate_user_cache(user_id: int, cache: EmbeddingCache) -> bool:
+def _dispatch_embedding_updates(user_ids: List[str], cache: EmbeddingCache) -> int:
+    """
+    Queue long-term embedding update tasks, at most one pending per user.
+
+    Users that already have an update pending are skipped; that update will
+    read their new interactions. Runs as a background task, so failures are
+    only logged.
+
+    Args:
+        user_ids: Distinct user IDs (as sent in the feedback)
+        cache: Embedding cache (holds the per-user pending-update claims)
+
+    Returns:
+        Number of tasks dispatched
+    """
+    claimed = [user_id for user_id in user_ids if cache.claim_user_embedding_update(user_id)]
+    if not claimed:
+        return 0
+
+    try:
+        from celery import group
+
+        from ...tasks.embeddings import update_user_embedding
+
+        if len(claimed) == 1:
+            update_user_embedding.delay(user_external_id=claimed[0], max_interactions=50)
+        else:
+            group(
+                update_user_embedding.s(user_external_id=user_id, max_interactions=50)
+                for user_id in claimed
+            ).apply_async()
+
+        logger.debug("Dispatched embedding update tasks for %d users", len(claimed))
+        return len(claimed)
+
+    except Exception as e:
+        # Redis/Celery not available (e.g., in Cloud Run without Redis)
+        # Continue without background embedding update
+        logger.warning(
+            f"Failed to dispatch embedding update tasks for users {claimed}: {e}. "
+            "Continuing without background update."
+        )
+        for user_id in claimed:
+            cache.release_user_embedding_update(user_id)
+        return 0
+
+
+def _invalidate_user_cache(user_id: str, cache: EmbeddingCache) -> bool:
     """
     Invalidate cached recommendations and search results for user.
 
     Deletes:
     - All cached recommendation results for this user
     - All cached search results for this user
-    - User embedding caches (will be refreshed on next request)
+    - User long-term embedding cache (will be refreshed on next request)
+    - Cached user stats and favorites
+
+    The session embedding is kept: it was just updated by this feedback.
+    Result keys are found through the per-user set indexes maintained by
+    the cache service, so no keyspace SCAN is needed.
 
     Args:
         user_id: User ID
@@ -358,60 +727,19 @@ def _invalidate_user_cache(user_id: int, cache: EmbeddingCache) -> bool:
         True if invalidated, False otherwise
     """
     try:
-        keys_deleted = 0
-
-        # Pattern 1: Recommendations containing this user_id
-        # Cache keys follow pattern: recommend:{hash} where hash contains user:{user_id}
-        pattern = f"recommend:*user:{user_id}*"
-
-        try:
-            cursor = 0
-            while True:
-                cursor, keys = cache.redis.connection.scan(cursor, match=pattern, count=100)
-                if keys:
-                    cache.redis.connection.delete(*keys)
-                    keys_deleted += len(keys)
-                if cursor == 0:
-                    break
-        except Exception as e:
-            logger.warning(f"Failed to delete recommendation cache keys: {e}")
-
-        # Pattern 2: Search results containing this user_id
-        pattern = f"search:*user:{user_id}*"
-
-        try:
-            cursor = 0
-            while True:
-                cursor, keys = cache.redis.connection.scan(cursor, match=pattern, count=100)
-                if keys:
-                    cache.redis.connection.delete(*keys)
-                    keys_deleted += len(keys)
-                if cursor == 0:
-                    break
-        except Exception as e:
-            logger.warning(f"Failed to delete search cache keys: {e}")
-
-        # Pattern 3: User embedding caches
-        # These will be refreshed when the embedding update task completes
-        # But we can delete them now to force fresh lookup
-        user_id_str = str(user_id)
-        embedding_keys = [
-            f"user_embeddings:{user_id_str}",
-            f"user_long_term:{user_id_str}",
-            f"user_session:{user_id_str}",
+        index_keys = [
+            f"{CacheConfig.RECOMMEND_INDEX_PREFIX}{user_id}",
+            f"{CacheConfig.SEARCH_INDEX_PREFIX}{user_id}",
+        ]
+        user_keys = [
+            f"{cache.USER_LONG_TERM_PREFIX}{user_id}",
+            f"{CacheConfig.USER_STATS_PREFIX}{user_id}",
+            f"{CacheConfig.USER_FAVORITES_PREFIX}{user_id}",
         ]
 
-        try:
-            for key in embedding_keys:
-                try:
-                    cache.redis.delete(key)
-                    keys_deleted += 1
-                except Exception as e:
-                    logger.warning(f"Failed to delete embedding key {key}: {e}")
-        except Exception as e:
-            logger.warning(f"Failed to delete user embedding keys: {e}")
-
-        logger.debug(f"Invalidated {keys_deleted} cache keys for user {user_id}")
+        keys_deleted = cache.redis.unlink_indexed(index_keys, keys=user_keys)
+
+        logger.debug("Invalidated %d cache keys for user %s", keys_deleted, user_id)
         return True
 
     except Exception as e:
@@ -419,25 +747,22 @@ def _invalidate_user_cache(user_id: int, cache: EmbeddingCache) -> bool:
         return False
 
 
-def _get_product_embedding(product_id: int, cache: EmbeddingCache, db: Session) -> Optional[any]:
+def _get_product_embedding(product_id: int, cache: EmbeddingCache) -> Optional[any]:
     """
-    Get product embedding from cache or database.
+    Get product embedding on a cache miss (from FAISS index or database).
+
+    Runs on a worker thread (via _update_session_embeddings), so it must not
+    use the request's AsyncSession; a database lookup needs its own sync
+    session.
 
     Args:
         product_id: Product ID
         cache: Embedding cache
-        db: Database session
 
     Returns:
         Product embedding vector or None
     """
     try:
-        # Try cache first
-        cache_key = f"product_embedding:{product_id}"
-        cached = cache.redis.get(cache_key)
-        if cached is not None:
-            return cached
-
         # TODO: Fetch from FAISS index or database
         # For now, return None
         logger.warning(f"Product embedding lookup not implemented for product {product_id}")
@@ -3,17 +3,19 @@ Health Check Endpoints
 Endpoints for health checks and status monitoring.
 """
 
+import asyncio
 import logging
+import time
 from datetime import datetime
-from typing import Any, Dict
+from typing import Any, Dict, Optional, Tuple
 
 from fastapi import APIRouter, Depends, status
-from sqlalchemy.orm import Session
+from sqlalchemy import text
 
 from ...ml.caching import EmbeddingCache
 from ...ml.retrieval import get_index_manager
 from ..config import APISettings, get_settings
-from ..dependencies import get_db, get_embedding_cache
+from ..dependencies import get_embedding_cache, get_probe_db_engine
 from ..middleware.timing import get_latency_tracker
 from ..services.cache_service import get_cache_service
 from ..services.performance_monitor import get_performance_monitor
@@ -22,6 +24,44 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter(tags=["health"])
 
+# Database verdict shared by /status calls across workers
+DB_HEALTH_CACHE_KEY = "health:db"
+DB_HEALTH_CACHE_TTL = 5
+
+# FAISS and latency stats are memoized per process for a short TTL, so
+# probe traffic costs at most one collection per second
+STATS_CACHE_TTL_SECONDS = 1.0
+_index_stats_cache: Tuple[float, Dict[str, Any]] = (0.0, {})
+_latency_stats_cache: Tuple[float, Dict[str, Any]] = (0.0, {})
+
+
+def _get_index_stats() -> Dict[str, Any]:
+    """FAISS index stats, recomputed at most once per STATS_CACHE_TTL_SECONDS."""
+    global _index_stats_cache
+    now = time.monotonic()
+    expires_at, stats = _index_stats_cache
+    if now >= expires_at:
+        stats = get_index_manager().get_stats()
+        _index_stats_cache = (now + STATS_CACHE_TTL_SECONDS, stats)
+    return stats
+
+
+def _get_latency_stats() -> Dict[str, Any]:
+    """Latency tracker stats, recomputed at most once per STATS_CACHE_TTL_SECONDS."""
+    global _latency_stats_cache
+    now = time.monotonic()
+    expires_at, stats = _latency_stats_cache
+    if now >= expires_at:
+        stats = get_latency_tracker().get_stats()
+        _latency_stats_cache = (now + STATS_CACHE_TTL_SECONDS, stats)
+    return stats
+
+
+async def _check_database() -> None:
+    """Run SELECT 1 on the probe engine (raises if the database is unreachable)."""
+    async with get_probe_db_engine().connect() as conn:
+        await conn.execute(text("SELECT 1"))
+
 
 @router.get("/health", status_code=status.HTTP_200_OK)
 async def health_check() -> Dict[str, str]:
@@ -34,79 +74,60 @@ async def health_check() -> Dict[str, str]:
     return {"status": "healthy", "timestamp": datetime.utcnow().isoformat()}
 
 
-@router.get("/status", status_code=status.HTTP_200_OK)
-async def status_check(
-    settings: APISettings = Depends(get_settings),
-    db: Session = Depends(get_db),
-    cache: EmbeddingCache = Depends(get_embedding_cache),
-) -> Dict[str, Any]:
-    """
-    Detailed status check.
-
-    Checks status of:
-    - Database connection
-    - Redis connection
-    - FAISS index
-    - Performance metrics
-
-    Returns:
-        Detailed status information
-    """
-    status_info = {
-        "status": "healthy",
-        "timestamp": datetime.utcnow().isoformat(),
-        "version": settings.version,
-        "components": {},
-    }
+async def _database_status(settings: APISettings, cache: EmbeddingCache) -> Dict[str, Any]:
+    """Database component status (reuses a recent verdict if one is cached)."""
+    database_status = await asyncio.to_thread(cache.redis.get, DB_HEALTH_CACHE_KEY)
+    if database_status is not None:
+        return database_status
 
-    # Check database
     try:
-        db.execute("SELECT 1")
-        status_info["components"]["database"] = {
+        await _check_database()
+        database_status = {
             "status": "healthy",
             "url": settings.database_url.split("@")[-1],  # Hide credentials
         }
     except Exception as e:
         logger.error(f"Database health check failed: {e}")
-        status_info["components"]["database"] = {"status": "unhealthy", "error": str(e)}
-        status_info["status"] = "degraded"
+        database_status = {"status": "unhealthy", "error": str(e)}
 
-    # Check Redis
+    await asyncio.to_thread(
+        cache.redis.set, DB_HEALTH_CACHE_KEY, database_status, ttl=DB_HEALTH_CACHE_TTL
+    )
+    return database_status
+
+
+def _redis_status(cache: EmbeddingCache) -> Dict[str, Any]:
+    """Redis component status."""
     try:
         redis_healthy = cache.redis.ping()
-        status_info["components"]["redis"] = {"status": "healthy" if redis_healthy else "unhealthy"}
-        if not redis_healthy:
-            status_info["status"] = "degraded"
+        return {"status": "healthy" if redis_healthy else "unhealthy"}
     except Exception as e:
         logger.error(f"Redis health check failed: {e}")
-        status_info["components"]["redis"] = {"status": "unhealthy", "error": str(e)}
-        status_info["status"] = "degraded"
+        return {"status": "unhealthy", "error": str(e)}
+
 
-    # Check FAISS index
+def _faiss_status() -> Dict[str, Any]:
+    """FAISS index component status."""
     try:
-        index_manager = get_index_manager()
-        index_stats = index_manager.get_stats()
+        index_stats = _get_index_stats()
 
-        status_info["components"]["faiss_index"] = {
+        return {
             "status": index_stats.get("status", "unknown"),
             "num_vectors": index_stats.get("num_vectors", 0),
             "index_type": index_stats.get("index_type", "unknown"),
         }
 
-        if index_stats.get("status") != "loaded":
-            status_info["status"] = "degraded"
-
     except Exception as e:
         logger.error(f"FAISS index health check failed: {e}")
-        status_info["components"]["faiss_index"] = {"status": "unhealthy", "error": str(e)}
-        status_info["status"] = "degraded"
+        return {"status": "unhealthy", "error": str(e)}
 
-    # Get performance metrics
+
+def _performance_status(settings: APISettings) -> Dict[str, Any]:
+    """Latency summary from the in-memory tracker."""
     try:
-        tracker = get_latency_tracker()
-        latency_stats = tracker.get_stats()
+        latency_stats = _get_latency_stats()
 
-        status_info["performance"] = {
+        return {
             "request_count": latency_stats["count"],
             "latency_p50_ms": round(latency_stats["p50"], 2),
             "latency_p95_ms": round(latency_stats["p95"], 2),
@@ -117,12 +138,14 @@ async def status_check(
 
     except Exception as e:
         logger.error(f"Performance metrics check failed: {e}")
-        status_info["performance"] = {"error": str(e)}
+        return {"error": str(e)}
+
 
-    # Get cache statistics
+def _cache_status(cache: EmbeddingCache) -> Optional[Dict[str, Any]]:
+    """Cache statistics, or None if they could not be read."""
     try:
         cache_stats = cache.get_cache_stats()
-        status_info["cache"] = {
+        return {
             "cached_products": cache_stats.get("cached_products", 0),
             "cached_users": cache_stats.get("cached_user_long_term", 0)
             + cache_stats.get("cached_user_session", 0),
@@ -130,6 +153,57 @@ async def status_check(
         }
     except Exception as e:
         logger.error(f"Cache stats check failed: {e}")
+        return None
+
+
+@router.get("/status", status_code=status.HTTP_200_OK)
+async def status_check(
+    settings: APISettings = Depends(get_settings),
+    cache: EmbeddingCache = Depends(get_embedding_cache),
+) -> Dict[str, Any]:
+    """
+    Detailed status check.
+
+    Checks status of:
+    - Database connection (verdict cached in Redis for a few seconds)
+    - Redis connection
+    - FAISS index
+    - Performance metrics
+
+    The checks run concurrently (blocking ones in worker threads), so the
+    endpoint takes as long as the slowest check rather than their sum.
+
+    Returns:
+        Detailed status information
+    """
+    database, redis_status, faiss_index, cache_info = await asyncio.gather(
+        _database_status(settings, cache),
+        asyncio.to_thread(_redis_status, cache),
+        asyncio.to_thread(_faiss_status),
+        asyncio.to_thread(_cache_status, cache),
+    )
+
+    status_info = {
+        "status": "healthy",
+        "timestamp": datetime.utcnow().isoformat(),
+        "version": settings.version,
+        "components": {
+            "database": database,
+            "redis": redis_status,
+            "faiss_index": faiss_index,
+        },
+        "performance": _performance_status(settings),
+    }
+
+    if (
+        database["status"] != "healthy"
+        or redis_status["status"] != "healthy"
+        or faiss_index["status"] != "loaded"
+    ):
+        status_info["status"] = "degraded"
+
+    if cache_info is not None:
+        status_info["cache"] = cache_info
 
     return status_info
 
@@ -216,11 +290,12 @@ async def get_slow_queries(limit: int = 100) -> Dict[str, Any]:
 
 
 @router.get("/ready", status_code=status.HTTP_200_OK)
-async def readiness_check(db: Session = Depends(get_db)) -> Dict[str, str]:
+async def readiness_check() -> Dict[str, str]:
     """
     Kubernetes readiness probe.
 
-    Checks if the service is ready to accept traffic.
+    Checks if the service is ready to accept traffic. The database check
+    runs on the dedicated probe engine, not the request pool.
 
     Returns:
         Readiness status
@@ -228,7 +303,7 @@ async def readiness_check(db: Session = Depends(get_db)) -> Dict[str, str]:
     # Check critical dependencies
     try:
         # Check database
-        db.execute("SELECT 1")
+        await _check_database()
 
         # Check FAISS index
         index_manager = get_index_manager()
@@ -3,20 +3,32 @@ Onboarding routes.
 Handles user onboarding including style quiz and preference setup.
 """
 
+import asyncio
 import logging
+import time
 from datetime import datetime
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Tuple
+from uuid import UUID
 
 import numpy as np
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy import desc, func
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status
+from sqlalchemy import and_, any_, bindparam, case, desc, func, insert, select, update
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.dialects.postgresql import UUID as PGUUID
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import load_only
 
 from ...db.models import Product, ProductEmbedding, User, UserEmbedding, UserInteraction
 from ...ml.caching import EmbeddingCache
 from ...ml.user_modeling.cold_start import ColdStartEmbedding
 from ...ml.user_modeling.embedding_builder import UserEmbeddingBuilder
-from ..dependencies import get_current_user, get_db, get_embedding_cache
+from ..config import APISettings, get_settings
+from ..dependencies import (
+    get_async_db,
+    get_current_user_async,
+    get_embedding_cache,
+    get_session_factory,
+)
 from ..schemas.onboarding import (
     OnboardingCompleteRequest,
     OnboardingCompleteResponse,
@@ -30,97 +42,240 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/onboarding", tags=["Onboarding"])
 
+# Moodboard products are the same for every user and change slowly, so
+# responses are shared across workers through Redis
+ONBOARDING_PRODUCTS_CACHE_PREFIX = "onboarding:products:"
+ONBOARDING_PRODUCTS_CACHE_TTL = 300  # 5 minutes
+
+# Only the columns OnboardingProduct needs are loaded for moodboard rows;
+# descriptions and other long text stay in the database
+MOODBOARD_PRODUCT_COLUMNS = load_only(
+    Product.id,
+    Product.product_name,
+    Product.merchant_image_url,
+    Product.aw_image_url,
+    Product.large_image,
+    Product.search_price,
+    Product.brand_name,
+    Product.category_name,
+)
+
+# Selected products are validated and their text embeddings fetched in one
+# round trip. The ids are bound as a single uuid[] (= ANY), so asyncpg
+# reuses one prepared statement whatever the selection size, instead of
+# preparing a new IN ($1, ..., $n) for every n.
+PRODUCT_EMBEDDINGS_BY_IDS = (
+    select(Product.id, ProductEmbedding.embedding_vector, ProductEmbedding.embedding)
+    .outerjoin(
+        ProductEmbedding,
+        and_(
+            ProductEmbedding.product_id == Product.id,
+            ProductEmbedding.embedding_type == "text",
+        ),
+    )
+    .where(Product.id == any_(bindparam("ids", type_=ARRAY(PGUUID(as_uuid=True)))))
+)
+
+# Onboarding writes go through Core statements, bypassing ORM dirty tracking
+INSERT_INTERACTIONS = insert(UserInteraction.__table__)
+
+# Categories only change when products are ingested, so the list used for
+# diverse moodboards is memoized per process instead of scanned per request
+CATEGORIES_CACHE_TTL_SECONDS = 600.0
+_categories_cache: Tuple[float, Tuple[str, ...]] = (0.0, ())
+
+
+async def _get_categories(db: AsyncSession) -> Tuple[str, ...]:
+    """Moodboard categories, re-queried at most once per CATEGORIES_CACHE_TTL_SECONDS."""
+    global _categories_cache
+    now = time.monotonic()
+    expires_at, categories = _categories_cache
+    if now >= expires_at:
+        categories = tuple(
+            (
+                await db.execute(
+                    select(Product.category_name)
+                    .where(Product.category_name.isnot(None))
+                    .distinct()
+                    .limit(10)
+                )
+            ).scalars()
+        )
+        _categories_cache = (now + CATEGORIES_CACHE_TTL_SECONDS, categories)
+    return categories
+
+
+def clear_categories_cache() -> None:
+    """Drop the memoized category list (call after a product ingestion)."""
+    global _categories_cache
+    _categories_cache = (0.0, ())
+
+
+def _popular_products(*columns):
+    """
+    Build the popularity aggregation over moodboard-eligible products.
+
+    Selects the given columns from active products with at least one image,
+    outer-joined to their interactions and grouped per product.
+    """
+    return (
+        select(*columns)
+        .outerjoin(UserInteraction, Product.id == UserInteraction.product_id)
+        .where(Product.is_active == True)
+        # Skip in_stock check for now since no products are marked as in_stock in test data
+        # .where(Product.in_stock == True)
+        .where(
+            (Product.merchant_image_url.isnot(None))
+            | (Product.aw_image_url.isnot(None))
+            | (Product.large_image.isnot(None))
+        )  # Must have at least one image for moodboard
+        .group_by(Product.id)
+    )
+
+
+def _save_onboarding_embedding(
+    user_id: UUID, embedding: np.ndarray, metadata: Dict[str, Any], cache: EmbeddingCache
+) -> None:
+    """
+    Persist the cold-start embedding after the response has been sent.
+
+    Runs as a background task, so it opens its own session rather than
+    reusing the request-scoped one. If the embedding cannot be saved, the
+    user is marked as not onboarded again so onboarding can be re-run
+    (without an embedding, recommendations would 404 indefinitely).
+    """
+    db = get_session_factory()()
+    try:
+        try:
+            saved = UserEmbeddingBuilder(db, cache).save_user_embedding(
+                user_id=user_id,
+                embedding=embedding,
+                embedding_type="long_term",  # Initialize as long-term profile
+                metadata=metadata,
+            )
+        except Exception as e:
+            logger.error(f"Error saving onboarding embedding for user {user_id}: {e}")
+            db.rollback()
+            saved = False
+
+        if not saved:
+            logger.error(f"Failed to save onboarding embedding for user {user_id}")
+            db.execute(
+                update(User.__table__)
+                .where(User.__table__.c.id == user_id)
+                .values(onboarded=False)
+            )
+            db.commit()
+    finally:
+        db.close()
+
 
 @router.get("/products", response_model=OnboardingProductsResponse)
 async def get_onboarding_products(
     request: OnboardingProductsRequest = OnboardingProductsRequest(),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
+    cache: EmbeddingCache = Depends(get_embedding_cache),
+    settings: APISettings = Depends(get_settings),
 ) -> OnboardingProductsResponse:
     """
     Get popular/trending products for onboarding moodboard.
 
     Returns diverse, popular products that new users can select from
-    to indicate their style preferences.
+    to indicate their style preferences. Results are cached per
+    (limit, diverse) for a few minutes.
     """
+    cache_key = f"{ONBOARDING_PRODUCTS_CACHE_PREFIX}{request.limit}:{int(request.diverse)}"
+    if settings.enable_cache:
+        cached = await asyncio.to_thread(cache.redis.get, cache_key)
+        if cached is not None:
+            return OnboardingProductsResponse.model_validate(cached)
+
     try:
         # Query for popular products
         # Get products with the most interactions in the last 30 days
+        interaction_count = func.count(UserInteraction.id)
         popular_products_query = (
-            db.query(Product, func.count(UserInteraction.id).label("interaction_count"))
-            .outerjoin(UserInteraction, Product.id == UserInteraction.product_id)
-            .filter(Product.is_active == True)
-            # Skip in_stock check for now since no products are marked as in_stock in test data
-            # .filter(Product.in_stock == True)
-            .filter(
-                (Product.merchant_image_url.isnot(None))
-                | (Product.aw_image_url.isnot(None))
-                | (Product.large_image.isnot(None))
-            )  # Must have at least one image for moodboard
-            .group_by(Product.id)
+            _popular_products(Product, interaction_count.label("interaction_count"))
+            .options(MOODBOARD_PRODUCT_COLUMNS)
             .order_by(desc("interaction_count"))
         )
 
         if request.diverse:
             # If diverse mode, try to get products from different categories
-            categories = (
-                db.query(Product.category_name)
-                .filter(Product.category_name.isnot(None))
-                .distinct()
-                .limit(10)
-                .all()
-            )
-
-            products = []
+            categories = await _get_categories(db)
             products_per_category = (
                 max(2, request.limit // len(categories)) if categories else request.limit
             )
 
-            for category in categories:
-                category_products = (
-                    popular_products_query.filter(Product.category_name == category[0])
-                    .limit(products_per_category)
-                    .all()
+            # Rank every moodboard product by popularity within its category
+            ranked = _popular_products(
+                Product.id.label("product_id"),
+                Product.category_name.label("category_name"),
+                interaction_count.label("interaction_count"),
+                func.row_number()
+                .over(
+                    partition_by=Product.category_name,
+                    order_by=(interaction_count.desc(), Product.id),
                 )
-                products.extend(category_products)
-
-                if len(products) >= request.limit:
-                    break
-
-            # If not enough diverse products, fill with popular ones
-            if len(products) < request.limit:
-                remaining = request.limit - len(products)
-                exclude_ids = [p[0].id for p in products]
-                more_products = (
-                    popular_products_query.filter(~Product.id.in_(exclude_ids))
-                    .limit(remaining)
-                    .all()
+                .label("rn"),
+            ).subquery()
+
+            # Top products of the chosen categories come first, interleaved
+            # (rank 1 of each, then rank 2, ...); everything else fills the
+            # remainder by popularity, all in the same query
+            diverse = and_(
+                ranked.c.category_name.in_(categories),
+                ranked.c.rn <= products_per_category,
+            )
+            products = (
+                await db.execute(
+                    select(Product, ranked.c.interaction_count)
+                    .options(MOODBOARD_PRODUCT_COLUMNS)
+                    .join(ranked, Product.id == ranked.c.product_id)
+                    .order_by(
+                        case((diverse, 0), else_=1),
+                        case((diverse, ranked.c.rn), else_=0),
+                        ranked.c.interaction_count.desc(),
+                        Product.id,
+                    )
+                    .limit(request.limit)
                 )
-                products.extend(more_products)
+            ).all()
         else:
             # Just get the most popular products
-            products = popular_products_query.limit(request.limit).all()
-
-        # Convert to response format
-        onboarding_products = []
-        for product, _ in products[: request.limit]:
-            # Use merchant_image_url or aw_image_url, whichever is available
-            image_url = product.merchant_image_url or product.aw_image_url or product.large_image
-
-            onboarding_products.append(
-                OnboardingProduct(
-                    product_id=str(product.id),
-                    title=product.product_name,
-                    image_url=image_url,
-                    price=float(product.search_price) if product.search_price else 0.0,
-                    brand=product.brand_name,
-                    category=product.category_name,
-                )
+            products = (await db.execute(popular_products_query.limit(request.limit))).all()
+
+        # Convert to response format (rows come from our own DB, so skip validation)
+        onboarding_products = [
+            OnboardingProduct.model_construct(
+                product_id=str(product.id),
+                title=product.product_name,
+                # Use merchant_image_url or aw_image_url, whichever is available
+                image_url=product.merchant_image_url
+                or product.aw_image_url
+                or product.large_image,
+                price=float(product.search_price or 0.0),
+                brand=product.brand_name,
+                category=product.category_name,
             )
+            for product, _ in products[: request.limit]
+        ]
 
-        return OnboardingProductsResponse(
+        response = OnboardingProductsResponse.model_construct(
             products=onboarding_products, total=len(onboarding_products)
         )
 
+        # Cache the serialized response (never ORM objects)
+        if settings.enable_cache:
+            await asyncio.to_thread(
+                cache.redis.set,
+                cache_key,
+                response.model_dump(),
+                ttl=ONBOARDING_PRODUCTS_CACHE_TTL,
+            )
+
+        return response
+
     except Exception as e:
         logger.error(f"Failed to fetch onboarding products: {e}", exc_info=True)
         raise HTTPException(
@@ -132,8 +287,9 @@ async def get_onboarding_products(
 @router.post("/complete", response_model=OnboardingCompleteResponse)
 async def complete_onboarding(
     request: OnboardingCompleteRequest,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    background_tasks: BackgroundTasks,
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db),
     cache: EmbeddingCache = Depends(get_embedding_cache),
 ) -> OnboardingCompleteResponse:
     """
@@ -144,13 +300,22 @@ async def complete_onboarding(
     2. Creates initial user embedding from selections
     3. Updates user preferences (price range)
     4. Marks user as onboarded
+
+    The embedding is saved in a background task once the response is sent.
     """
+    user_id = current_user.id
+
     try:
-        # Check if already onboarded
-        if current_user.onboarded:
+        # Check if already onboarded. The row lock is held until commit, so a
+        # concurrent submission waits for the in-flight one and then reads its
+        # committed flag (False again if that request rolled back)
+        onboarded = (
+            await db.execute(select(User.onboarded).where(User.id == user_id).with_for_update())
+        ).scalar_one_or_none()
+        if onboarded:
             return OnboardingCompleteResponse(
                 success=True,
-                user_id=str(current_user.id),
+                user_id=str(user_id),
                 onboarded=True,
                 embedding_created=True,
                 preferences_saved=True,
@@ -159,49 +324,35 @@ async def complete_onboarding(
                 next_step="/feed",
             )
 
-        # Validate selected products exist (selected_product_ids are strings of UUIDs)
-        from uuid import UUID
-
-        # Convert string IDs to UUIDs for database query
-        product_uuids = []
-        for pid in request.selected_product_ids:
-            try:
-                product_uuids.append(UUID(pid))
-            except ValueError:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail=f"Invalid product ID format: {pid}",
-                )
+        # Validate selected products exist (IDs are parsed as UUIDs by the schema)
+        product_uuids = request.selected_product_ids
 
-        selected_products = db.query(Product).filter(Product.id.in_(product_uuids)).all()
+        # Validate products and fetch their text embeddings. The pgvector
+        # column comes back as a float32 ndarray, so only rows still on the
+        # legacy ARRAY column need converting.
+        rows = (
+            await db.execute(PRODUCT_EMBEDDINGS_BY_IDS, {"ids": list(set(product_uuids))})
+        ).all()
 
-        if len(selected_products) != len(request.selected_product_ids):
-            found_ids = {str(p.id) for p in selected_products}
-            missing_ids = set(request.selected_product_ids) - found_ids
+        found_ids = set()
+        product_embeddings_dict = {}
+        for product_id, embedding_vector, embedding in rows:
+            found_ids.add(str(product_id))
+            if embedding_vector is not None:
+                embedding = embedding_vector
+            if embedding is not None:
+                product_embeddings_dict[str(product_id)] = np.asarray(embedding, dtype=np.float32)
+
+        if len(found_ids) != len(set(product_uuids)):
+            missing_ids = {str(pid) for pid in product_uuids} - found_ids
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=f"Some selected products not found: {missing_ids}",
             )
 
-        # Get product embeddings from database
-        product_embeddings_dict = {}
-
-        for product in selected_products:
-            # Query database directly for product embeddings
-            embedding_record = (
-                db.query(ProductEmbedding)
-                .filter(
-                    ProductEmbedding.product_id == product.id,
-                    ProductEmbedding.embedding_type == "text",
-                )
-                .first()
-            )
-
-            if embedding_record and embedding_record.embedding:
-                product_embeddings_dict[str(product.id)] = np.array(embedding_record.embedding)
-            else:
-                # If no embedding found, log warning
-                logger.warning(f"No embedding found for product {product.id}")
+        for product_id in found_ids - product_embeddings_dict.keys():
+            # If no embedding found, log warning
+            logger.warning(f"No embedding found for product {product_id}")
 
         if not product_embeddings_dict:
             raise HTTPException(
@@ -216,52 +367,62 @@ async def complete_onboarding(
             product_embeddings_dict=product_embeddings_dict,
         )
 
-        # Save the embedding to database and cache
-        embedding_builder = UserEmbeddingBuilder(db, cache)
-        saved = embedding_builder.save_user_embedding(
-            user_id=current_user.id,
-            embedding=embedding_result["user_embedding"],
-            embedding_type="long_term",  # Initialize as long-term profile
-            metadata={
-                "method": "onboarding_style_quiz",
-                "product_count": len(request.selected_product_ids),
-                "confidence": embedding_result.get("confidence", 0.8),
-                "created_at": datetime.utcnow().isoformat(),
-            },
-        )
-
-        # Update user preferences
+        # Update user preferences. The user is only marked as onboarded if
+        # there is an embedding to save, so a failed quiz can be retaken.
+        embedding_scheduled = bool(embedding_result["success"])
+        user_values = {"onboarded": embedding_scheduled, "updated_at": datetime.utcnow()}
         if request.price_min is not None:
-            current_user.price_band_min = request.price_min
+            user_values["price_band_min"] = request.price_min
         if request.price_max is not None:
-            current_user.price_band_max = request.price_max
-
-        # Mark user as onboarded
-        current_user.onboarded = True
-        current_user.updated_at = datetime.utcnow()
-
-        # Also track these as initial interactions (likes)
-        for product_id in request.selected_product_ids:
-            interaction = UserInteraction(
-                user_id=current_user.id,
-                product_id=product_id,
-                interaction_type="like",
-                context="onboarding_moodboard",
-                metadata={"source": "onboarding", "step": "style_quiz"},
-            )
-            db.add(interaction)
+            user_values["price_band_max"] = request.price_max
+        await db.execute(
+            update(User.__table__).where(User.__table__.c.id == user_id).values(**user_values)
+        )
+
+        # Also track these as initial interactions (likes), in one bulk INSERT
+        await db.execute(
+            INSERT_INTERACTIONS,
+            [
+                {
+                    "user_id": user_id,
+                    "product_id": product_id,
+                    "interaction_type": "like",
+                    "context": "onboarding_moodboard",
+                    "metadata": {"source": "onboarding", "step": "style_quiz"},
+                }
+                for product_id in product_uuids
+            ],
+        )
 
         # Commit all changes
-        db.commit()
+        await db.commit()
+
+        # Save the embedding to database and cache off the request path. It
+        # does not exist yet when the response is sent, so it is reported as
+        # scheduled; a failed save resets onboarded so the user can retry.
+        if embedding_scheduled:
+            background_tasks.add_task(
+                _save_onboarding_embedding,
+                user_id,
+                embedding_result["user_embedding"],
+                {
+                    "method": "onboarding_style_quiz",
+                    "product_count": len(request.selected_product_ids),
+                    "confidence": embedding_result.get("confidence", 0.8),
+                    "created_at": datetime.utcnow().isoformat(),
+                },
+                cache,
+            )
 
         return OnboardingCompleteResponse(
             success=True,
-            user_id=str(current_user.id),
-            onboarded=True,
-            embedding_created=saved,
+            user_id=str(user_id),
+            onboarded=embedding_scheduled,
+            embedding_created=False,
+            embedding_status="scheduled" if embedding_scheduled else "failed",
             preferences_saved=True,
             selected_products_count=len(request.selected_product_ids),
-            message="Onboarding completed successfully! Your style profile has been created.",
+            message="Onboarding completed successfully! Your style profile is being created.",
             next_step="/feed",
             embedding_metadata={
                 "confidence": embedding_result.get("confidence", 0.8),
@@ -273,10 +434,8 @@ async def complete_onboarding(
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(
-            f"Failed to complete onboarding for user {current_user.id}: {e}", exc_info=True
-        )
-        db.rollback()
+        logger.error(f"Failed to complete onboarding for user {user_id}: {e}", exc_info=True)
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to complete onboarding. Please try again.",
@@ -285,8 +444,8 @@ async def complete_onboarding(
 
 @router.get("/status", response_model=OnboardingStatusResponse)
 async def get_onboarding_status(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db),
 ) -> OnboardingStatusResponse:
     """
     Check user's onboarding status.
@@ -294,15 +453,31 @@ async def get_onboarding_status(
     Returns whether the user has completed onboarding and has
     the necessary embeddings for recommendations.
     """
-    # Check if user has embeddings
-    user_embedding = (
-        db.query(UserEmbedding).filter(UserEmbedding.user_id == current_user.id).first()
+    user_id = current_user.id
+
+    # Embedding presence and the first onboarding interaction in one round trip
+    has_embedding_expr = (
+        select(UserEmbedding.user_id)
+        .where(
+            UserEmbedding.user_id == user_id,
+            UserEmbedding.long_term_embedding.isnot(None)
+            | UserEmbedding.session_embedding.isnot(None),
+        )
+        .exists()
     )
-
-    has_embedding = user_embedding is not None and (
-        user_embedding.long_term_embedding is not None
-        or user_embedding.session_embedding is not None
+    first_onboarding_expr = (
+        select(UserInteraction.created_at)
+        .where(
+            UserInteraction.user_id == user_id,
+            UserInteraction.context == "onboarding_moodboard",
+        )
+        .order_by(UserInteraction.created_at)
+        .limit(1)
+        .scalar_subquery()
     )
+    has_embedding, first_onboarding_at = (
+        await db.execute(select(has_embedding_expr, first_onboarding_expr))
+    ).one()
 
     # Check if user has preferences
     has_preferences = (
@@ -312,22 +487,10 @@ async def get_onboarding_status(
         or (current_user.style_preferences and len(current_user.style_preferences) > 0)
     )
 
-    # Get onboarding date if completed
+    # Onboarding date is the first moodboard interaction, if completed
     onboarding_date = None
-    if current_user.onboarded:
-        # Try to find the first onboarding interaction
-        first_onboarding = (
-            db.query(UserInteraction)
-            .filter(
-                UserInteraction.user_id == current_user.id,
-                UserInteraction.context == "onboarding_moodboard",
-            )
-            .order_by(UserInteraction.created_at)
-            .first()
-        )
-
-        if first_onboarding:
-            onboarding_date = first_onboarding.created_at.isoformat()
+    if current_user.onboarded and first_onboarding_at:
+        onboarding_date = first_onboarding_at.isoformat()
 
     return OnboardingStatusResponse(
         user_id=str(current_user.id),
@@ -3,30 +3,67 @@ Recommend Endpoint
 POST /recommend - Personalized product recommendations.
 """
 
-import hashlib
+import asyncio
 import logging
+import threading
 import time
+from collections import OrderedDict
 from typing import Any, Dict, Optional
+from uuid import UUID
 
+import numpy as np
 from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import bindparam, select
 from sqlalchemy.orm import Session
 
+from ...db.models import Product, UserEmbedding
 from ...ml.caching import EmbeddingCache
 from ...ml.retrieval import ProductFilters, create_user_context
 from ...ml.search import SearchService
 from ..config import APISettings, get_settings
 from ..dependencies import get_db, get_embedding_cache, get_request_id, get_search_service
 from ..errors import SearchError
+from ..models.common import FilterParams
 from ..models.recommend import RecommendationContext, RecommendRequest, RecommendResponse
 from ..models.search import ProductResult
 from ..services.cache_service import CacheService, get_cache_service
 from ..services.metadata_service import MetadataService, get_metadata_service
 from ..services.text_encoder import TextEncoderService, get_text_encoder_service
+from .search import _hash_filters, _short_hash
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/v1", tags=["recommend"])
 
+# Cache-miss fallback reads just the two vectors, as a plain row
+USER_EMBEDDINGS_BY_USER = (
+    select(UserEmbedding.long_term_embedding, UserEmbedding.session_embedding)
+    .where(UserEmbedding.user_id == bindparam("user_id"))
+    .limit(1)
+)
+
+# Per-process LRU of product embeddings for context=similar, in front of
+# Redis: (expires_at, embedding) keyed by product ID string
+PRODUCT_EMBEDDING_L1_TTL_SECONDS = 60
+PRODUCT_EMBEDDING_L1_MAX_SIZE = 10_000
+_product_embedding_l1: "OrderedDict[str, tuple[float, np.ndarray]]" = OrderedDict()
+_product_embedding_l1_lock = threading.Lock()
+
+
+def _blend(
+    primary: np.ndarray, primary_weight: float, secondary: np.ndarray, secondary_weight: float
+) -> np.ndarray:
+    """
+    Weighted sum of two embeddings as float32, built in a single buffer.
+
+    Computes primary_weight * (primary + (secondary_weight / primary_weight) * secondary)
+    in place, so the blend allocates one array instead of three.
+    """
+    out = np.multiply(secondary, secondary_weight / primary_weight, dtype=np.float32)
+    out += primary
+    out *= primary_weight
+    return out
+
 
 @router.post("/recommend", response_model=RecommendResponse, status_code=status.HTTP_200_OK)
 async def recommend(
@@ -67,7 +104,7 @@ async def recommend(
     Returns:
         Recommendation response with results and metadata
     """
-    start_time = time.time()
+    start_ns = time.perf_counter_ns()
 
     logger.info(
         f"Recommend request: user_id={request.user_id}, context={request.context}",
@@ -82,53 +119,57 @@ async def recommend(
     # Generate cache key
     cache_key = _generate_cache_key(request)
 
-    # Check cache if enabled
-    cached_response = None
-    if settings.enable_cache:
-        cached_response = cache_service.get_recommend_results(cache_key)
+    # The response cache and the user embeddings are read in a single MGET
+    cached_response, user_embeddings = await asyncio.to_thread(
+        cache_service.get_recommend_results_and_embeddings,
+        cache_key if settings.enable_cache else None,
+        request.user_id,
+    )
 
-        if cached_response:
-            logger.info(
-                f"Cache HIT for user {request.user_id}, context={request.context}",
-                extra={"request_id": request_id},
-            )
-            cached_response["cached"] = True
-            cached_response["total_time_ms"] = (time.time() - start_time) * 1000
-            return RecommendResponse(**cached_response)
+    if cached_response:
+        logger.info(
+            f"Cache HIT for user {request.user_id}, context={request.context}",
+            extra={"request_id": request_id},
+        )
+        cached_response["cached"] = True
+        cached_response["total_time_ms"] = (time.perf_counter_ns() - start_ns) / 1e6
+        return RecommendResponse(**cached_response)
 
     logger.debug(f"Cache MISS for user {request.user_id}, context={request.context}")
 
-    # Step 1: Load user embeddings from cache
-    user_embeddings = cache.get_user_embeddings(request.user_id)
+    # Only a miss needs the query encode (search context). It runs on a worker
+    # thread while the user embeddings are resolved below.
+    encode_task = None
+    if request.context == RecommendationContext.SEARCH and request.search_query:
+        encode_task = asyncio.create_task(
+            asyncio.to_thread(text_encoder.encode_query, request.search_query)
+        )
+
+    # Step 1: User embeddings (from the MGET above)
     long_term_embedding = user_embeddings.get("long_term")
     session_embedding = user_embeddings.get("session") if request.use_session_context else None
 
     # Fallback to database if not in cache
     if long_term_embedding is None or (request.use_session_context and session_embedding is None):
         logger.info(f"Cache miss for user {request.user_id}, querying database")
-        from uuid import UUID
-
-        import numpy as np
-
-        from ...db.models import UserEmbedding
-
         try:
             # Convert user_id string to UUID for database query
             user_uuid = UUID(request.user_id)
 
             # Query database for user embeddings
-            user_embedding_record = (
-                db.query(UserEmbedding).filter(UserEmbedding.user_id == user_uuid).first()
-            )
+            user_embedding_record = db.execute(
+                USER_EMBEDDINGS_BY_USER, {"user_id": user_uuid}
+            ).one_or_none()
 
             if user_embedding_record:
                 # Extract long-term embedding from database
-                if long_term_embedding is None and user_embedding_record.long_term_embedding:
-                    emb_data = user_embedding_record.long_term_embedding
-                    if isinstance(emb_data, (list, tuple)):
-                        long_term_embedding = np.array(emb_data, dtype=np.float32)
-                    elif isinstance(emb_data, np.ndarray):
-                        long_term_embedding = emb_data.astype(np.float32)
+                if (
+                    long_term_embedding is None
+                    and user_embedding_record.long_term_embedding is not None
+                ):
+                    long_term_embedding = np.asarray(
+                        user_embedding_record.long_term_embedding, dtype=np.float32
+                    )
 
                     # Cache for future requests
                     cache.set_user_long_term_embedding(request.user_id, long_term_embedding)
@@ -140,13 +181,11 @@ async def recommend(
                 if (
                     request.use_session_context
                     and session_embedding is None
-                    and user_embedding_record.session_embedding
+                    and user_embedding_record.session_embedding is not None
                 ):
-                    sess_data = user_embedding_record.session_embedding
-                    if isinstance(sess_data, (list, tuple)):
-                        session_embedding = np.array(sess_data, dtype=np.float32)
-                    elif isinstance(sess_data, np.ndarray):
-                        session_embedding = sess_data.astype(np.float32)
+                    session_embedding = np.asarray(
+                        user_embedding_record.session_embedding, dtype=np.float32
+                    )
 
                     # Cache for future requests
                     cache.set_user_session_embedding(request.user_id, session_embedding)
@@ -167,6 +206,9 @@ async def recommend(
 
     # Validate user has embeddings
     if not has_long_term_profile and not has_session_context:
+        if encode_task is not None:
+            # The thread still finishes the encode; this only drops its result
+            encode_task.cancel()
         logger.warning(f"No embeddings found for user {request.user_id} in cache or database")
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -181,7 +223,7 @@ async def recommend(
         # General feed: blend long-term and session
         if has_long_term_profile and has_session_context:
             # Blend both
-            query_vector = 0.6 * long_term_embedding + 0.4 * session_embedding
+            query_vector = _blend(long_term_embedding, 0.6, session_embedding, 0.4)
             blend_weights = {"long_term": 0.6, "session": 0.4}
         elif has_long_term_profile:
             query_vector = long_term_embedding
@@ -196,7 +238,7 @@ async def recommend(
             raise SearchError(message="search_query required for context=search", status_code=400)
 
         try:
-            query_embedding = text_encoder.encode_query(request.search_query)
+            query_embedding = await encode_task
         except Exception as e:
             logger.error(f"Failed to encode query: {e}")
             raise SearchError(
@@ -206,7 +248,7 @@ async def recommend(
 
         # Blend query with user profile
         if has_long_term_profile:
-            query_vector = 0.7 * query_embedding + 0.3 * long_term_embedding
+            query_vector = _blend(query_embedding, 0.7, long_term_embedding, 0.3)
             blend_weights = {"query": 0.7, "long_term": 0.3}
         else:
             query_vector = query_embedding
@@ -229,7 +271,7 @@ async def recommend(
 
         # Blend product with user profile
         if has_long_term_profile:
-            query_vector = 0.8 * product_embedding + 0.2 * long_term_embedding
+            query_vector = _blend(product_embedding, 0.8, long_term_embedding, 0.2)
             blend_weights = {"product": 0.8, "long_term": 0.2}
         else:
             query_vector = product_embedding
@@ -245,8 +287,6 @@ async def recommend(
 
         # Add category filter
         if not request.filters:
-            from ..models.common import FilterParams
-
             request.filters = FilterParams()
         if not request.filters.category_ids:
             request.filters.category_ids = []
@@ -265,85 +305,68 @@ async def recommend(
         )
 
     # Step 4: Perform personalized search
-    from ...ml.retrieval import FilteredSimilaritySearch, SimilaritySearch
+    recommend_start_ns = time.perf_counter_ns()
 
-    recommend_start = time.time()
+    # Fetch enough for the requested page, plus headroom for results that
+    # enrichment drops (sized from the observed drop rate)
+    k = metadata_service.overfetch_k(request.offset + request.limit)
 
     if filters:
-        filtered_search = FilteredSimilaritySearch(
-            index_manager=search_service.personalized_search.index_manager,
-            db_session_factory=lambda: db,
-        )
-
-        ml_results = filtered_search.search_with_filters(
+        ml_results = search_service.personalized_search.filtered_search.search_with_filters(
             query_vector=query_vector,
             filters=filters,
-            k=request.limit * 2,  # Get more for better results after enrichment
+            k=k,
             session=db,
         )
     else:
-        similarity_search = SimilaritySearch(
-            index_manager=search_service.personalized_search.index_manager
+        ml_results = search_service.personalized_search.similarity_search.search(
+            query_vector=query_vector, k=k
         )
 
-        ml_results = similarity_search.search(query_vector=query_vector, k=request.limit * 2)
-
-    recommendation_time_ms = (time.time() - recommend_start) * 1000
-
-    # Step 5: Extract product IDs and scores
-    product_ids = [r.product_id for r in ml_results.results]
-    scores = {}
+    recommendation_time_ms = (time.perf_counter_ns() - recommend_start_ns) / 1e6
 
-    for result in ml_results.results:
-        scores[result.product_id] = {
-            "similarity": result.similarity,
-            "rank": result.rank,
-            "final_score": result.metadata.get("final_score", result.similarity),
-            "popularity_score": result.metadata.get("popularity_score"),
-            "price_affinity_score": result.metadata.get("price_affinity_score"),
-            "brand_match_score": result.metadata.get("brand_match_score"),
-        }
-
-    # Step 6: Enrich with metadata
-    enriched_results = metadata_service.enrich_results(
-        product_ids=product_ids, scores=scores, db=db
-    )
+    # Step 5-6: Enrich with metadata (scores are read off each result)
+    enriched_results = metadata_service.enrich_search_results(ml_results.results, db=db)
 
     # Step 7: Apply pagination
     paginated_results = enriched_results[request.offset : request.offset + request.limit]
 
     # Step 8: Build response
-    total_time_ms = (time.time() - start_time) * 1000
-
-    response_data = {
-        "results": paginated_results,
-        "total": len(enriched_results),
-        "offset": request.offset,
-        "limit": request.limit,
-        "page": (request.offset // request.limit) + 1 if request.limit > 0 else 1,
-        "user_id": request.user_id,
-        "context": request.context.value,
-        "recommendation_time_ms": recommendation_time_ms,
-        "total_time_ms": total_time_ms,
-        "personalized": True,
-        "cached": False,
-        "filters_applied": filters is not None,
-        "diversity_applied": request.enable_diversity,
-        "has_long_term_profile": has_long_term_profile,
-        "has_session_context": has_session_context,
-        "blend_weights": blend_weights,
-    }
+    total_time_ms = (time.perf_counter_ns() - start_ns) / 1e6
+
+    # Every field is produced here (results are already ProductResult models),
+    # so skip re-validating them
+    response = RecommendResponse.model_construct(
+        results=paginated_results,
+        total=len(enriched_results),
+        offset=request.offset,
+        limit=request.limit,
+        page=(request.offset // request.limit) + 1 if request.limit > 0 else 1,
+        user_id=request.user_id,
+        context=request.context.value,
+        recommendation_time_ms=recommendation_time_ms,
+        total_time_ms=total_time_ms,
+        personalized=True,
+        cached=False,
+        filters_applied=filters is not None,
+        diversity_applied=request.enable_diversity,
+        has_long_term_profile=has_long_term_profile,
+        has_session_context=has_session_context,
+        blend_weights=blend_weights,
+    )
 
     # Step 9: Cache response
     if settings.enable_cache:
-        cache_service.set_recommend_results(cache_key, response_data, settings.cache_ttl_recommend)
+        cache_service.set_recommend_results(
+            cache_key, response, settings.cache_ttl_recommend, user_id=str(request.user_id)
+        )
 
     logger.info(
         f"Recommendation completed: {len(enriched_results)} results in {total_time_ms:.2f}ms",
         extra={"request_id": request_id},
     )
 
-    return RecommendResponse(**response_data)
+    return response
 
 
 def _generate_cache_key(request: RecommendRequest) -> str:
@@ -356,6 +379,20 @@ def _generate_cache_key(request: RecommendRequest) -> str:
     Returns:
         Cache key string
     """
+    # Plain feed-style requests (the bulk of traffic) need no hashing: every
+    # field is short and fixed-shape. A hashed key is a single base36 token
+    # with no colons, so the two forms never collide.
+    if (
+        request.filters is None
+        and request.product_id is None
+        and request.category_id is None
+        and not request.search_query
+    ):
+        return (
+            f"recommend:{request.user_id}:{request.context.value}:"
+            f"{request.offset}:{request.limit}:{int(request.use_session_context)}"
+        )
+
     # Create a deterministic string representation of the request
     key_parts = [
         f"user:{request.user_id}",
@@ -374,16 +411,14 @@ def _generate_cache_key(request: RecommendRequest) -> str:
         key_parts.append(f"query:{request.search_query.lower().strip()}")
 
     if request.filters:
-        from ..routers.search import _hash_filters
-
         key_parts.append(f"filters:{_hash_filters(request.filters)}")
 
     key_string = "|".join(key_parts)
 
-    # Hash to create shorter key
-    key_hash = hashlib.md5(key_string.encode()).hexdigest()
+    key_hash = _short_hash(key_string)
 
-    return f"recommend:{key_hash}"
+    # User-scoped prefix so feedback can invalidate a user's entries by pattern
+    return f"recommend:{request.user_id}:{key_hash}"
 
 
 def _get_cached_response(cache_key: str, cache: EmbeddingCache) -> Optional[Dict[str, Any]]:
@@ -417,7 +452,10 @@ def _get_product_embedding(
     product_id: str, search_service: SearchService, cache: EmbeddingCache, db: Session = None
 ) -> Optional[Any]:
     """
-    Get product embedding from cache or database.
+    Get product embedding from the in-process cache, Redis or the database.
+
+    Hot products (e.g. trending items behind many "similar" requests) are
+    served from a small per-process LRU without a Redis round trip.
 
     Args:
         product_id: Product ID (UUID string)
@@ -426,12 +464,55 @@ def _get_product_embedding(
         db: Database session (optional)
 
     Returns:
-        Product embedding vector or None
+        Product embedding vector (read-only) or None
     """
-    from uuid import UUID
+    now = time.monotonic()
+
+    with _product_embedding_l1_lock:
+        entry = _product_embedding_l1.get(product_id)
+        if entry is not None:
+            if entry[0] > now:
+                _product_embedding_l1.move_to_end(product_id)
+                return entry[1]
+            del _product_embedding_l1[product_id]
+
+    embedding = _fetch_product_embedding(product_id, search_service, cache, db)
+    if embedding is None:
+        return None
 
-    import numpy as np
+    # Shared between requests, so guard against in-place modification
+    embedding = np.asarray(embedding, dtype=np.float32)
+    embedding.setflags(write=False)
 
+    with _product_embedding_l1_lock:
+        _product_embedding_l1[product_id] = (now + PRODUCT_EMBEDDING_L1_TTL_SECONDS, embedding)
+        if len(_product_embedding_l1) > PRODUCT_EMBEDDING_L1_MAX_SIZE:
+            _product_embedding_l1.popitem(last=False)
+
+    return embedding
+
+
+def clear_product_embedding_cache() -> None:
+    """Clear the in-process product embedding cache (useful for testing)."""
+    with _product_embedding_l1_lock:
+        _product_embedding_l1.clear()
+
+
+def _fetch_product_embedding(
+    product_id: str, search_service: SearchService, cache: EmbeddingCache, db: Session = None
+) -> Optional[Any]:
+    """
+    Get product embedding from cache or database.
+
+    Args:
+        product_id: Product ID (UUID string)
+        search_service: Search service
+        cache: Embedding cache
+        db: Database session (optional)
+
+    Returns:
+        Product embedding vector or None
+    """
     # Try cache first
     cache_key = f"product_embedding:{product_id}"
     try:
@@ -445,10 +526,6 @@ def _get_product_embedding(
     # Get from database if db session provided
     if db is not None:
         try:
-            from sqlalchemy import select
-
-            from ...db.models import Product
-
             # Convert product_id to UUID
             try:
                 product_uuid = UUID(product_id)
@@ -472,9 +549,11 @@ def _get_product_embedding(
                 else:
                     embedding = np.array(product.text_embedding, dtype=np.float32)
 
-                # Cache for future use
+                # Cache for future use (float16 halves the payload; reads widen to float32)
                 try:
-                    cache.redis.set(cache_key, embedding, ttl=3600)  # Cache for 1 hour
+                    cache.redis.set(
+                        cache_key, embedding.astype(np.float16), ttl=3600
+                    )  # Cache for 1 hour
                 except Exception as e:
                     logger.warning(f"Failed to cache product embedding: {e}")
 
@@ -6,7 +6,8 @@ POST /search - Text-based product search with personalization.
 import hashlib
 import logging
 import time
-from typing import Any, Dict
+from functools import lru_cache
+from typing import Any, Dict, Optional, Tuple
 
 from fastapi import APIRouter, Depends, status
 from sqlalchemy.orm import Session
@@ -66,7 +67,7 @@ async def search(
     Returns:
         Search response with results and metadata
     """
-    start_time = time.time()
+    start_ns = time.perf_counter_ns()
 
     logger.info(
         f"Search request: query='{request.query}', user_id={request.user_id}",
@@ -89,7 +90,7 @@ async def search(
         if cached_response:
             logger.info(f"Cache HIT for query: '{request.query}'", extra={"request_id": request_id})
             cached_response["cached"] = True
-            cached_response["total_time_ms"] = (time.time() - start_time) * 1000
+            cached_response["total_time_ms"] = (time.perf_counter_ns() - start_ns) / 1e6
             return SearchResponse(**cached_response)
 
     logger.debug(f"Cache MISS for query: '{request.query}'")
@@ -136,89 +137,69 @@ async def search(
     # TODO: Implement proper text search in SearchService
 
     # For now, use the query embedding directly
-    from ...ml.retrieval import FilteredSimilaritySearch, SimilaritySearch
+    # The FAISS index is loaded at startup (see main.lifespan), or on demand
+    # by get_search_service if that failed; without it there is nothing to search
+    if search_service.personalized_search.index_manager.index is None:
+        raise SearchError(message="Search service temporarily unavailable")
 
-    # Ensure FAISS index is loaded (lazy loading on first search request)
-    index_manager = search_service.personalized_search.index_manager
-    try:
-        index_manager.ensure_index_loaded(session=db)
-    except Exception as e:
-        logger.error(f"Failed to load FAISS index: {e}")
-        raise SearchError(
-            message="Search service temporarily unavailable",
-            details={"error": str(e)},
-        )
+    # Fetch enough for the requested page, plus headroom for results that
+    # enrichment drops (sized from the observed drop rate)
+    k = metadata_service.overfetch_k(request.offset + request.limit)
 
     if filters:
-        filtered_search = FilteredSimilaritySearch(
-            index_manager=search_service.personalized_search.index_manager,
-            db_session_factory=lambda: db,
-        )
-
-        ml_results = filtered_search.search_with_filters(
+        ml_results = search_service.personalized_search.filtered_search.search_with_filters(
             query_vector=query_embedding,
             filters=filters,
-            k=request.limit * 2,  # Get more for better results after enrichment
+            k=k,
             session=db,
         )
     else:
-        similarity_search = SimilaritySearch(
-            index_manager=search_service.personalized_search.index_manager
+        ml_results = search_service.personalized_search.similarity_search.search(
+            query_vector=query_embedding, k=k
         )
 
-        ml_results = similarity_search.search(query_vector=query_embedding, k=request.limit * 2)
-
-    # Step 5: Extract product IDs and scores
-    product_ids = [r.product_id for r in ml_results.results]
-    scores = {}
-
-    for result in ml_results.results:
-        scores[result.product_id] = {
-            "similarity": result.similarity,
-            "rank": result.rank,
-            "final_score": result.metadata.get("final_score", result.similarity),
-            "popularity_score": result.metadata.get("popularity_score"),
-            "price_affinity_score": result.metadata.get("price_affinity_score"),
-            "brand_match_score": result.metadata.get("brand_match_score"),
-        }
-
-    # Step 6: Enrich with metadata
-    enriched_results = metadata_service.enrich_results(
-        product_ids=product_ids, scores=scores, db=db
-    )
+    # Step 5-6: Enrich with metadata (scores are read off each result)
+    enriched_results = metadata_service.enrich_search_results(ml_results.results, db=db)
 
     # Step 7: Apply pagination
     paginated_results = enriched_results[request.offset : request.offset + request.limit]
 
     # Step 8: Build response
-    total_time_ms = (time.time() - start_time) * 1000
-
-    response_data = {
-        "results": paginated_results,
-        "total": len(enriched_results),
-        "offset": request.offset,
-        "limit": request.limit,
-        "page": (request.offset // request.limit) + 1 if request.limit > 0 else 1,
-        "query": request.query,
-        "user_id": request.user_id,
-        "search_time_ms": ml_results.search_time_ms,
-        "total_time_ms": total_time_ms,
-        "personalized": user_context is not None,
-        "cached": False,
-        "filters_applied": filters is not None,
-        "ranking_applied": request.use_ranking,
-    }
+    total_time_ms = (time.perf_counter_ns() - start_ns) / 1e6
+
+    # Every field is produced here (results are already ProductResult models),
+    # so skip re-validating them
+    response = SearchResponse.model_construct(
+        results=paginated_results,
+        total=len(enriched_results),
+        offset=request.offset,
+        limit=request.limit,
+        page=(request.offset // request.limit) + 1 if request.limit > 0 else 1,
+        query=request.query,
+        user_id=request.user_id,
+        search_time_ms=ml_results.search_time_ms,
+        total_time_ms=total_time_ms,
+        personalized=user_context is not None,
+        cached=False,
+        filters_applied=filters is not None,
+        ranking_applied=request.use_ranking,
+    )
 
     # Step 9: Cache response
     if settings.enable_cache:
-        cache_service.set_search_results(cache_key, response_data, settings.cache_ttl_search)
+        cache_service.set_search_results(
+            cache_key,
+            response,
+            settings.cache_ttl_search,
+            user_id=str(request.user_id) if request.user_id else None,
+        )
 
     logger.info(
         f"Search completed: {len(enriched_results)} results in {total_time_ms:.2f}ms",
         extra={"request_id": request_id},
     )
 
-    return SearchResponse(**response_data)
+    return response
 
 
 def _generate_cache_key(request: SearchRequest) -> str:
@@ -231,6 +212,15 @@ def _generate_cache_key(request: SearchRequest) -> str:
     Returns:
         Cache key string
     """
+    # Unfiltered requests skip hashing. The query goes last, after the
+    # fixed-shape fields, so the key stays unambiguous; a hashed key is a
+    # single base36 token with no colons, so the two forms never collide.
+    if request.filters is None:
+        return (
+            f"search:{request.user_id or 'anon'}:q:{request.offset}:{request.limit}:"
+            f"{request.query.lower().strip()}"
+        )
+
     # Create a deterministic string representation of the request
     key_parts = [
         f"query:{request.query.lower().strip()}",
@@ -244,28 +234,72 @@ def _generate_cache_key(request: SearchRequest) -> str:
 
     key_string = "|".join(key_parts)
 
-    # Hash to create shorter key
-    key_hash = hashlib.md5(key_string.encode()).hexdigest()
+    key_hash = _short_hash(key_string)
+
+    # User-scoped prefix so feedback can invalidate a user's entries by pattern
+    return f"search:{request.user_id or 'anon'}:{key_hash}"
 
-    return f"search:{key_hash}"
+
+_B36_DIGITS = "0123456789abcdefghijklmnopqrstuvwxyz"
+
+
+def _short_hash(key_string: str) -> str:
+    """
+    Compact cache-key hash: 64-bit BLAKE2b rendered in base36 (at most 13 chars).
+
+    Not security-sensitive. Keys are already scoped per user, so 64 bits is
+    ample, and the key is less than half the size of a 32-char hex digest.
+    """
+    n = int.from_bytes(hashlib.blake2b(key_string.encode(), digest_size=8).digest(), "big")
+    digits = []
+    while True:
+        n, r = divmod(n, 36)
+        digits.append(_B36_DIGITS[r])
+        if not n:
+            return "".join(reversed(digits))
 
 
 def _hash_filters(filters) -> str:
     """Hash filter parameters."""
+    return _filters_key(
+        filters.min_price,
+        filters.max_price,
+        filters.in_stock,
+        tuple(filters.merchant_ids) if filters.merchant_ids else None,
+        tuple(filters.category_ids) if filters.category_ids else None,
+        tuple(filters.brand_ids) if filters.brand_ids else None,
+    )
+
+
+@lru_cache(maxsize=4096)
+def _filters_key(
+    min_price: Optional[float],
+    max_price: Optional[float],
+    in_stock: Optional[bool],
+    merchant_ids: Optional[Tuple[int, ...]],
+    category_ids: Optional[Tuple[int, ...]],
+    brand_ids: Optional[Tuple[int, ...]],
+) -> str:
+    """
+    Stable string form of a filter set.
+
+    Memoized on the immutable filter values, so paginating with the same
+    filters skips the sorting and string building.
+    """
     filter_parts = []
 
-    if filters.min_price is not None:
-        filter_parts.append(f"min_price:{filters.min_price}")
-    if filters.max_price is not None:
-        filter_parts.append(f"max_price:{filters.max_price}")
-    if filters.in_stock is not None:
-        filter_parts.append(f"in_stock:{filters.in_stock}")
-    if filters.merchant_ids:
-        filter_parts.append(f"merchants:{','.join(map(str, sorted(filters.merchant_ids)))}")
-    if filters.category_ids:
-        filter_parts.append(f"categories:{','.join(map(str, sorted(filters.category_ids)))}")
-    if filters.brand_ids:
-        filter_parts.append(f"brands:{','.join(map(str, sorted(filters.brand_ids)))}")
+    if min_price is not None:
+        filter_parts.append(f"min_price:{min_price}")
+    if max_price is not None:
+        filter_parts.append(f"max_price:{max_price}")
+    if in_stock is not None:
+        filter_parts.append(f"in_stock:{in_stock}")
+    if merchant_ids:
+        filter_parts.append(f"merchants:{','.join(map(str, sorted(merchant_ids)))}")
+    if category_ids:
+        filter_parts.append(f"categories:{','.join(map(str, sorted(category_ids)))}")
+    if brand_ids:
+        filter_parts.append(f"brands:{','.join(map(str, sorted(brand_ids)))}")
 
     return "|".join(filter_parts)
 
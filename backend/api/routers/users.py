@@ -3,252 +3,487 @@ User-specific routes.
 Handles user favorites, history, statistics, and preferences.
 """
 
+import asyncio
+import base64
+import binascii
+import hashlib
+import logging
+import re
+import time
 from datetime import datetime
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy import desc, func
-from sqlalchemy.orm import Session
-
-from ...db.models import Product, User, UserInteraction
-from ..dependencies import get_current_user, get_db
+import orjson
+from fastapi import (
+    APIRouter,
+    BackgroundTasks,
+    Depends,
+    Header,
+    HTTPException,
+    Query,
+    Response,
+    status,
+)
+from sqlalchemy import bindparam, delete, desc, func, select, text, tuple_, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ...db.models import Product, User, UserFavorite, UserInteraction
+from ...ml.caching import EmbeddingCache
+from ..dependencies import (
+    get_async_db,
+    get_async_session_factory,
+    get_current_user_async,
+    get_embedding_cache,
+)
 from ..schemas.auth import UserResponse
 from ..schemas.user import (
-    FavoriteProduct,
     FavoritesResponse,
-    InteractionHistoryItem,
     InteractionHistoryResponse,
     UserPreferencesUpdate,
     UserStatsResponse,
 )
+from ..services.cache_service import CacheConfig
+from .auth import etag_matches
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/users", tags=["Users"])
 
+# Columns read by the favorites and history responses. Selecting them as
+# plain rows avoids loading full Product/UserInteraction entities.
+FAVORITE_COLUMNS = (
+    UserFavorite.created_at,
+    Product.id,
+    Product.product_name,
+    Product.search_price,
+    Product.currency,
+    Product.merchant_image_url,
+    Product.aw_image_url,
+    Product.brand_name,
+)
+HISTORY_COLUMNS = (
+    UserInteraction.id,
+    UserInteraction.product_id,
+    UserInteraction.interaction_type,
+    UserInteraction.created_at,
+    UserInteraction.context,
+    UserInteraction.query,
+    Product.product_name,
+    Product.search_price,
+    Product.merchant_image_url,
+    Product.aw_image_url,
+)
+
+# Hot statements are built once at import time with bound parameters, so
+# SQLAlchemy compiles each once and asyncpg reuses the prepared statement
+FAVORITES_BY_USER = (
+    select(*FAVORITE_COLUMNS)
+    .join(Product, UserFavorite.product_id == Product.id)
+    .where(UserFavorite.user_id == bindparam("user_id"))
+    .order_by(desc(UserFavorite.created_at))
+)
+DELETE_FAVORITE = (
+    delete(UserFavorite)
+    .where(
+        UserFavorite.user_id == bindparam("user_id"),
+        UserFavorite.product_id == bindparam("product_id"),
+    )
+    .returning(UserFavorite.product_id)
+)
+
+# Newest interaction of a user; a new one changes every history page's ETag
+LATEST_INTERACTION_ID = (
+    select(UserInteraction.id)
+    .where(UserInteraction.user_id == bindparam("user_id"))
+    .order_by(desc(UserInteraction.created_at), desc(UserInteraction.id))
+    .limit(1)
+)
+
+# Favorites, history and stats are polled by the UI. The browser revalidates
+# them on every request (If-None-Match), and unchanged data gets a 304.
+USER_DATA_CACHE_CONTROL = "private, no-cache"
+
+# Canonical dashed UUID, as sent by the frontend for product IDs
+_UUID_RE = re.compile(
+    r"[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}"
+)
+
+# Columns returned by the preferences UPDATE, i.e. exactly what UserResponse reads
+USER_RESPONSE_RETURNING = tuple(User.__table__.c[name] for name in UserResponse.model_fields)
+
+# All stats aggregates in one statement. Per-type counts are not computed
+# here: they are kept on the users row by a trigger (see backend/db/triggers.py).
+# Top categories/brands come from the periodically refreshed count views (see
+# backend/db/views.py) and may lag recent interactions by a few minutes.
+USER_STATS_QUERY = text(
+    """
+    SELECT
+        (
+            SELECT COALESCE(
+                json_agg(
+                    json_build_object('category', category_name, 'count', cnt) ORDER BY cnt DESC
+                ),
+                '[]'::json
+            )
+            FROM (
+                SELECT category_name, cnt
+                FROM user_category_counts
+                WHERE user_id = :user_id
+                ORDER BY cnt DESC
+                LIMIT 10
+            ) t
+        ) AS favorite_categories,
+        (
+            SELECT COALESCE(
+                json_agg(json_build_object('brand', brand_name, 'count', cnt) ORDER BY cnt DESC),
+                '[]'::json
+            )
+            FROM (
+                SELECT brand_name, cnt
+                FROM user_brand_counts
+                WHERE user_id = :user_id
+                ORDER BY cnt DESC
+                LIMIT 10
+            ) t
+        ) AS favorite_brands,
+        (
+            SELECT AVG(p.search_price)::float8
+            FROM user_interactions i
+            JOIN products p ON p.id = i.product_id
+            WHERE i.user_id = :user_id
+        ) AS avg_price
+"""
+)
+
 
 @router.get("/me/favorites", response_model=FavoritesResponse)
 async def get_user_favorites(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    background_tasks: BackgroundTasks,
+    if_none_match: Optional[str] = Header(None),
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db),
+    cache: EmbeddingCache = Depends(get_embedding_cache),
 ):
     """
     Get all products the user has liked/favorited.
+
+    Served stale-while-revalidate from a per-user cache: a recent payload is
+    returned as-is, an older one is returned while a background task
+    refreshes it, and if the database query fails the last cached payload
+    is returned instead of an error. Responses carry an ETag of the payload,
+    so an unchanged list is answered with 304 Not Modified.
     """
-    from ...db.models import UserFavorite
-
-    # Query favorites with joined products
-    favorites_query = (
-        db.query(UserFavorite, Product)
-        .join(Product, UserFavorite.product_id == Product.id)
-        .filter(UserFavorite.user_id == current_user.id)
-        .order_by(desc(UserFavorite.created_at))
-        .all()
+    cache_key = f"{CacheConfig.USER_FAVORITES_PREFIX}{current_user.id}"
+    cached = await asyncio.to_thread(cache.redis.get, cache_key)  # (cached_at, body) or None
+
+    if cached is not None:
+        cached_at, body = cached
+        age = time.time() - cached_at
+        if age < CacheConfig.FAVORITES_STALE_SECONDS:
+            if age >= CacheConfig.FAVORITES_FRESH_SECONDS:
+                background_tasks.add_task(_refresh_favorites_cache, current_user.id, cache)
+            return _conditional_response(body, if_none_match)
+
+    try:
+        body = await _load_favorites_body(db, current_user.id)
+    except Exception as e:
+        if cached is None:
+            raise
+        logger.warning(f"Favorites query failed, serving cached payload: {e}")
+        return _conditional_response(cached[1], if_none_match)
+
+    await asyncio.to_thread(
+        cache.redis.set, cache_key, (time.time(), body), ttl=CacheConfig.TTL_USER_FAVORITES
     )
 
-    # Build response
-    favorites = []
-    for favorite, product in favorites_query:
-        favorites.append(
-            FavoriteProduct(
-                product_id=str(product.id),
-                title=product.product_name,
-                price=float(product.search_price) if product.search_price else 0.0,
-                currency=product.currency or "GBP",
-                image_url=product.merchant_image_url or product.aw_image_url,
-                brand=product.brand_name,
-                in_stock=True,  # Default to True (in_stock not in Product model)
-                liked_at=favorite.created_at,
-            )
-        )
+    return _conditional_response(body, if_none_match)
+
 
-    return FavoritesResponse(favorites=favorites, total=len(favorites))
+def _build_etag(data: bytes) -> str:
+    """Build a weak ETag from the bytes that determine a response."""
+    return f'W/"{hashlib.blake2b(data, digest_size=8).hexdigest()}"'
+
+
+def _conditional_response(
+    body: bytes, if_none_match: Optional[str], etag: Optional[str] = None
+) -> Response:
+    """
+    Return a JSON body with caching headers, or 304 if the client has it.
+
+    The ETag defaults to one derived from the body itself.
+    """
+    etag = etag or _build_etag(body)
+    headers = {"Cache-Control": USER_DATA_CACHE_CONTROL, "ETag": etag}
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+async def _load_favorites_body(db: AsyncSession, user_id: UUID) -> bytes:
+    """Query a user's favorites and serialize the FavoritesResponse body."""
+    favorites_query = (await db.execute(FAVORITES_BY_USER, {"user_id": user_id})).all()
+
+    # Serialize the rows directly with orjson: the dicts match FavoriteProduct,
+    # so no Pydantic models are built on this path
+    favorites = [
+        {
+            "product_id": str(row.id),
+            "title": row.product_name,
+            "price": float(row.search_price) if row.search_price else 0.0,
+            "currency": row.currency or "GBP",
+            "image_url": row.merchant_image_url or row.aw_image_url,
+            "brand": row.brand_name,
+            "in_stock": True,  # Default to True (in_stock not in Product model)
+            "liked_at": row.created_at,
+        }
+        for row in favorites_query
+    ]
+
+    return orjson.dumps({"favorites": favorites, "total": len(favorites)})
+
+
+async def _refresh_favorites_cache(user_id: UUID, cache: EmbeddingCache) -> None:
+    """Background task: re-run the favorites query and update the cache."""
+    try:
+        async with get_async_session_factory()() as db:
+            body = await _load_favorites_body(db, user_id)
+        await asyncio.to_thread(
+            cache.redis.set,
+            f"{CacheConfig.USER_FAVORITES_PREFIX}{user_id}",
+            (time.time(), body),
+            ttl=CacheConfig.TTL_USER_FAVORITES,
+        )
+    except Exception as e:
+        logger.warning(f"Failed to refresh favorites cache for user {user_id}: {e}")
 
 
 @router.delete("/me/favorites/{product_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def remove_favorite(
     product_id: str,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db),
+    cache: EmbeddingCache = Depends(get_embedding_cache),
 ):
     """
     Remove a product from favorites (unlike).
     """
-    from ...db.models import UserFavorite
-
-    # Convert string product_id to UUID
-    try:
-        product_uuid = UUID(product_id)
-    except ValueError:
+    # Validate the canonical UUID form up front instead of catching ValueError
+    if not _UUID_RE.fullmatch(product_id):
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid product ID format")
+    product_uuid = UUID(product_id)
 
-    # Delete from user_favorites
-    deleted_count = (
-        db.query(UserFavorite)
-        .filter(
-            UserFavorite.user_id == current_user.id,
-            UserFavorite.product_id == product_uuid,
-        )
-        .delete()
-    )
+    # Delete from user_favorites; RETURNING tells us whether a row existed
+    deleted = (
+        await db.execute(DELETE_FAVORITE, {"user_id": current_user.id, "product_id": product_uuid})
+    ).first()
 
-    db.commit()
+    await db.commit()
 
-    if deleted_count == 0:
+    if deleted is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Favorite not found")
 
+    await asyncio.to_thread(
+        cache.redis.delete, f"{CacheConfig.USER_FAVORITES_PREFIX}{current_user.id}"
+    )
+
     return None
 
 
 @router.get("/me/history", response_model=InteractionHistoryResponse)
 async def get_interaction_history(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db),
     interaction_type: Optional[str] = Query(None, description="Filter by interaction type"),
     limit: int = Query(50, ge=1, le=200, description="Number of items to return"),
-    offset: int = Query(0, ge=0, description="Number of items to skip"),
+    cursor: Optional[str] = Query(
+        None, description="Opaque cursor from a previous page's next_cursor"
+    ),
+    include_total: bool = Query(False, description="Also count all matching interactions"),
+    if_none_match: Optional[str] = Header(None),
 ):
     """
     Get user's interaction history with optional filtering.
+
+    Pages are keyset-paginated on (created_at, id), newest first, so deep
+    pages cost the same as the first one. The total is only counted when
+    include_total is set.
+
+    History only grows, so a page is identified by the request parameters
+    and the user's newest interaction. That is checked first with one
+    indexed lookup; if the client's ETag still matches, the page is not
+    queried at all and 304 Not Modified is returned.
     """
-    # Base query
-    query = (
-        db.query(UserInteraction, Product)
-        .join(Product, UserInteraction.product_id == Product.id)
-        .filter(UserInteraction.user_id == current_user.id)
-    )
+    latest_id = await db.scalar(LATEST_INTERACTION_ID, {"user_id": current_user.id})
+    page_key = f"{current_user.id}|{latest_id}|{interaction_type}|{limit}|{cursor}|{include_total}"
+    etag = _build_etag(page_key.encode())
+    if etag_matches(if_none_match, etag):
+        return Response(
+            status_code=status.HTTP_304_NOT_MODIFIED,
+            headers={"Cache-Control": USER_DATA_CACHE_CONTROL, "ETag": etag},
+        )
+
+    # Page over the narrow interaction index first; product rows are only
+    # joined for the ids that make the page (deferred join)
+    page_ids = select(UserInteraction.id).where(UserInteraction.user_id == current_user.id)
 
     # Filter by interaction type if provided
     if interaction_type:
-        query = query.filter(UserInteraction.interaction_type == interaction_type)
-
-    # Get total count
-    total = query.count()
-
-    # Get paginated results
-    results = query.order_by(desc(UserInteraction.created_at)).limit(limit).offset(offset).all()
-
-    # Build response
-    interactions = []
-    for interaction, product in results:
-        interactions.append(
-            InteractionHistoryItem(
-                interaction_id=interaction.id,
-                product_id=str(interaction.product_id),
-                product_title=product.product_name if product else None,
-                product_image_url=(product.merchant_image_url or product.aw_image_url) if product else None,
-                product_price=float(product.search_price) if (product and product.search_price) else None,
-                interaction_type=interaction.interaction_type,
-                created_at=interaction.created_at,
-                context=interaction.context,
-                query=interaction.query,
-            )
+        page_ids = page_ids.where(UserInteraction.interaction_type == interaction_type)
+
+    # Counting scans every matching row, so only do it on request
+    total = None
+    if include_total:
+        total = await db.scalar(select(func.count()).select_from(page_ids.subquery()))
+
+    # Resume after the last row of the previous page
+    if cursor:
+        cursor_created_at, cursor_id = _decode_history_cursor(cursor)
+        page_ids = page_ids.where(
+            tuple_(UserInteraction.created_at, UserInteraction.id) < (cursor_created_at, cursor_id)
         )
 
-    return InteractionHistoryResponse(
-        interactions=interactions, total=total, offset=offset, limit=limit
+    # Fetch one extra row to learn whether another page exists
+    page_ids = (
+        page_ids.order_by(desc(UserInteraction.created_at), desc(UserInteraction.id))
+        .limit(limit + 1)
+        .subquery()
+    )
+    results = (
+        await db.execute(
+            select(*HISTORY_COLUMNS)
+            .join(page_ids, UserInteraction.id == page_ids.c.id)
+            .join(Product, UserInteraction.product_id == Product.id)
+            .order_by(desc(UserInteraction.created_at), desc(UserInteraction.id))
+        )
+    ).all()
+    next_cursor = None
+    if len(results) > limit:
+        results = results[:limit]
+        next_cursor = _encode_history_cursor(results[-1].created_at, results[-1].id)
+
+    # Serialize the rows directly with orjson: the dicts match
+    # InteractionHistoryItem, so no Pydantic models are built on this path
+    interactions = [
+        {
+            "interaction_id": str(row.id),
+            "product_id": str(row.product_id),
+            "product_title": row.product_name,
+            "product_image_url": row.merchant_image_url or row.aw_image_url,
+            "product_price": float(row.search_price) if row.search_price else None,
+            "interaction_type": row.interaction_type,
+            "created_at": row.created_at,
+            "context": row.context,
+            "query": row.query,
+        }
+        for row in results
+    ]
+
+    body = orjson.dumps(
+        {
+            "interactions": interactions,
+            "total": total,
+            "limit": limit,
+            "next_cursor": next_cursor,
+        }
     )
 
+    return _conditional_response(body, if_none_match, etag)
+
+
+def _encode_history_cursor(created_at: datetime, interaction_id: UUID) -> str:
+    """Encode a history page position as an opaque URL-safe cursor."""
+    raw = f"{created_at.isoformat()}|{interaction_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def _decode_history_cursor(cursor: str) -> Tuple[datetime, UUID]:
+    """
+    Decode a cursor produced by _encode_history_cursor.
+
+    Raises:
+        HTTPException: 400 if the cursor is malformed
+    """
+    try:
+        created_at, interaction_id = (
+            base64.urlsafe_b64decode(cursor.encode()).decode().split("|", 1)
+        )
+        return datetime.fromisoformat(created_at), UUID(interaction_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor",
+        )
+
 
 @router.get("/me/stats", response_model=UserStatsResponse)
 async def get_user_stats(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    if_none_match: Optional[str] = Header(None),
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db),
+    cache: EmbeddingCache = Depends(get_embedding_cache),
 ):
     """
     Get user statistics and insights.
-    """
-    # Get interaction counts by type
-    interaction_counts = (
-        db.query(UserInteraction.interaction_type, func.count(UserInteraction.id).label("count"))
-        .filter(UserInteraction.user_id == current_user.id)
-        .group_by(UserInteraction.interaction_type)
-        .all()
-    )
-
-    counts_map = {row[0]: row[1] for row in interaction_counts}
-
-    # Get favorite categories (top interacted categories)
-    category_stats = (
-        db.query(Product.category, func.count(UserInteraction.id).label("interaction_count"))
-        .join(UserInteraction, Product.product_id == UserInteraction.product_id)
-        .filter(UserInteraction.user_id == current_user.id)
-        .filter(Product.category.isnot(None))
-        .group_by(Product.category)
-        .order_by(desc("interaction_count"))
-        .limit(10)
-        .all()
-    )
-
-    favorite_categories = [{"category": row[0], "count": row[1]} for row in category_stats]
-
-    # Get favorite brands
-    brand_stats = (
-        db.query(Product.brand, func.count(UserInteraction.id).label("interaction_count"))
-        .join(UserInteraction, Product.product_id == UserInteraction.product_id)
-        .filter(UserInteraction.user_id == current_user.id)
-        .filter(Product.brand.isnot(None))
-        .group_by(Product.brand)
-        .order_by(desc("interaction_count"))
-        .limit(10)
-        .all()
-    )
 
-    favorite_brands = [{"brand": row[0], "count": row[1]} for row in brand_stats]
+    The aggregates change slowly, so the serialized response is cached per
+    user for a few minutes (and dropped when the user sends feedback).
+    Responses carry an ETag of the payload for conditional requests.
+    """
+    cache_key = f"{CacheConfig.USER_STATS_PREFIX}{current_user.id}"
+    cached = await asyncio.to_thread(cache.redis.get, cache_key)
+    if cached is not None:
+        return _conditional_response(cached, if_none_match)
 
-    # Get average price point
-    avg_price = (
-        db.query(func.avg(Product.price))
-        .join(UserInteraction, Product.product_id == UserInteraction.product_id)
-        .filter(UserInteraction.user_id == current_user.id)
-        .scalar()
-    )
+    row = (await db.execute(USER_STATS_QUERY, {"user_id": current_user.id})).one()
 
     # Calculate account age
     account_age = (datetime.utcnow() - current_user.created_at).days
 
-    return UserStatsResponse(
+    stats = UserStatsResponse(
         total_interactions=current_user.total_interactions,
-        total_views=counts_map.get("view", 0),
-        total_clicks=counts_map.get("click", 0),
-        total_likes=counts_map.get("like", 0),
-        total_cart_adds=counts_map.get("add_to_cart", 0),
-        total_purchases=counts_map.get("purchase", 0),
-        favorite_categories=favorite_categories,
-        favorite_brands=favorite_brands,
-        avg_price_point=float(avg_price) if avg_price else None,
+        total_views=current_user.total_views,
+        total_clicks=current_user.total_clicks,
+        total_likes=current_user.total_likes,
+        total_cart_adds=current_user.total_cart_adds,
+        total_purchases=current_user.total_purchases,
+        favorite_categories=row.favorite_categories,
+        favorite_brands=row.favorite_brands,
+        avg_price_point=row.avg_price,
         account_age_days=account_age,
         last_active=current_user.last_active,
     )
 
+    body = stats.model_dump_json().encode()
+    await asyncio.to_thread(cache.redis.set, cache_key, body, ttl=CacheConfig.TTL_USER_STATS)
+
+    return _conditional_response(body, if_none_match)
+
 
 @router.put("/me/preferences", response_model=UserResponse)
 async def update_user_preferences(
     preferences: UserPreferencesUpdate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """
     Update user preferences.
-    """
-    # Update fields if provided
-    if preferences.preferred_categories is not None:
-        current_user.preferred_categories = preferences.preferred_categories
-
-    if preferences.price_band_min is not None:
-        current_user.price_band_min = preferences.price_band_min
-
-    if preferences.price_band_max is not None:
-        current_user.price_band_max = preferences.price_band_max
 
-    if preferences.style_preferences is not None:
-        current_user.style_preferences = preferences.style_preferences
-
-    if preferences.brand_affinities is not None:
-        current_user.brand_affinities = preferences.brand_affinities
-
-    current_user.updated_at = datetime.utcnow()
+    Issues a single UPDATE ... RETURNING for the UserResponse columns, so the
+    row is not re-read after the commit.
+    """
+    # Only fields that were provided are updated
+    values = preferences.model_dump(exclude_none=True)
+
+    row = (
+        await db.execute(
+            update(User.__table__)
+            .where(User.__table__.c.id == current_user.id)
+            .values(**values, updated_at=func.now())
+            .returning(*USER_RESPONSE_RETURNING)
+        )
+    ).one()
 
-    db.commit()
-    db.refresh(current_user)
+    await db.commit()
 
-    return UserResponse.model_validate(current_user)
+    return UserResponse.model_validate(row)
@@ -5,12 +5,42 @@ Pydantic models for user registration, login, and token management.
 
 from __future__ import annotations
 
+import re
 from datetime import datetime
 from typing import Optional
 from uuid import UUID
 
 from pydantic import BaseModel, EmailStr, Field, field_validator
 
+# Passwords that satisfy every strength rule, checked in a single scan
+_PW_RE = re.compile(r"(?=.*[A-Z])(?=.*[a-z])(?=.*\d).{8,}", re.DOTALL)
+
+
+def _validate_password(v: str) -> str:
+    """
+    Validate password strength.
+
+    Most passwords pass the precompiled regex; only on a miss are the rules
+    checked one by one to report which one failed (and to accept non-ASCII
+    upper/lowercase letters and digits, which the regex does not cover).
+    """
+    if _PW_RE.fullmatch(v):
+        return v
+
+    if len(v) < 8:
+        raise ValueError("Password must be at least 8 characters long")
+
+    if not any(c.isupper() for c in v):
+        raise ValueError("Password must contain at least one uppercase letter")
+
+    if not any(c.islower() for c in v):
+        raise ValueError("Password must contain at least one lowercase letter")
+
+    if not any(c.isdigit() for c in v):
+        raise ValueError("Password must contain at least one digit")
+
+    return v
+
 
 class UserRegisterRequest(BaseModel):
     """Request schema for user registration."""
@@ -22,19 +52,7 @@ class UserRegisterRequest(BaseModel):
     @classmethod
     def validate_password(cls, v: str) -> str:
         """Validate password strength."""
-        if len(v) < 8:
-            raise ValueError("Password must be at least 8 characters long")
-
-        if not any(c.isupper() for c in v):
-            raise ValueError("Password must contain at least one uppercase letter")
-
-        if not any(c.islower() for c in v):
-            raise ValueError("Password must contain at least one lowercase letter")
-
-        if not any(c.isdigit() for c in v):
-            raise ValueError("Password must contain at least one digit")
-
-        return v
+        return _validate_password(v)
 
 
 class UserLoginRequest(BaseModel):
@@ -87,19 +105,7 @@ class ChangePasswordRequest(BaseModel):
     @classmethod
     def validate_new_password(cls, v: str) -> str:
         """Validate new password strength."""
-        if len(v) < 8:
-            raise ValueError("Password must be at least 8 characters long")
-
-        if not any(c.isupper() for c in v):
-            raise ValueError("Password must contain at least one uppercase letter")
-
-        if not any(c.islower() for c in v):
-            raise ValueError("Password must contain at least one lowercase letter")
-
-        if not any(c.isdigit() for c in v):
-            raise ValueError("Password must contain at least one digit")
-
-        return v
+        return _validate_password(v)
 
 
 class UpdateProfileRequest(BaseModel):
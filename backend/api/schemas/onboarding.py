@@ -4,6 +4,7 @@ Handles user onboarding flow including style quiz and preference setup.
 """
 
 from typing import Any, Dict, List, Optional
+from uuid import UUID
 
 from pydantic import BaseModel, Field, field_validator
 
@@ -36,7 +37,7 @@ class OnboardingProductsResponse(BaseModel):
 class OnboardingCompleteRequest(BaseModel):
     """Request to complete onboarding with style preferences."""
 
-    selected_product_ids: List[str] = Field(
+    selected_product_ids: List[UUID] = Field(
         ..., min_length=3, max_length=5, description="3-5 product IDs selected from moodboard"
     )
     price_min: Optional[float] = Field(None, ge=0, description="Minimum price preference")
@@ -59,6 +60,9 @@ class OnboardingCompleteResponse(BaseModel):
     user_id: str
     onboarded: bool
     embedding_created: bool
+    embedding_status: str = Field(
+        "created", description="Embedding state: created, scheduled (saved in background) or failed"
+    )
     preferences_saved: bool
     selected_products_count: int
     message: str
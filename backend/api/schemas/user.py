@@ -49,7 +49,7 @@ class UserStatsResponse(BaseModel):
 class InteractionHistoryItem(BaseModel):
     """Single interaction history item."""
 
-    interaction_id: int
+    interaction_id: str  # UUID
     product_id: str
     product_title: Optional[str]
     product_image_url: Optional[str]
@@ -66,9 +66,9 @@ class InteractionHistoryResponse(BaseModel):
     """Response schema for interaction history."""
 
     interactions: List[InteractionHistoryItem]
-    total: int
-    offset: int
+    total: Optional[int] = None  # Only set when requested with include_total
     limit: int
+    next_cursor: Optional[str] = None  # Pass as ?cursor= to fetch the next page
 
 
 class FavoriteProduct(BaseModel):
@@ -4,7 +4,11 @@ Provides password hashing, JWT token creation/verification, and user validation.
 """
 
 import os
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta
+from functools import lru_cache
 from typing import Optional
 from uuid import UUID
 
@@ -24,6 +28,19 @@ ALGORITHM = os.getenv("JWT_ALGORITHM", "HS256")
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30"))
 REFRESH_TOKEN_EXPIRE_DAYS = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", "7"))
 
+# Per-process cache of decoded tokens, keyed by the raw JWT string.
+# SPAs reuse the same access token for its whole lifetime, so this skips
+# the signature verification on almost every request.
+TOKEN_CACHE_TTL_SECONDS = int(os.getenv("TOKEN_CACHE_TTL_SECONDS", "60"))
+TOKEN_CACHE_MAX_SIZE = int(os.getenv("TOKEN_CACHE_MAX_SIZE", "50000"))
+
+# Fixed hash for dummy_verify_password (computed on first use)
+_dummy_password_hash: Optional[str] = None
+
+_INVALID_TOKEN = object()  # Sentinel for cached verification failures
+_token_cache: "OrderedDict[str, tuple[float, object]]" = OrderedDict()
+_token_cache_lock = threading.Lock()
+
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """
@@ -39,6 +56,20 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 
+def dummy_verify_password() -> None:
+    """
+    Run a bcrypt verify against a fixed hash and discard the result.
+
+    Used on login paths that reject a request without checking a real
+    password (unknown email, disabled account) so they take the same time
+    as a genuine password check and do not reveal whether the account exists.
+    """
+    global _dummy_password_hash
+    if _dummy_password_hash is None:
+        _dummy_password_hash = pwd_context.hash("dummy-password-for-timing")
+    pwd_context.verify("not-the-dummy-password", _dummy_password_hash)
+
+
 def hash_password(password: str) -> str:
     """
     Hash a plain text password using bcrypt.
@@ -92,18 +123,15 @@ def create_refresh_token(data: dict) -> str:
     return encoded_jwt
 
 
-def verify_token(token: str) -> Optional[dict]:
+def _decode_token(token: str) -> Optional[dict]:
     """
-    Verify and decode a JWT token.
+    Decode a JWT token, verifying its signature and expiration.
 
     Args:
         token: JWT token string
 
     Returns:
         Decoded token payload if valid, None if invalid
-
-    Raises:
-        JWTError: If token is invalid or expired
     """
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
@@ -112,6 +140,72 @@ def verify_token(token: str) -> Optional[dict]:
         return None
 
 
+def verify_token(token: str) -> Optional[dict]:
+    """
+    Verify and decode a JWT token.
+
+    Results are cached per process for TOKEN_CACHE_TTL_SECONDS. The token's
+    own `exp` claim is re-checked on every cache hit, so a cached payload is
+    never returned after the token has expired.
+
+    Args:
+        token: JWT token string
+
+    Returns:
+        Decoded token payload if valid, None if invalid
+    """
+    now = time.time()
+
+    with _token_cache_lock:
+        entry = _token_cache.get(token)
+        if entry is not None:
+            cached_at, payload = entry
+            if now - cached_at < TOKEN_CACHE_TTL_SECONDS:
+                if payload is _INVALID_TOKEN:
+                    return None
+                exp = payload.get("exp")
+                if exp is None or exp > now:
+                    _token_cache.move_to_end(token)
+                    return payload
+            del _token_cache[token]
+
+    payload = _decode_token(token)
+
+    with _token_cache_lock:
+        _token_cache[token] = (now, payload if payload is not None else _INVALID_TOKEN)
+        if len(_token_cache) > TOKEN_CACHE_MAX_SIZE:
+            _token_cache.popitem(last=False)
+
+    return payload
+
+
+def clear_token_cache() -> None:
+    """Clear the decoded token cache (useful for testing)."""
+    with _token_cache_lock:
+        _token_cache.clear()
+
+
+@lru_cache(maxsize=50_000)
+def parse_user_id(subject: str) -> Optional[UUID]:
+    """
+    Parse the `sub` claim of a token into a user UUID.
+
+    Tokens carry the user ID as 32 hex characters (older tokens use the
+    dashed form; both parse). Results are memoized since the same token is
+    presented on every request for its whole lifetime.
+
+    Args:
+        subject: Value of the token's `sub` claim
+
+    Returns:
+        User UUID, or None if the claim is not a valid UUID
+    """
+    try:
+        return UUID(hex=subject)
+    except (ValueError, TypeError, AttributeError):
+        return None
+
+
 def get_user_id_from_token(token: str) -> Optional[UUID]:
     """
     Extract user ID from a JWT token.
@@ -130,10 +224,7 @@ def get_user_id_from_token(token: str) -> Optional[UUID]:
     if user_id is None:
         return None
 
-    try:
-        return UUID(user_id)
-    except (ValueError, AttributeError):
-        return None
+    return parse_user_id(user_id)
 
 
 def validate_password_strength(password: str) -> tuple[bool, Optional[str]]:
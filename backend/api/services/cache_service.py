@@ -8,13 +8,42 @@ import logging
 import time
 from collections import defaultdict
 from datetime import datetime, timedelta
-from typing import Any, Dict, List, Optional, Set
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+import orjson
 
 from ...ml.caching import EmbeddingCache
 
 logger = logging.getLogger(__name__)
 
 
+def _orjson_default(obj: Any) -> Any:
+    """
+    Serialize Pydantic models (e.g. ProductResult) found in cached responses.
+
+    The cached response models declare no aliases, computed fields or custom
+    serializers, so a model's field values are exactly its __dict__. Handing
+    that to orjson as-is avoids building an intermediate dict per result with
+    model_dump(); nested models come back through this hook.
+    """
+    if hasattr(obj, "model_dump"):
+        return obj.__dict__
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def _encode_response(results: Any) -> bytes:
+    """Encode a response model or dict as orjson bytes (stored raw, without pickling)."""
+    return orjson.dumps(results, default=_orjson_default, option=orjson.OPT_SERIALIZE_NUMPY)
+
+
+def _decode_response(cached: Any) -> Optional[Dict[str, Any]]:
+    """Decode a cached response (orjson bytes, or a dict pickled by older versions)."""
+    if isinstance(cached, bytes):
+        return orjson.loads(cached)
+    return cached
+
+
 class CacheConfig:
     """Cache configuration and TTL policies."""
 
@@ -25,6 +54,22 @@ class CacheConfig:
     TTL_USER_EMBEDDINGS = 1800  # 30 minutes
     TTL_HOT_EMBEDDINGS = 7200  # 2 hours
     TTL_POPULAR_QUERIES = 600  # 10 minutes
+    TTL_USER_STATS = 300  # 5 minutes (also invalidated on feedback)
+
+    # Per-user response cache for GET /users/me/stats
+    USER_STATS_PREFIX = "user_stats:"
+
+    # Per-user response cache for GET /users/me/favorites (stale-while-revalidate):
+    # fresh entries are served as-is, stale ones are served while a background
+    # refresh runs, and older ones are only kept as a fallback for DB errors
+    USER_FAVORITES_PREFIX = "user_favorites:"
+    FAVORITES_FRESH_SECONDS = 30
+    FAVORITES_STALE_SECONDS = 300
+    TTL_USER_FAVORITES = 3600
+
+    # Per-user set indexes of cached result keys (for invalidation)
+    SEARCH_INDEX_PREFIX = "idx:search:"
+    RECOMMEND_INDEX_PREFIX = "idx:rec:"
 
     # Cache warming
     POPULAR_QUERY_THRESHOLD = 5  # Query must appear 5+ times
@@ -137,12 +182,12 @@ class CacheService:
         Returns:
             Cached search results or None
         """
-        start_time = time.time()
+        start_ns = time.perf_counter_ns()
 
         try:
-            result = self.cache.redis.get(cache_key)
+            result = _decode_response(self.cache.redis.get(cache_key))
 
-            elapsed_ms = (time.time() - start_time) * 1000
+            elapsed_ms = (time.perf_counter_ns() - start_ns) / 1e6
             self.stats.total_get_time_ms += elapsed_ms
 
             if result:
@@ -160,33 +205,42 @@ class CacheService:
             return None
 
     def set_search_results(
-        self, cache_key: str, results: Dict[str, Any], ttl: Optional[int] = None
+        self,
+        cache_key: str,
+        results: Any,
+        ttl: Optional[int] = None,
+        user_id: Optional[str] = None,
     ) -> bool:
         """
         Cache search results.
 
         Args:
             cache_key: Cache key
-            results: Search results to cache
+            results: Search response (model or dict) to cache
             ttl: Time-to-live in seconds (default: config TTL)
+            user_id: Owning user; indexes the key for per-user invalidation
 
         Returns:
             True if cached successfully
         """
-        start_time = time.time()
+        start_ns = time.perf_counter_ns()
         ttl = ttl or self.config.TTL_SEARCH_RESULTS
 
         try:
-            # Convert Pydantic models to dicts
-            cacheable_data = results.copy()
-            if "results" in cacheable_data:
-                cacheable_data["results"] = [
-                    r.dict() if hasattr(r, "dict") else r for r in cacheable_data["results"]
-                ]
-
-            success = self.cache.redis.set(cache_key, cacheable_data, ttl=ttl)
+            # Pydantic models are dumped by the orjson default hook
+            cacheable_data = _encode_response(results)
+
+            if user_id is not None:
+                success = self.cache.redis.set_indexed(
+                    cache_key,
+                    cacheable_data,
+                    index_key=f"{self.config.SEARCH_INDEX_PREFIX}{user_id}",
+                    ttl=ttl,
+                )
+            else:
+                success = self.cache.redis.set(cache_key, cacheable_data, ttl=ttl)
 
-            elapsed_ms = (time.time() - start_time) * 1000
+            elapsed_ms = (time.perf_counter_ns() - start_ns) / 1e6
             self.stats.total_set_time_ms += elapsed_ms
 
             if success:
@@ -202,12 +256,12 @@ class CacheService:
 
     def get_recommend_results(self, cache_key: str) -> Optional[Dict[str, Any]]:
         """Get cached recommendation results."""
-        start_time = time.time()
+        start_ns = time.perf_counter_ns()
 
         try:
-            result = self.cache.redis.get(cache_key)
+            result = _decode_response(self.cache.redis.get(cache_key))
 
-            elapsed_ms = (time.time() - start_time) * 1000
+            elapsed_ms = (time.perf_counter_ns() - start_ns) / 1e6
             self.stats.total_get_time_ms += elapsed_ms
 
             if result:
@@ -222,20 +276,69 @@ class CacheService:
             logger.error(f"Failed to get recommend results: {e}")
             return None
 
+    def get_recommend_results_and_embeddings(
+        self, cache_key: Optional[str], user_id: str
+    ) -> Tuple[Optional[Dict[str, Any]], Dict[str, Optional[np.ndarray]]]:
+        """
+        Get cached recommendation results and the user's embeddings in one MGET.
+
+        Args:
+            cache_key: Response cache key (None to skip the response lookup)
+            user_id: User whose long-term and session embeddings to read
+
+        Returns:
+            Tuple of (cached results or None, dict with 'long_term' and 'session')
+        """
+        start_ns = time.perf_counter_ns()
+        keys = list(self.cache.user_embedding_keys(user_id))
+        if cache_key is not None:
+            keys.append(cache_key)
+
+        # get_many() logs Redis errors itself and returns {}
+        cached = self.cache.redis.get_many(keys)
+        embeddings = self.cache.decode_user_embeddings(user_id, cached)
+
+        if cache_key is None:
+            return None, embeddings
+
+        try:
+            result = _decode_response(cached.get(cache_key))
+        except Exception as e:
+            self.stats.record_error()
+            logger.error(f"Failed to decode recommend results: {e}")
+            return None, embeddings
+
+        self.stats.total_get_time_ms += (time.perf_counter_ns() - start_ns) / 1e6
+
+        if result:
+            self.stats.record_hit("recommend")
+        else:
+            self.stats.record_miss("recommend")
+
+        return result, embeddings
+
     def set_recommend_results(
-        self, cache_key: str, results: Dict[str, Any], ttl: Optional[int] = None
+        self,
+        cache_key: str,
+        results: Any,
+        ttl: Optional[int] = None,
+        user_id: Optional[str] = None,
     ) -> bool:
-        """Cache recommendation results."""
+        """Cache a recommendation response (indexed per user if user_id is given)."""
         ttl = ttl or self.config.TTL_RECOMMEND_RESULTS
 
         try:
-            cacheable_data = results.copy()
-            if "results" in cacheable_data:
-                cacheable_data["results"] = [
-                    r.dict() if hasattr(r, "dict") else r for r in cacheable_data["results"]
-                ]
-
-            success = self.cache.redis.set(cache_key, cacheable_data, ttl=ttl)
+            cacheable_data = _encode_response(results)
+
+            if user_id is not None:
+                success = self.cache.redis.set_indexed(
+                    cache_key,
+                    cacheable_data,
+                    index_key=f"{self.config.RECOMMEND_INDEX_PREFIX}{user_id}",
+                    ttl=ttl,
+                )
+            else:
+                success = self.cache.redis.set(cache_key, cacheable_data, ttl=ttl)
 
             if success:
                 self.stats.record_set()
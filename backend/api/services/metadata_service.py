@@ -4,16 +4,61 @@ Fetches and enriches product metadata from database.
 """
 
 import logging
+import math
 from typing import Dict, List, Optional
 
 from sqlalchemy import text
 from sqlalchemy.orm import Session
 
 from ...ml.caching import EmbeddingCache
+from ...ml.retrieval import SearchResult
 from ..models.search import ProductResult
 
 logger = logging.getLogger(__name__)
 
+METADATA_CACHE_PREFIX = "product_metadata:"
+METADATA_CACHE_TTL = 3600  # 1 hour
+
+# Over-fetch sizing: fraction of search results that survive enrichment
+# (active, with a usable image), tracked as an exponential moving average
+ENRICH_SURVIVAL_ALPHA = 0.05
+ENRICH_SURVIVAL_FLOOR = 0.25  # Never over-fetch more than 4x (before headroom)
+ENRICH_OVERFETCH_HEADROOM = 1.2
+
+# Binding the ids as one uuid[] keeps a single statement for any batch size
+# and lets Postgres probe the primary key (comparing id::text cannot)
+PRODUCTS_BY_IDS = text(
+    """
+    SELECT
+        id,
+        product_name,
+        description,
+        search_price,
+        currency,
+        COALESCE(merchant_image_url, aw_image_url, large_image) as image_url,
+        merchant_id,
+        merchant_name,
+        brand_name,
+        brand_id,
+        in_stock,
+        stock_quantity,
+        category_id,
+        category_name,
+        aw_deep_link,
+        rrp_price,
+        colour,
+        fashion_category,
+        fashion_size,
+        quality_score
+    FROM products
+    WHERE id = ANY(CAST(:product_ids AS uuid[]))
+        AND is_active = true
+        AND COALESCE(merchant_image_url, aw_image_url, large_image) IS NOT NULL
+        AND COALESCE(merchant_image_url, aw_image_url, large_image) != ''
+        AND COALESCE(merchant_image_url, aw_image_url, large_image) ~ '^https?://'
+"""
+)
+
 
 class MetadataService:
     """
@@ -31,8 +76,24 @@ class MetadataService:
         """
         self.cache = cache or EmbeddingCache()
 
+        # Starts optimistic; the first enrichments pull it toward the real rate
+        self.enrich_survival_rate = 1.0
+
         logger.info("Metadata service initialized")
 
+    def overfetch_k(self, needed: int) -> int:
+        """
+        Number of search results to request so that `needed` survive enrichment.
+
+        Args:
+            needed: Results required after enrichment (offset + limit)
+
+        Returns:
+            Search k, sized from the observed enrichment survival rate
+        """
+        survival = max(self.enrich_survival_rate, ENRICH_SURVIVAL_FLOOR)
+        return max(needed, math.ceil(needed / survival * ENRICH_OVERFETCH_HEADROOM))
+
     def enrich_results(
         self, product_ids: List[int], scores: Dict[int, Dict[str, float]], db: Session
     ) -> List[ProductResult]:
@@ -66,44 +127,119 @@ class MetadataService:
             # Get scores for this product
             product_scores = scores.get(product_id, {})
 
-            # Create ProductResult
-            result = ProductResult(
-                product_id=str(product_id),
-                title=product_data.get("title", "Unknown Product"),
-                description=product_data.get("description"),
-                price=product_data.get("price", 0.0),
-                currency=product_data.get("currency", "GBP"),
-                image_url=product_data.get("image_url"),
-                merchant_id=product_data.get("merchant_id"),
-                merchant_name=product_data.get("merchant_name"),
-                brand=product_data.get("brand"),
-                brand_id=product_data.get("brand_id"),
-                in_stock=product_data.get("in_stock", True),
-                stock_quantity=product_data.get("stock_quantity"),
-                category_id=product_data.get("category_id"),
-                category_name=product_data.get("category_name"),
-                product_url=product_data.get("product_url"),
-                rrp_price=product_data.get("rrp_price"),
-                colour=product_data.get("colour"),
-                fashion_category=product_data.get("fashion_category"),
-                fashion_size=product_data.get("fashion_size"),
-                quality_score=product_data.get("quality_score"),
-                rating=product_data.get("rating"),
-                review_count=product_data.get("review_count"),
-                similarity=product_scores.get("similarity", 0.0),
-                rank=rank,
-                final_score=product_scores.get("final_score"),
-                popularity_score=product_scores.get("popularity_score"),
-                price_affinity_score=product_scores.get("price_affinity_score"),
-                brand_match_score=product_scores.get("brand_match_score"),
+            enriched_results.append(
+                self._build_result(
+                    product_id,
+                    product_data,
+                    rank,
+                    similarity=product_scores.get("similarity", 0.0),
+                    final_score=product_scores.get("final_score"),
+                    popularity_score=product_scores.get("popularity_score"),
+                    price_affinity_score=product_scores.get("price_affinity_score"),
+                    brand_match_score=product_scores.get("brand_match_score"),
+                )
             )
 
-            enriched_results.append(result)
+        logger.debug(f"Enriched {len(enriched_results)} product results")
+
+        return enriched_results
+
+    def enrich_search_results(
+        self, results: List[SearchResult], db: Session
+    ) -> List[ProductResult]:
+        """
+        Enrich ML search results with product metadata.
+
+        Reads scores straight off each SearchResult, so callers don't build
+        a per-product score dict first.
+
+        Args:
+            results: Search results (in rank order)
+            db: Database session
+
+        Returns:
+            List of enriched ProductResult objects
+        """
+        if not results:
+            return []
+
+        # Fetch product metadata from database
+        products_data = self._fetch_products_batch([r.product_id for r in results], db)
+
+        enriched_results = []
+
+        for rank, result in enumerate(results):
+            product_data = products_data.get(result.product_id)
+
+            if not product_data:
+                logger.warning(f"Product {result.product_id} not found in database")
+                continue
+
+            metadata = result.metadata
+            enriched_results.append(
+                self._build_result(
+                    result.product_id,
+                    product_data,
+                    rank,
+                    similarity=result.similarity,
+                    final_score=metadata.get("final_score", result.similarity),
+                    popularity_score=metadata.get("popularity_score"),
+                    price_affinity_score=metadata.get("price_affinity_score"),
+                    brand_match_score=metadata.get("brand_match_score"),
+                )
+            )
 
         logger.debug(f"Enriched {len(enriched_results)} product results")
 
+        self.enrich_survival_rate += ENRICH_SURVIVAL_ALPHA * (
+            len(enriched_results) / len(results) - self.enrich_survival_rate
+        )
+
         return enriched_results
 
+    @staticmethod
+    def _build_result(
+        product_id,
+        product_data: Dict,
+        rank: int,
+        similarity: float,
+        final_score: Optional[float],
+        popularity_score: Optional[float],
+        price_affinity_score: Optional[float],
+        brand_match_score: Optional[float],
+    ) -> ProductResult:
+        """Create a ProductResult from cached/fetched product data and its scores."""
+        return ProductResult(
+            product_id=str(product_id),
+            title=product_data.get("title", "Unknown Product"),
+            description=product_data.get("description"),
+            price=product_data.get("price", 0.0),
+            currency=product_data.get("currency", "GBP"),
+            image_url=product_data.get("image_url"),
+            merchant_id=product_data.get("merchant_id"),
+            merchant_name=product_data.get("merchant_name"),
+            brand=product_data.get("brand"),
+            brand_id=product_data.get("brand_id"),
+            in_stock=product_data.get("in_stock", True),
+            stock_quantity=product_data.get("stock_quantity"),
+            category_id=product_data.get("category_id"),
+            category_name=product_data.get("category_name"),
+            product_url=product_data.get("product_url"),
+            rrp_price=product_data.get("rrp_price"),
+            colour=product_data.get("colour"),
+            fashion_category=product_data.get("fashion_category"),
+            fashion_size=product_data.get("fashion_size"),
+            quality_score=product_data.get("quality_score"),
+            rating=product_data.get("rating"),
+            review_count=product_data.get("review_count"),
+            similarity=similarity,
+            rank=rank,
+            final_score=final_score,
+            popularity_score=popularity_score,
+            price_affinity_score=price_affinity_score,
+            brand_match_score=brand_match_score,
+        )
+
     def _fetch_products_batch(self, product_ids: List[int], db: Session) -> Dict[int, Dict]:
         """
         Fetch product metadata in batch.
@@ -122,60 +258,26 @@ class MetadataService:
 
         logger.debug(f"Fetching metadata for {len(product_ids)} products")
 
-        # Check cache first
+        # Check cache first (one MGET for the whole batch)
+        cached = self.cache.redis.get_many([f"{METADATA_CACHE_PREFIX}{pid}" for pid in product_ids])
         products_data = {}
         uncached_ids = []
 
         for product_id in product_ids:
-            cached = self.get_cached_metadata(product_id)
-            if cached:
-                products_data[product_id] = cached
+            product_data = cached.get(f"{METADATA_CACHE_PREFIX}{product_id}")
+            if product_data:
+                products_data[product_id] = product_data
             else:
                 uncached_ids.append(product_id)
 
-        # Fetch uncached products from database
+        # Fetch uncached products from database in one query
         if uncached_ids:
             logger.debug(f"Cache miss for {len(uncached_ids)} products, fetching from DB")
 
-            # Convert integer IDs to UUID strings for query
-            # Note: The database uses UUID primary keys, so we need to handle the mapping
-            # For now, we'll query by product_id as integer (assuming index on products table)
-
-            query = text(
-                """
-                SELECT
-                    id,
-                    product_name,
-                    description,
-                    search_price,
-                    currency,
-                    COALESCE(merchant_image_url, aw_image_url, large_image) as image_url,
-                    merchant_id,
-                    merchant_name,
-                    brand_name,
-                    brand_id,
-                    in_stock,
-                    stock_quantity,
-                    category_id,
-                    category_name,
-                    aw_deep_link,
-                    rrp_price,
-                    colour,
-                    fashion_category,
-                    fashion_size,
-                    quality_score
-                FROM products
-                WHERE id::text = ANY(:product_ids)
-                    AND is_active = true
-                    AND COALESCE(merchant_image_url, aw_image_url, large_image) IS NOT NULL
-                    AND COALESCE(merchant_image_url, aw_image_url, large_image) != ''
-                    AND COALESCE(merchant_image_url, aw_image_url, large_image) ~ '^https?://'
-            """
-            )
-
             try:
-                result = db.execute(query, {"product_ids": uncached_ids})
+                result = db.execute(PRODUCTS_BY_IDS, {"product_ids": uncached_ids})
                 rows = result.fetchall()
+                to_cache = {}
 
                 for row in rows:
                     # Convert UUID to string for consistent key format
@@ -207,9 +309,10 @@ class MetadataService:
                     }
 
                     products_data[product_id] = product_data
+                    to_cache[f"{METADATA_CACHE_PREFIX}{product_id}"] = product_data
 
-                    # Cache the product metadata (1 hour TTL)
-                    self.cache_product_metadata(product_id, product_data, ttl=3600)
+                # Cache the product metadata in one pipelined write
+                self.cache.redis.set_many(to_cache, ttl=METADATA_CACHE_TTL)
 
                 logger.info(f"Fetched {len(rows)} products from database")
 
@@ -219,7 +322,9 @@ class MetadataService:
 
         return products_data
 
-    def cache_product_metadata(self, product_id: int, metadata: Dict, ttl: int = 3600) -> bool:
+    def cache_product_metadata(
+        self, product_id: int, metadata: Dict, ttl: int = METADATA_CACHE_TTL
+    ) -> bool:
         """
         Cache product metadata in Redis.
 
@@ -231,7 +336,7 @@ class MetadataService:
         Returns:
             True if cached successfully
         """
-        cache_key = f"product_metadata:{product_id}"
+        cache_key = f"{METADATA_CACHE_PREFIX}{product_id}"
 
         try:
             return self.cache.redis.set(cache_key, metadata, ttl=ttl)
@@ -249,7 +354,7 @@ class MetadataService:
         Returns:
             Product metadata or None if not cached
         """
-        cache_key = f"product_metadata:{product_id}"
+        cache_key = f"{METADATA_CACHE_PREFIX}{product_id}"
 
         try:
             return self.cache.redis.get(cache_key)
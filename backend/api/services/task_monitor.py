@@ -262,7 +262,7 @@ class CeleryTaskMonitor:
 
         tasks = [self._task_exec_to_response(task_exec) for task_exec in task_execs]
 
-        return TaskExecutionListResponse(
+        return TaskExecutionListResponse.model_construct(
             tasks=tasks,
             total=total,
             page=page,
@@ -513,7 +513,12 @@ class CeleryTaskMonitor:
         )
 
     def _task_exec_to_response(self, task_exec: TaskExecution) -> TaskExecutionResponse:
-        """Convert TaskExecution ORM model to Pydantic response."""
+        """
+        Convert TaskExecution ORM model to Pydantic response.
+
+        Column values are already typed by the database, so the models are
+        built with model_construct and skip per-field validation.
+        """
         progress = None
         if any(
             [
@@ -523,14 +528,14 @@ class CeleryTaskMonitor:
                 task_exec.progress_message is not None,
             ]
         ):
-            progress = TaskProgressInfo(
+            progress = TaskProgressInfo.model_construct(
                 percent=task_exec.progress_percent,
                 current=task_exec.progress_current,
                 total=task_exec.progress_total,
                 message=task_exec.progress_message,
             )
 
-        return TaskExecutionResponse(
+        return TaskExecutionResponse.model_construct(
             id=task_exec.id,
             task_id=task_exec.task_id,
             task_name=task_exec.task_name,
@@ -539,7 +544,7 @@ class CeleryTaskMonitor:
             progress=progress,
             args=task_exec.args,
             kwargs=task_exec.kwargs,
-            metadata=task_exec.metadata,
+            metadata=task_exec.task_metadata,
             worker_name=task_exec.worker_name,
             queue_name=task_exec.queue_name,
             retries=task_exec.retries,
@@ -105,6 +105,12 @@ class User(Base):
     total_interactions = Column(
         Integer, nullable=False, server_default="0", comment="Total number of user interactions"
     )
+    # Per-type counts, maintained by a trigger on user_interactions (see db/triggers.py)
+    total_views = Column(Integer, nullable=False, server_default="0")
+    total_clicks = Column(Integer, nullable=False, server_default="0")
+    total_likes = Column(Integer, nullable=False, server_default="0")
+    total_cart_adds = Column(Integer, nullable=False, server_default="0")
+    total_purchases = Column(Integer, nullable=False, server_default="0")
 
     # Relationships
     embeddings = relationship("UserEmbedding", back_populates="user", cascade="all, delete-orphan")
@@ -248,7 +254,14 @@ class UserInteraction(Base):
 
     # Indexes for common queries
     __table_args__ = (
-        Index("idx_user_interactions_user_created", "user_id", "created_at"),
+        # id breaks created_at ties for keyset pagination of a user's history
+        Index("idx_user_interactions_user_created_id", "user_id", "created_at", "id"),
+        # Covers the stats aggregates so they can use an index-only scan
+        Index(
+            "idx_user_interactions_user_stats",
+            "user_id",
+            postgresql_include=["product_id", "interaction_type"],
+        ),
         Index("idx_user_interactions_session", "session_id", "created_at"),
         Index("idx_user_interactions_type_created", "interaction_type", "created_at"),
         Index(
@@ -397,6 +410,12 @@ class Product(Base):
     # Unique constraint
     __table_args__ = (
         Index("idx_products_merchant_unique", "merchant_id", "merchant_product_id", unique=True),
+        # Interaction joins in the user stats query and count views read only these columns
+        Index(
+            "idx_products_id_stats",
+            "id",
+            postgresql_include=["search_price", "category_name", "brand_name"],
+        ),
     )
 
     def __repr__(self):
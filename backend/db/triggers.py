@@ -0,0 +1,84 @@
+"""
+Triggers.
+
+Interaction counters on users (total and per type, plus last_active),
+maintained by a statement-level trigger on user_interactions so that
+writers never update the users row themselves and the user stats endpoint
+can read the counts from the user row instead of aggregating interactions.
+Create the trigger with create_interaction_counter_trigger(); the Alembic
+migration uses the same statements.
+"""
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+# users counter column for each counted interaction type
+INTERACTION_COUNTER_COLUMNS = {
+    "view": "total_views",
+    "click": "total_clicks",
+    "like": "total_likes",
+    "add_to_cart": "total_cart_adds",
+    "purchase": "total_purchases",
+}
+
+# Every counter column maintained from user_interactions
+COUNTER_COLUMNS = ("total_interactions", *INTERACTION_COUNTER_COLUMNS.values())
+
+
+def _counts_by_user(source: str) -> str:
+    """SELECT of every counter per user_id over the given interaction rows."""
+    aggregates = ",\n".join(
+        ["COUNT(*) AS total_interactions"]
+        + [
+            f"COUNT(*) FILTER (WHERE interaction_type = '{interaction_type}') AS {column}"
+            for interaction_type, column in INTERACTION_COUNTER_COLUMNS.items()
+        ]
+    )
+    return f"SELECT user_id,\n{aggregates}\nFROM {source}\nGROUP BY user_id"
+
+
+# Sets every counter from the existing interactions (migration backfill)
+COUNTER_BACKFILL_SQL = f"""
+UPDATE users u SET {", ".join(f"{column} = c.{column}" for column in COUNTER_COLUMNS)}
+FROM ({_counts_by_user("user_interactions")}) c
+WHERE u.id = c.user_id
+"""
+
+_COUNTER_INCREMENTS = ",\n        ".join(
+    f"{column} = u.{column} + c.{column}" for column in COUNTER_COLUMNS
+)
+
+# Adds the inserted rows to the counters, one UPDATE per user per statement
+COUNTER_FUNCTION_SQL = f"""
+CREATE OR REPLACE FUNCTION bump_user_interaction_counters() RETURNS trigger AS $$
+BEGIN
+    UPDATE users u SET
+        {_COUNTER_INCREMENTS},
+        last_active = now() AT TIME ZONE 'utc'
+    FROM ({_counts_by_user("new_interactions")}) c
+    WHERE u.id = c.user_id;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql
+"""
+
+COUNTER_TRIGGER_SQL = """
+CREATE TRIGGER trg_user_interactions_counters
+AFTER INSERT ON user_interactions
+REFERENCING NEW TABLE AS new_interactions
+FOR EACH STATEMENT EXECUTE FUNCTION bump_user_interaction_counters()
+"""
+
+
+def create_interaction_counter_trigger(conn: Connection) -> None:
+    """
+    Create (or replace) the counter function and its trigger.
+
+    The trigger fires once per INSERT statement and reads the inserted rows
+    from a transition table, so batch inserts update each user row once.
+    """
+    conn.execute(text(COUNTER_FUNCTION_SQL))
+    conn.execute(
+        text("DROP TRIGGER IF EXISTS trg_user_interactions_counters ON user_interactions")
+    )
+    conn.execute(text(COUNTER_TRIGGER_SQL))
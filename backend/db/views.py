@@ -0,0 +1,55 @@
+"""
+Materialized views.
+
+Pre-aggregated per-user counts backing the user stats endpoint. They are
+not ORM models: create them with create_user_stats_views() (or the Alembic
+migration) and refresh them periodically with refresh_user_stats_views().
+"""
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+# Name of each view and the product column it counts interactions by
+USER_STATS_VIEWS = {
+    "user_category_counts": "category_name",
+    "user_brand_counts": "brand_name",
+}
+
+
+def create_user_stats_views(conn: Connection) -> None:
+    """
+    Create the per-user count views and their indexes if missing.
+
+    The unique (user_id, <column>) index is required by REFRESH ... CONCURRENTLY;
+    (user_id, cnt DESC) serves the top-N lookups.
+    """
+    for view, column in USER_STATS_VIEWS.items():
+        conn.execute(
+            text(
+                f"""
+                CREATE MATERIALIZED VIEW IF NOT EXISTS {view} AS
+                SELECT i.user_id, p.{column}, COUNT(*) AS cnt
+                FROM user_interactions i
+                JOIN products p ON p.id = i.product_id
+                WHERE p.{column} IS NOT NULL
+                GROUP BY i.user_id, p.{column}
+                """
+            )
+        )
+        conn.execute(
+            text(
+                f"CREATE UNIQUE INDEX IF NOT EXISTS idx_{view}_user_key "
+                f"ON {view} (user_id, {column})"
+            )
+        )
+        conn.execute(
+            text(
+                f"CREATE INDEX IF NOT EXISTS idx_{view}_user_cnt ON {view} (user_id, cnt DESC)"
+            )
+        )
+
+
+def refresh_user_stats_views(conn: Connection) -> None:
+    """Refresh the per-user count views without blocking readers."""
+    for view in USER_STATS_VIEWS:
+        conn.execute(text(f"REFRESH MATERIALIZED VIEW CONCURRENTLY {view}"))
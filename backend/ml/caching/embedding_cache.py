@@ -4,8 +4,9 @@ Caches product and user embeddings in Redis for fast access.
 """
 
 import logging
+import struct
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Set
+from typing import Any, Dict, List, Optional, Set, Tuple
 
 import numpy as np
 
@@ -15,6 +16,42 @@ from .redis_cache import RedisCache, get_redis_cache
 logger = logging.getLogger(__name__)
 
 
+def quantize_int8(embedding: np.ndarray) -> bytes:
+    """
+    Encode an embedding as symmetric int8 with a per-vector scale.
+
+    Layout: little-endian float32 scale, then one int8 per dimension
+    (388 bytes for D=384 instead of 1536 as float32).
+
+    Args:
+        embedding: Float embedding vector
+
+    Returns:
+        Encoded bytes
+    """
+    embedding = np.asarray(embedding, dtype=np.float32)
+    scale = float(np.abs(embedding).max()) / 127.0 if embedding.size else 0.0
+    if scale == 0.0:
+        scale = 1.0
+    quantized = np.clip(np.rint(embedding / scale), -127, 127).astype(np.int8)
+    return struct.pack("<f", scale) + quantized.tobytes()
+
+
+def dequantize_int8(data: bytes) -> np.ndarray:
+    """
+    Decode an embedding written by quantize_int8.
+
+    Args:
+        data: Encoded bytes
+
+    Returns:
+        Float32 embedding vector
+    """
+    scale = struct.unpack_from("<f", data)[0]
+    quantized = np.frombuffer(data, dtype=np.int8, offset=4)
+    return quantized.astype(np.float32) * np.float32(scale)
+
+
 class EmbeddingCache:
     """
     Caches embeddings in Redis with TTL and hot product tracking.
@@ -43,6 +80,7 @@ class EmbeddingCache:
         self.USER_SESSION_PREFIX = "embedding:user:session:"
         self.HOT_PRODUCTS_KEY = "hot:products"
         self.PRODUCT_VIEW_COUNT_PREFIX = "stats:product_views:"
+        self.EMBEDDING_UPDATE_LOCK_PREFIX = "emb_lock:"
 
         # TTL settings
         self.user_ttl = self.config.storage.redis_ttl_hours * 3600
@@ -168,7 +206,7 @@ class EmbeddingCache:
 
     def set_user_long_term_embedding(self, user_id: str, embedding: np.ndarray) -> bool:
         """
-        Cache user long-term embedding.
+        Cache user long-term embedding (stored as float16, read back as float32).
 
         Args:
             user_id: User ID (UUID string)
@@ -178,7 +216,7 @@ class EmbeddingCache:
             True if successful
         """
         key = f"{self.USER_LONG_TERM_PREFIX}{user_id}"
-        return self.redis.set(key, embedding, ttl=self.user_ttl)
+        return self.redis.set(key, np.asarray(embedding, dtype=np.float16), ttl=self.user_ttl)
 
     def get_user_session_embedding(self, user_id: str) -> Optional[np.ndarray]:
         """
@@ -191,13 +229,31 @@ class EmbeddingCache:
             Session embedding or None if not cached
         """
         key = f"{self.USER_SESSION_PREFIX}{user_id}"
-        return self.redis.get(key)
+        return self.decode_session_embedding(self.redis.get(key))
+
+    @staticmethod
+    def decode_session_embedding(cached) -> Optional[np.ndarray]:
+        """
+        Decode a cached session embedding value.
+
+        Session embeddings are stored int8-quantized; float arrays written
+        before quantization was introduced are returned as-is.
+
+        Args:
+            cached: Value read from the session key (or None)
+
+        Returns:
+            Float32 session embedding or None
+        """
+        if isinstance(cached, bytes):
+            return dequantize_int8(cached)
+        return cached
 
     def set_user_session_embedding(
         self, user_id: str, embedding: np.ndarray, ttl: Optional[int] = None
     ) -> bool:
         """
-        Cache user session embedding.
+        Cache user session embedding (int8-quantized, ~4x smaller).
 
         Args:
             user_id: User ID (UUID string)
@@ -209,22 +265,51 @@ class EmbeddingCache:
         """
         key = f"{self.USER_SESSION_PREFIX}{user_id}"
         session_ttl = ttl or 1800  # 30 minutes default for sessions
-        return self.redis.set(key, embedding, ttl=session_ttl)
+        return self.redis.set(key, quantize_int8(embedding), ttl=session_ttl)
 
-    def get_user_embeddings(self, user_id: str) -> Dict[str, Optional[np.ndarray]]:
+    def user_embedding_keys(self, user_id: str) -> Tuple[str, str]:
+        """
+        Get the long-term and session embedding keys for a user.
+
+        Args:
+            user_id: User ID (UUID string)
+
+        Returns:
+            Tuple of (long_term_key, session_key)
         """
-        Get both long-term and session embeddings for a user.
+        return f"{self.USER_LONG_TERM_PREFIX}{user_id}", f"{self.USER_SESSION_PREFIX}{user_id}"
+
+    def decode_user_embeddings(
+        self, user_id: str, cached: Dict[str, Any]
+    ) -> Dict[str, Optional[np.ndarray]]:
+        """
+        Pick a user's embeddings out of a get_many() result.
 
         Args:
             user_id: User ID (UUID string)
+            cached: Values read with get_many() (must include user_embedding_keys())
 
         Returns:
             Dict with 'long_term' and 'session' embeddings
         """
-        long_term = self.get_user_long_term_embedding(user_id)
-        session = self.get_user_session_embedding(user_id)
+        lt_key, sess_key = self.user_embedding_keys(user_id)
+        return {
+            "long_term": cached.get(lt_key),
+            "session": self.decode_session_embedding(cached.get(sess_key)),
+        }
+
+    def get_user_embeddings(self, user_id: str) -> Dict[str, Optional[np.ndarray]]:
+        """
+        Get both long-term and session embeddings for a user (one MGET).
 
-        return {"long_term": long_term, "session": session}
+        Args:
+            user_id: User ID (UUID string)
+
+        Returns:
+            Dict with 'long_term' and 'session' embeddings
+        """
+        cached = self.redis.get_many(list(self.user_embedding_keys(user_id)))
+        return self.decode_user_embeddings(user_id, cached)
 
     def delete_user_embeddings(self, user_id: str) -> int:
         """
@@ -248,6 +333,40 @@ class EmbeddingCache:
 
         return count
 
+    def claim_user_embedding_update(self, user_id: str, ttl: int = 30) -> bool:
+        """
+        Claim the right to queue a long-term embedding update for a user.
+
+        Uses SET NX EX so at most one update is pending per user; the task
+        releases the claim when it starts, and the TTL bounds how long a lost
+        task can block new updates. Fails open if Redis is unavailable.
+
+        Args:
+            user_id: User ID (as sent to the update task)
+            ttl: Claim lifetime in seconds
+
+        Returns:
+            True if the caller should queue the update
+        """
+        key = f"{self.EMBEDDING_UPDATE_LOCK_PREFIX}{user_id}"
+        try:
+            return bool(self.redis._get_client().set(key, b"1", nx=True, ex=ttl))
+        except Exception as e:
+            logger.warning(f"Error claiming embedding update for user {user_id}: {e}")
+            return True
+
+    def release_user_embedding_update(self, user_id: str) -> bool:
+        """
+        Release a pending embedding update claim for a user.
+
+        Args:
+            user_id: User ID (as sent to the update task)
+
+        Returns:
+            True if a claim was released
+        """
+        return self.redis.delete(f"{self.EMBEDDING_UPDATE_LOCK_PREFIX}{user_id}")
+
     # ========== Hot Products Tracking ==========
 
     def track_product_view(self, product_id: int) -> None:
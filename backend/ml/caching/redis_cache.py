@@ -8,6 +8,8 @@ import pickle
 import threading
 from typing import Any, Dict, List, Optional
 
+import numpy as np
+
 try:
     import redis
     from redis.connection import ConnectionPool
@@ -20,6 +22,51 @@ from ..config import MLConfig, get_ml_config
 
 logger = logging.getLogger(__name__)
 
+# Stored value formats. Embeddings (1-D float arrays) are written as a
+# version byte followed by raw little-endian float32 values (float16 arrays
+# keep half precision, halving the payload, and are widened back to float32
+# on read), and bytes values (already-encoded payloads) as a marker byte
+# plus the bytes; everything else is pickled. Pickle output (protocol 2+)
+# always starts with 0x80, so the formats never collide and older pickled
+# values still decode.
+RAW_BYTES_FORMAT = b"\x00"
+EMBEDDING_FORMAT_V1 = b"\x01"
+EMBEDDING_FORMAT_F16 = b"\x02"
+_EMBEDDING_DTYPE = np.dtype("<f4")
+_EMBEDDING_F16_DTYPE = np.dtype("<f2")
+
+
+def _dumps(value: Any) -> bytes:
+    """Serialize a value for Redis (raw float32 for embeddings, pickle otherwise)."""
+    if isinstance(value, bytes):
+        return RAW_BYTES_FORMAT + value
+    if (
+        isinstance(value, np.ndarray)
+        and value.ndim == 1
+        and np.issubdtype(value.dtype, np.floating)
+    ):
+        if value.dtype == np.float16:
+            return EMBEDDING_FORMAT_F16 + value.astype(_EMBEDDING_F16_DTYPE, copy=False).tobytes()
+        return EMBEDDING_FORMAT_V1 + value.astype(_EMBEDDING_DTYPE, copy=False).tobytes()
+    return pickle.dumps(value)
+
+
+def _loads(data: bytes) -> Any:
+    """
+    Deserialize a value read from Redis.
+
+    Float32 embeddings are decoded zero-copy with np.frombuffer, so the
+    returned array is read-only; copy it before modifying in place.
+    Float16 embeddings come back as a new float32 array.
+    """
+    if data[:1] == EMBEDDING_FORMAT_V1:
+        return np.frombuffer(data, dtype=_EMBEDDING_DTYPE, offset=1)
+    if data[:1] == EMBEDDING_FORMAT_F16:
+        return np.frombuffer(data, dtype=_EMBEDDING_F16_DTYPE, offset=1).astype(np.float32)
+    if data[:1] == RAW_BYTES_FORMAT:
+        return data[1:]
+    return pickle.loads(data)
+
 
 class RedisCacheError(Exception):
     """Exception raised for Redis cache errors."""
@@ -70,7 +117,7 @@ class RedisCache:
             port=self.config.storage.redis_port,
             password=self.config.storage.redis_password,
             db=self.config.storage.redis_db,
-            decode_responses=False,  # We'll handle binary data (pickled embeddings)
+            decode_responses=False,  # We'll handle binary data (embeddings, pickles)
             max_connections=20,
             socket_timeout=5,
             socket_connect_timeout=5,
@@ -122,8 +169,7 @@ class RedisCache:
             if data is None:
                 return None
 
-            # Unpickle the data
-            return pickle.loads(data)
+            return _loads(data)
 
         except redis.RedisError as e:
             logger.error(f"Redis GET error for key '{key}': {e}")
@@ -138,7 +184,7 @@ class RedisCache:
 
         Args:
             key: Cache key
-            value: Value to cache (will be pickled)
+            value: Value to cache (embeddings as raw float32, else pickled)
             ttl: Time-to-live in seconds (None = no expiration)
 
         Returns:
@@ -147,8 +193,7 @@ class RedisCache:
         try:
             client = self._get_client()
 
-            # Pickle the value
-            data = pickle.dumps(value)
+            data = _dumps(value)
 
             if ttl is not None:
                 client.setex(key, ttl, data)
@@ -206,6 +251,85 @@ class RedisCache:
             logger.error(f"Redis DELETE PATTERN error for pattern '{pattern}': {e}")
             return 0
 
+    def set_indexed(
+        self, key: str, value: Any, index_key: str, ttl: Optional[int] = None
+    ) -> bool:
+        """
+        Set value in cache and record its key in a set index.
+
+        The index lets all keys for one owner (e.g. a user) be removed
+        without scanning the keyspace; see unlink_indexed. The index TTL is
+        refreshed to the value's TTL, so it outlives every member written
+        with the same TTL.
+
+        Args:
+            key: Cache key
+            value: Value to cache (embeddings as raw float32, else pickled)
+            index_key: Key of the Redis set tracking related keys
+            ttl: Time-to-live in seconds (None = no expiration)
+
+        Returns:
+            True if successful, False otherwise
+        """
+        try:
+            client = self._get_client()
+            data = _dumps(value)
+
+            pipe = client.pipeline(transaction=False)
+            if ttl is not None:
+                pipe.setex(key, ttl, data)
+            else:
+                pipe.set(key, data)
+            pipe.sadd(index_key, key)
+            if ttl is not None:
+                pipe.expire(index_key, ttl)
+            pipe.execute()
+
+            return True
+
+        except redis.RedisError as e:
+            logger.error(f"Redis SET (indexed) error for key '{key}': {e}")
+            return False
+        except Exception as e:
+            logger.error(f"Error serializing data for key '{key}': {e}")
+            return False
+
+    def unlink_indexed(self, index_keys: List[str], keys: Optional[List[str]] = None) -> int:
+        """
+        Unlink every key listed in the given set indexes, the indexes
+        themselves, and any explicit keys.
+
+        Costs O(indexed keys) rather than a SCAN over the whole keyspace:
+        one pipelined SMEMBERS round trip and one UNLINK.
+
+        Args:
+            index_keys: Keys of set indexes written by set_indexed
+            keys: Additional exact keys to unlink
+
+        Returns:
+            Number of keys removed (including index keys)
+        """
+        try:
+            client = self._get_client()
+
+            pipe = client.pipeline(transaction=False)
+            for index_key in index_keys:
+                pipe.smembers(index_key)
+            members = pipe.execute()
+
+            to_unlink = [key for indexed in members for key in indexed]
+            to_unlink.extend(index_keys)
+            to_unlink.extend(keys or [])
+
+            if not to_unlink:
+                return 0
+
+            return client.unlink(*to_unlink)
+
+        except redis.RedisError as e:
+            logger.error(f"Redis UNLINK error for indexes {index_keys}: {e}")
+            return 0
+
     def exists(self, key: str) -> bool:
         """
         Check if key exists in cache.
@@ -245,7 +369,7 @@ class RedisCache:
             for key, data in zip(keys, values):
                 if data is not None:
                     try:
-                        result[key] = pickle.loads(data)
+                        result[key] = _loads(data)
                     except Exception as e:
                         logger.error(f"Error deserializing cached data for key '{key}': {e}")
 
@@ -272,15 +396,15 @@ class RedisCache:
         try:
             client = self._get_client()
 
-            # Pickle all values
-            pickled_mapping = {}
+            # Serialize all values
+            serialized_mapping = {}
             for key, value in mapping.items():
                 try:
-                    pickled_mapping[key] = pickle.dumps(value)
+                    serialized_mapping[key] = _dumps(value)
                 except Exception as e:
                     logger.error(f"Error serializing data for key '{key}': {e}")
 
-            if not pickled_mapping:
+            if not serialized_mapping:
                 return False
 
             # Use pipeline for atomic operation
@@ -288,11 +412,11 @@ class RedisCache:
 
             if ttl is not None:
                 # Set with expiration
-                for key, data in pickled_mapping.items():
+                for key, data in serialized_mapping.items():
                     pipe.setex(key, ttl, data)
             else:
                 # Set without expiration
-                pipe.mset(pickled_mapping)
+                pipe.mset(serialized_mapping)
 
             pipe.execute()
 
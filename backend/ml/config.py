@@ -154,12 +154,17 @@ class StorageConfig:
 
     # FAISS configuration
     use_faiss: bool = True
-    faiss_index_type: Literal["Flat", "IVF", "HNSW"] = "Flat"  # Start simple for MVP
+    # OPQ_IVFPQ falls back to Flat below faiss_pq_min_train_vectors
+    faiss_index_type: Literal["Flat", "IVF", "HNSW", "OPQ_IVFPQ"] = "OPQ_IVFPQ"
     faiss_index_path: Path = field(default_factory=lambda: Path("models/cache/faiss_index"))
 
     # FAISS build configuration
-    faiss_nprobe: int = 10  # Number of clusters to visit during search (IVF only)
+    faiss_nprobe: int = 16  # Number of clusters to visit during search (IVF/IVFPQ)
+    faiss_ivf_nlist: int = 4096  # Max IVF clusters for OPQ_IVFPQ (capped by training size)
+    faiss_pq_m: int = 32  # PQ sub-quantizers (and OPQ rotation blocks); must divide dim
+    faiss_pq_min_train_vectors: int = 10000  # Enough to train 256-centroid PQ codebooks
     faiss_ef_search: int = 64  # Search depth for HNSW
+    faiss_mmap: bool = True  # Memory-map the index file instead of reading it into RAM
 
     # Rebuild schedule
     rebuild_index_interval_hours: int = 6  # Rebuild FAISS index every 6 hours
@@ -4,6 +4,7 @@ Two-stage search: PostgreSQL filtering → FAISS similarity search
 """
 
 import logging
+import math
 import time
 from typing import Dict, List, Optional, Set
 
@@ -23,6 +24,13 @@ from .similarity_search import SearchResult, SearchResults, SimilaritySearch
 
 logger = logging.getLogger(__name__)
 
+# Post-filter over-fetch: the fraction of full-index hits that pass the
+# filters is tracked as an exponential moving average and sizes the next k
+POSTFILTER_SURVIVAL_ALPHA = 0.1
+POSTFILTER_SURVIVAL_INITIAL = 0.2  # Equivalent to the previous fixed 5x
+POSTFILTER_SURVIVAL_FLOOR = 0.05  # Never search more than 20x k (before headroom)
+POSTFILTER_HEADROOM = 1.2
+
 
 class FilteredSimilaritySearchError(Exception):
     """Exception raised for filtered search errors."""
@@ -70,6 +78,8 @@ class FilteredSimilaritySearch:
         # If filtered products < this %, use subset index strategy
         self.subset_threshold_ratio = 0.1  # 10%
 
+        self.postfilter_survival_rate = POSTFILTER_SURVIVAL_INITIAL
+
         logger.info("Filtered similarity search initialized")
 
     def search_with_filters(
@@ -268,9 +278,13 @@ class FilteredSimilaritySearch:
         """
         logger.debug("Using post-filter strategy")
 
-        # Search with larger k to account for filtering
-        # Heuristic: request 5x more results than needed
-        search_k = min(k * 5, self.index_manager.get_index().ntotal)
+        # Search with larger k to account for filtering, sized from how many
+        # hits recent searches kept
+        survival = max(self.postfilter_survival_rate, POSTFILTER_SURVIVAL_FLOOR)
+        search_k = min(
+            max(k, math.ceil(k / survival * POSTFILTER_HEADROOM)),
+            self.index_manager.get_index().ntotal,
+        )
 
         # Perform search on full index
         results = self.similarity_search.search(
@@ -278,9 +292,14 @@ class FilteredSimilaritySearch:
         )
 
         # Filter results to only allowed product IDs
-        filtered_results = [r for r in results.results if r.product_id in filtered_product_ids][
-            :k
-        ]  # Take top k after filtering
+        filtered_results = [r for r in results.results if r.product_id in filtered_product_ids]
+
+        if results.results:
+            self.postfilter_survival_rate += POSTFILTER_SURVIVAL_ALPHA * (
+                len(filtered_results) / len(results.results) - self.postfilter_survival_rate
+            )
+
+        filtered_results = filtered_results[:k]  # Take top k after filtering
 
         # Re-rank results
         for i, result in enumerate(filtered_results):
@@ -34,6 +34,14 @@ class FAISSIndexBuilderError(Exception):
     pass
 
 
+def _extract_ivf(index: "faiss.Index") -> Optional["faiss.IndexIVF"]:
+    """Return the IVF layer of an index (unwrapping pre-transforms), or None."""
+    try:
+        return faiss.extract_index_ivf(index)
+    except RuntimeError:
+        return None
+
+
 class FAISSIndexBuilder:
     """
     Builds FAISS indices from product embeddings.
@@ -42,6 +50,8 @@ class FAISSIndexBuilder:
     - Flat: Exact nearest neighbor search (brute force, best quality)
     - IVF: Inverted file index (faster, slight quality tradeoff)
     - HNSW: Hierarchical navigable small world (fast approximate search)
+    - OPQ_IVFPQ: OPQ rotation + IVF with product quantization (compressed,
+      fastest for large catalogs)
     """
 
     def __init__(self, config: Optional[MLConfig] = None):
@@ -67,12 +77,15 @@ class FAISSIndexBuilder:
             f"Initialized FAISS index builder: type={self.index_type}, dim={self.dimension}"
         )
 
-    def create_index(self, index_type: Optional[str] = None) -> "faiss.Index":
+    def create_index(
+        self, index_type: Optional[str] = None, num_vectors: Optional[int] = None
+    ) -> "faiss.Index":
         """
         Create a new FAISS index based on configuration.
 
         Args:
-            index_type: Override default index type ('Flat', 'IVF', 'HNSW')
+            index_type: Override default index type ('Flat', 'IVF', 'HNSW', 'OPQ_IVFPQ')
+            num_vectors: Number of training vectors available (sizes OPQ_IVFPQ)
 
         Returns:
             Initialized FAISS index
@@ -85,6 +98,8 @@ class FAISSIndexBuilder:
             return self._create_ivf_index()
         elif index_type == "HNSW":
             return self._create_hnsw_index()
+        elif index_type == "OPQ_IVFPQ":
+            return self._create_opq_ivfpq_index(num_vectors)
         else:
             raise FAISSIndexBuilderError(f"Unsupported index type: {index_type}")
 
@@ -136,6 +151,48 @@ class FAISSIndexBuilder:
 
         return index
 
+    def _create_opq_ivfpq_index(self, num_vectors: Optional[int] = None) -> "faiss.Index":
+        """
+        Create an OPQ-rotated IVF-PQ index via the FAISS index factory.
+        Best for: Large catalogs, where flat search cost grows as O(N * dim)
+
+        OPQ learns a rotation that balances variance across the PQ
+        sub-vectors before quantization, which recovers most of the recall
+        lost to PQ compression.
+
+        Args:
+            num_vectors: Training vectors available. nlist is capped so every
+                cluster gets ~39 training points; too few vectors for the PQ
+                codebooks falls back to a Flat index.
+        """
+        storage = self.config.storage
+        pq_m = storage.faiss_pq_m
+
+        if self.dimension % pq_m != 0:
+            raise FAISSIndexBuilderError(
+                f"faiss_pq_m ({pq_m}) must divide the embedding dimension ({self.dimension})"
+            )
+
+        if num_vectors is not None and num_vectors < storage.faiss_pq_min_train_vectors:
+            logger.warning(
+                f"Only {num_vectors} vectors to train OPQ_IVFPQ "
+                f"(need {storage.faiss_pq_min_train_vectors}), using Flat index"
+            )
+            return self._create_flat_index()
+
+        nlist = storage.faiss_ivf_nlist
+        if num_vectors is not None:
+            nlist = max(1, min(nlist, num_vectors // 39))
+
+        factory = f"OPQ{pq_m},IVF{nlist},PQ{pq_m}"
+        logger.info(f"Creating {factory} index with dimension {self.dimension}")
+        index = faiss.index_factory(self.dimension, factory)
+
+        # Set search parameters
+        faiss.extract_index_ivf(index).nprobe = storage.faiss_nprobe
+
+        return index
+
     def build_index(
         self, embeddings: np.ndarray, product_ids: List[int], train_ratio: float = 1.0
     ) -> Tuple[faiss.Index, Dict[int, int]]:
@@ -173,22 +230,28 @@ class FAISSIndexBuilder:
         # Ensure embeddings are float32 (FAISS requirement)
         embeddings = embeddings.astype(np.float32)
 
+        train_size = int(len(embeddings) * train_ratio)
+
         # Create index
-        index = self.create_index()
+        index = self.create_index(num_vectors=train_size)
 
-        # Train index if needed (IVF and HNSW require training)
-        if isinstance(index, faiss.IndexIVFFlat):
-            logger.info(f"Training IVF index on {int(len(embeddings) * train_ratio)} samples...")
-            train_size = int(len(embeddings) * train_ratio)
+        # Train index if needed (IVF, IVFPQ and the OPQ rotation require training)
+        if not index.is_trained:
+            logger.info(f"Training {type(index).__name__} on {train_size} samples...")
             train_embeddings = embeddings[:train_size]
             index.train(train_embeddings)
-            logger.info("IVF index training complete")
+            logger.info("Index training complete")
 
         # Add all embeddings to index
         logger.info("Adding embeddings to index...")
         index.add(embeddings)
         logger.info(f"Index built successfully: {index.ntotal} vectors indexed")
 
+        # IVF indices need a direct map for reconstruct() (similar-product lookups)
+        ivf = _extract_ivf(index)
+        if ivf is not None:
+            ivf.make_direct_map()
+
         # Create ID mapping (FAISS position -> product_id)
         id_mapping = {i: pid for i, pid in enumerate(product_ids)}
 
@@ -229,7 +292,7 @@ class FAISSIndexBuilder:
         # Save metadata
         metadata_file = save_path / "metadata.npy"
         metadata = {
-            "index_type": self.index_type,
+            "index_type": self.get_index_stats(index)["index_type"],
             "dimension": self.dimension,
             "num_vectors": index.ntotal,
             "created_at": datetime.utcnow().isoformat(),
@@ -265,7 +328,21 @@ class FAISSIndexBuilder:
             raise FAISSIndexBuilderError(f"Index file not found: {index_file}")
 
         logger.info(f"Loading FAISS index from {index_file}")
-        index = faiss.read_index(str(index_file))
+        if self.config.storage.faiss_mmap:
+            # Inverted lists stay in the page cache and are shared between workers
+            try:
+                index = faiss.read_index(str(index_file), faiss.IO_FLAG_MMAP)
+            except RuntimeError as e:
+                logger.warning(f"Memory-mapped load failed, reading index into memory: {e}")
+                index = faiss.read_index(str(index_file))
+        else:
+            index = faiss.read_index(str(index_file))
+
+        # nprobe is a search-time parameter and is not stored in the file
+        ivf = _extract_ivf(index)
+        if ivf is not None:
+            ivf.nprobe = self.config.storage.faiss_nprobe
+            ivf.make_direct_map()
 
         # Load ID mapping
         mapping_file = load_path / "id_mapping.npz"
@@ -307,7 +384,12 @@ class FAISSIndexBuilder:
         }
 
         # Add index-specific stats
-        if isinstance(index, faiss.IndexIVFFlat):
+        if isinstance(index, faiss.IndexPreTransform) and _extract_ivf(index) is not None:
+            ivf = _extract_ivf(index)
+            stats["index_type"] = "OPQ_IVFPQ"
+            stats["nlist"] = ivf.nlist
+            stats["nprobe"] = ivf.nprobe
+        elif isinstance(index, faiss.IndexIVFFlat):
             stats["index_type"] = "IVF"
             stats["nlist"] = index.nlist
             stats["nprobe"] = index.nprobe
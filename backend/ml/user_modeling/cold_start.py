@@ -40,12 +40,29 @@ class ColdStartEmbedding:
         if not product_embeddings:
             raise ValueError("Need at least one product selection")
 
-        # Simple average
-        user_embedding = np.mean(product_embeddings, axis=0)
+        return self.from_matrix(np.stack(product_embeddings).astype(np.float32, copy=False))
 
-        # Normalize
+    def from_matrix(self, embeddings: np.ndarray) -> np.ndarray:
+        """
+        Create user embedding from a stacked (N, D) matrix of selections.
+
+        Args:
+            embeddings: Product embeddings, one row per selection
+
+        Returns:
+            User embedding (float32 mean of rows)
+        """
+        if embeddings.ndim != 2 or embeddings.shape[0] == 0:
+            raise ValueError("Need at least one product selection")
+
+        # Simple average, accumulated in float32
+        user_embedding = embeddings.mean(axis=0, dtype=np.float32)
+
+        # Normalize in place
         if self.config.embedding.normalize_embeddings:
-            user_embedding = user_embedding / np.linalg.norm(user_embedding)
+            norm = np.linalg.norm(user_embedding)
+            if norm > 0:
+                user_embedding /= norm
 
         return user_embedding
 
@@ -95,9 +112,10 @@ class ColdStartEmbedding:
                 f"Only {len(selected_embeddings)} selections, " f"minimum is {min_selections}"
             )
 
-        # Create user embedding
+        # Create user embedding from one contiguous (N, D) float32 block
         try:
-            user_embedding = self.from_product_selections(selected_embeddings)
+            matrix = np.stack(selected_embeddings).astype(np.float32, copy=False)
+            user_embedding = self.from_matrix(matrix)
             result["user_embedding"] = user_embedding
             result["success"] = True
         except Exception as e:
@@ -61,6 +61,11 @@ app.conf.beat_schedule = {
         "schedule": crontab(minute=0, hour="*/6"),
         "kwargs": {"hours_active": 24},
     },
+    # Refresh per-user category/brand counts for user stats (every 15 minutes)
+    "refresh-user-stats-views": {
+        "task": "tasks.refresh_user_stats_views",
+        "schedule": crontab(minute="*/15"),
+    },
     # Clean up old sessions (daily at 4 AM)
     "cleanup-old-sessions": {
         "task": "tasks.cleanup_old_sessions",
@@ -429,6 +429,10 @@ def update_user_embedding(
             except Exception as e:
                 logger.warning(f"Cache unavailable, continuing without cache: {e}")
 
+            # Let feedback arriving from now on queue a fresh update
+            if cache is not None:
+                cache.release_user_embedding_update(user_external_id)
+
             # Get user UUID from external_id
             user = db.execute(
                 select(User).where(User.external_id == user_external_id)
@@ -673,3 +677,37 @@ def cleanup_old_sessions(self, days_old: int = 7) -> Dict[str, Any]:
             "status": "error",
             "error": str(e),
         }
+
+
+@app.task(bind=True, name="tasks.refresh_user_stats_views")
+def refresh_user_stats_views(self) -> Dict[str, Any]:
+    """
+    Refresh the per-user category and brand count views.
+
+    They back the top categories/brands in GET /users/me/stats. The refresh
+    is concurrent, so stats requests keep reading the previous contents.
+
+    Returns:
+        Dictionary with refresh results
+    """
+    try:
+        from ..db.session import SessionLocal
+        from ..db.views import USER_STATS_VIEWS
+        from ..db.views import refresh_user_stats_views as refresh_views
+
+        db = SessionLocal()
+        try:
+            refresh_views(db.connection())
+            db.commit()
+        finally:
+            db.close()
+
+        logger.info("Refreshed user stats views")
+        return {"status": "success", "views": list(USER_STATS_VIEWS)}
+
+    except Exception as e:
+        logger.error(f"Error refreshing user stats views: {e}", exc_info=True)
+        return {
+            "status": "error",
+            "error": str(e),
+        }
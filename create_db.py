@@ -6,6 +6,8 @@ Create database schema using SQLAlchemy models
 import sys
 from sqlalchemy import text
 from backend.db.models import Base
+from backend.db.triggers import create_interaction_counter_trigger
+from backend.db.views import create_user_stats_views
 from backend.db.session import engine
 
 def create_schema():
@@ -24,6 +26,16 @@ def create_schema():
         Base.metadata.create_all(bind=engine)
         print("✓ All tables created successfully")
 
+        # Materialized views backing the user stats endpoint
+        with engine.begin() as conn:
+            create_user_stats_views(conn)
+        print("✓ Materialized views created")
+
+        # Per-type interaction counters on users
+        with engine.begin() as conn:
+            create_interaction_counter_trigger(conn)
+        print("✓ Triggers created")
+
         # Verify tables
         from sqlalchemy import inspect
         inspector = inspect(engine)
@@ -0,0 +1,41 @@
+"""add (user_id, created_at, id) index for keyset pagination
+
+Revision ID: e9f0a1b2c3d4
+Revises: d7e8f9g0h1i2
+Create Date: 2025-11-10 12:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic
+revision = 'e9f0a1b2c3d4'
+down_revision = 'd7e8f9g0h1i2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """
+    Replace the (user_id, created_at) index with (user_id, created_at, id).
+
+    The interaction history endpoint pages with
+    WHERE (created_at, id) < (:ts, :id) ORDER BY created_at DESC, id DESC,
+    which this index serves with a backward index scan. The old index is a
+    prefix of the new one, so it is dropped.
+    """
+    op.create_index(
+        'idx_user_interactions_user_created_id',
+        'user_interactions',
+        ['user_id', 'created_at', 'id']
+    )
+    op.drop_index('idx_user_interactions_user_created', table_name='user_interactions')
+
+
+def downgrade() -> None:
+    """Restore the original (user_id, created_at) index."""
+    op.create_index(
+        'idx_user_interactions_user_created',
+        'user_interactions',
+        ['user_id', 'created_at']
+    )
+    op.drop_index('idx_user_interactions_user_created_id', table_name='user_interactions')
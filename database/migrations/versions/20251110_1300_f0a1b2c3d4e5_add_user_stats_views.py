@@ -0,0 +1,47 @@
+"""add per-user category and brand count materialized views
+
+Revision ID: f0a1b2c3d4e5
+Revises: e9f0a1b2c3d4
+Create Date: 2025-11-10 13:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic
+revision = 'f0a1b2c3d4e5'
+down_revision = 'e9f0a1b2c3d4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """
+    Create user_category_counts and user_brand_counts.
+
+    They back the top categories/brands in GET /users/me/stats and are
+    refreshed periodically by the tasks.refresh_user_stats_views Celery task.
+    """
+    for view, column in (
+        ('user_category_counts', 'category_name'),
+        ('user_brand_counts', 'brand_name'),
+    ):
+        op.execute(f"""
+            CREATE MATERIALIZED VIEW {view} AS
+            SELECT i.user_id, p.{column}, COUNT(*) AS cnt
+            FROM user_interactions i
+            JOIN products p ON p.id = i.product_id
+            WHERE p.{column} IS NOT NULL
+            GROUP BY i.user_id, p.{column}
+        """)
+
+        # Required by REFRESH MATERIALIZED VIEW CONCURRENTLY
+        op.execute(f"CREATE UNIQUE INDEX idx_{view}_user_key ON {view} (user_id, {column})")
+
+        # Top-N per user
+        op.execute(f"CREATE INDEX idx_{view}_user_cnt ON {view} (user_id, cnt DESC)")
+
+
+def downgrade() -> None:
+    """Drop the per-user count views (their indexes go with them)."""
+    op.execute("DROP MATERIALIZED VIEW IF EXISTS user_brand_counts")
+    op.execute("DROP MATERIALIZED VIEW IF EXISTS user_category_counts")
@@ -0,0 +1,42 @@
+"""add covering indexes for the user stats query
+
+Revision ID: a7b8c9d0e1f2
+Revises: f0a1b2c3d4e5
+Create Date: 2025-11-10 14:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic
+revision = 'a7b8c9d0e1f2'
+down_revision = 'f0a1b2c3d4e5'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """
+    Add covering indexes on the user_interactions -> products join path.
+
+    GET /users/me/stats and the user_category_counts/user_brand_counts views
+    only read these columns, so both sides of the join can be served by
+    index-only scans instead of heap fetches.
+    """
+    op.create_index(
+        'idx_user_interactions_user_stats',
+        'user_interactions',
+        ['user_id'],
+        postgresql_include=['product_id', 'interaction_type']
+    )
+    op.create_index(
+        'idx_products_id_stats',
+        'products',
+        ['id'],
+        postgresql_include=['search_price', 'category_name', 'brand_name']
+    )
+
+
+def downgrade() -> None:
+    """Drop the covering indexes."""
+    op.drop_index('idx_products_id_stats', table_name='products')
+    op.drop_index('idx_user_interactions_user_stats', table_name='user_interactions')
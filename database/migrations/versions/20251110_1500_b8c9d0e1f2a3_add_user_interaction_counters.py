@@ -0,0 +1,51 @@
+"""add per-type interaction counters to users
+
+Revision ID: b8c9d0e1f2a3
+Revises: a7b8c9d0e1f2
+Create Date: 2025-11-10 15:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from backend.db.triggers import (
+    COUNTER_BACKFILL_SQL,
+    COUNTER_FUNCTION_SQL,
+    COUNTER_TRIGGER_SQL,
+    INTERACTION_COUNTER_COLUMNS,
+)
+
+# revision identifiers, used by Alembic
+revision = 'b8c9d0e1f2a3'
+down_revision = 'a7b8c9d0e1f2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """
+    Add per-type counters to users, backfill them and keep them current.
+
+    GET /users/me/stats reads these instead of grouping the user's
+    interactions by type. A statement-level AFTER INSERT trigger on
+    user_interactions maintains them together with total_interactions and
+    last_active (see backend/db/triggers.py), so the backfill also resets
+    total_interactions to the actual interaction count.
+    """
+    for column in INTERACTION_COUNTER_COLUMNS.values():
+        op.add_column(
+            'users',
+            sa.Column(column, sa.Integer(), nullable=False, server_default='0')
+        )
+
+    op.execute(COUNTER_BACKFILL_SQL)
+    op.execute(COUNTER_FUNCTION_SQL)
+    op.execute(COUNTER_TRIGGER_SQL)
+
+
+def downgrade() -> None:
+    """Drop the counter trigger, its function and the per-type columns."""
+    op.execute("DROP TRIGGER IF EXISTS trg_user_interactions_counters ON user_interactions")
+    op.execute("DROP FUNCTION IF EXISTS bump_user_interaction_counters()")
+    for column in reversed(list(INTERACTION_COUNTER_COLUMNS.values())):
+        op.drop_column('users', column)
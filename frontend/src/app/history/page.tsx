@@ -34,7 +34,7 @@ export default function HistoryPage() {
 
   const { data: history, isLoading: historyLoading } = useInteractionHistory(
     userId,
-    { offset: 0, limit }
+    { limit, includeTotal: true }
   );
 
   // Filter interactions by type (client-side)
@@ -47,7 +47,7 @@ export default function HistoryPage() {
         total: selectedType
           ? history.interactions.filter((i) => i.interaction_type === selectedType)
               .length
-          : history.total,
+          : history.total ?? history.interactions.length,
       }
     : null;
 
@@ -15,7 +15,9 @@ export default function TestUserEndpointsPage() {
   const userId = user?.id ? Number(user.id) : undefined;
   const { data: favorites, isLoading: favoritesLoading } = useFavorites(userId);
   const { data: stats, isLoading: statsLoading } = useUserStats(userId);
-  const { data: history, isLoading: historyLoading } = useInteractionHistory(userId);
+  const { data: history, isLoading: historyLoading } = useInteractionHistory(userId, {
+    includeTotal: true,
+  });
 
   const updatePreferences = useUpdatePreferences();
   const removeFavorite = useRemoveFavorite();
@@ -43,6 +43,7 @@ export interface OnboardingCompleteResponse {
   user_id: string;
   onboarded: boolean;
   embedding_created: boolean;
+  embedding_status: 'created' | 'scheduled' | 'failed';
   preferences_saved: boolean;
   selected_products_count: number;
   message: string;
@@ -41,14 +41,15 @@ export function useUserStats(userId: number | undefined) {
  */
 export function useInteractionHistory(
   userId: number | undefined,
-  options?: { offset?: number; limit?: number }
+  options?: { cursor?: string; limit?: number; includeTotal?: boolean }
 ) {
   return useQuery({
     queryKey: ["user", "history", "me", options],
     queryFn: async (): Promise<InteractionHistoryResponse> => {
       const params = new URLSearchParams();
-      if (options?.offset) params.append("offset", options.offset.toString());
+      if (options?.cursor) params.append("cursor", options.cursor);
       if (options?.limit) params.append("limit", options.limit.toString());
+      if (options?.includeTotal) params.append("include_total", "true");
 
       const response = await fetch(
         `${API_URL}/api/v1/users/me/history?${params}`,
@@ -299,7 +299,7 @@ export interface UserStatsResponse {
  * Single interaction history item.
  */
 export interface InteractionHistoryItem {
-  interaction_id: number;
+  interaction_id: string; // UUID
   product_id: string;
   product_title: string | null;
   product_image_url: string | null;
@@ -315,9 +315,9 @@ export interface InteractionHistoryItem {
  */
 export interface InteractionHistoryResponse {
   interactions: InteractionHistoryItem[];
-  total: number;
-  offset: number;
+  total: number | null; // Only set when requested with `include_total`
   limit: number;
+  next_cursor: string | null; // Pass as `cursor` to fetch the next page
 }
 
 /**
@@ -51,7 +51,7 @@ def main():
     parser.add_argument(
         '--index-type',
         type=str,
-        choices=['Flat', 'IVF', 'HNSW'],
+        choices=['Flat', 'IVF', 'HNSW', 'OPQ_IVFPQ'],
         help='FAISS index type (default: from config)'
     )
     parser.add_argument(
@@ -144,7 +144,7 @@ def main():
         print(f"Dimension: {stats['dimension']}")
         print(f"Index path: {config.storage.faiss_index_path}")
 
-        if stats['index_type'] == 'IVF':
+        if stats['index_type'] in ('IVF', 'OPQ_IVFPQ'):
             print(f"nlist: {stats['nlist']}")
             print(f"nprobe: {stats['nprobe']}")
         elif stats['index_type'] == 'HNSW':
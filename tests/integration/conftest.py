@@ -2,15 +2,111 @@
 Integration test fixtures
 """
 
+import os
+from uuid import uuid4
+
 import pytest
 
 
 @pytest.fixture(scope="module")
 def test_database():
-    """Setup and teardown test database."""
+    """
+    Setup and teardown test database.
+
+    Creates the ORM schema (and the interaction counter trigger) in the
+    database at DATABASE_URL and drops it afterwards. Tests using it are
+    skipped when no database is configured or reachable.
+    """
+    database_url = os.getenv("DATABASE_URL")
+    if not database_url:
+        pytest.skip("DATABASE_URL not set")
+
+    from sqlalchemy import create_engine, text
+    from sqlalchemy.exc import DBAPIError
+
+    from backend.db.models import Base
+    from backend.db.triggers import create_interaction_counter_trigger
+
+    engine = create_engine(database_url)
+    try:
+        with engine.begin() as conn:
+            conn.execute(text('CREATE EXTENSION IF NOT EXISTS "uuid-ossp"'))
+            conn.execute(text("CREATE EXTENSION IF NOT EXISTS vector"))
+    except DBAPIError as e:
+        engine.dispose()
+        pytest.skip(f"Test database unavailable: {e}")
+
     # Setup database
-    yield
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        create_interaction_counter_trigger(conn)
+
+    yield database_url
+
     # Teardown database
+    Base.metadata.drop_all(engine)
+    engine.dispose()
+
+
+@pytest.fixture
+async def async_db(test_database):
+    """Async session on the test database (asyncpg), as used by the API."""
+    from sqlalchemy.engine import make_url
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    engine = create_async_engine(make_url(test_database).set(drivername="postgresql+asyncpg"))
+    session_factory = async_sessionmaker(engine, autoflush=False, expire_on_commit=False)
+    async with session_factory() as session:
+        yield session
+    await engine.dispose()
+
+
+@pytest.fixture
+async def make_user(async_db):
+    """Factory inserting a user and returning its ID."""
+    from sqlalchemy import insert
+
+    from backend.db.models import User
+
+    async def _make_user():
+        user_id = (
+            await async_db.execute(
+                insert(User)
+                .values(email=f"{uuid4().hex}@test.knytt.local", password_hash="")
+                .returning(User.id)
+            )
+        ).scalar_one()
+        await async_db.commit()
+        return user_id
+
+    return _make_user
+
+
+@pytest.fixture
+async def make_product(async_db):
+    """Factory inserting an active product and returning its ID."""
+    from sqlalchemy import insert
+
+    from backend.db.models import Product
+
+    async def _make_product(name: str = "Test Product"):
+        product_id = (
+            await async_db.execute(
+                insert(Product)
+                .values(
+                    merchant_product_id=uuid4().hex,
+                    merchant_id=1,
+                    product_name=name,
+                    search_price=10,
+                    merchant_image_url="https://example.com/image.jpg",
+                )
+                .returning(Product.id)
+            )
+        ).scalar_one()
+        await async_db.commit()
+        return product_id
+
+    return _make_product
 
 
 @pytest.fixture(scope="module")
@@ -0,0 +1,169 @@
+"""
+Integration tests for POST /api/v1/feedback/batch.
+"""
+
+from unittest.mock import MagicMock
+from uuid import UUID, uuid4
+
+import pytest
+from fastapi import BackgroundTasks
+from sqlalchemy import select
+
+from backend.api.errors import APIError
+from backend.api.models.feedback import BatchFeedbackRequest, FeedbackRequest
+from backend.api.routers.feedback import record_feedback_batch
+from backend.db.models import User, UserFavorite, UserInteraction
+
+pytestmark = [pytest.mark.integration, pytest.mark.database, pytest.mark.api]
+
+
+@pytest.fixture
+def cache():
+    """Embedding cache stand-in with an empty user ID cache."""
+    cache = MagicMock()
+    cache.redis.get_many.return_value = {}
+    return cache
+
+
+def _item(user_id, product_id, interaction_type="view", **kwargs) -> FeedbackRequest:
+    return FeedbackRequest(
+        user_id=str(user_id),
+        product_id=str(product_id),
+        interaction_type=interaction_type,
+        update_embeddings=False,
+        update_session=False,
+        **kwargs,
+    )
+
+
+async def _record(items, db, cache):
+    return await record_feedback_batch(
+        request=BatchFeedbackRequest(items=items),
+        background_tasks=BackgroundTasks(),
+        db=db,
+        cache=cache,
+        settings=MagicMock(enable_cache=False),
+        request_id="test",
+    )
+
+
+async def _interactions(db, interaction_ids):
+    rows = (
+        await db.execute(
+            select(UserInteraction).where(
+                UserInteraction.id.in_([UUID(i) for i in interaction_ids])
+            )
+        )
+    ).scalars()
+    return {str(row.id): row for row in rows}
+
+
+async def test_batch_records_mixed_users_and_products(async_db, cache, make_user, make_product):
+    """Known and external users, several products, one transaction."""
+    user_id = await make_user()
+    external_id = f"ext-{uuid4().hex}"
+    first_product = await make_product()
+    second_product = await make_product()
+
+    response = await _record(
+        [
+            _item(user_id, first_product, "view"),
+            _item(external_id, second_product, "like"),
+            _item(user_id, second_product, "click"),
+        ],
+        async_db,
+        cache,
+    )
+
+    assert response.success is True
+    assert response.recorded == 3
+    assert len(set(response.interaction_ids)) == 3
+
+    # The external user was created and used for its item
+    external_user = (
+        await async_db.execute(select(User).where(User.external_id == external_id))
+    ).scalar_one()
+    rows = await _interactions(async_db, response.interaction_ids)
+    assert [
+        (rows[i].user_id, rows[i].product_id, rows[i].interaction_type)
+        for i in response.interaction_ids
+    ] == [
+        (user_id, first_product, "view"),
+        (external_user.id, second_product, "like"),
+        (user_id, second_product, "click"),
+    ]
+
+    # The like was also added to favorites
+    favorite = (
+        await async_db.execute(
+            select(UserFavorite).where(
+                UserFavorite.user_id == external_user.id,
+                UserFavorite.product_id == second_product,
+            )
+        )
+    ).scalar_one_or_none()
+    assert favorite is not None
+
+    # Counters were bumped once per user by the trigger
+    user = (await async_db.execute(select(User).where(User.id == user_id))).scalar_one()
+    assert user.total_interactions == 2
+    assert user.total_views == 1
+    assert user.total_clicks == 1
+
+    # Resolved user IDs were cached after commit
+    cache.redis.set_many.assert_called()
+
+
+async def test_batch_interaction_ids_follow_request_order(
+    async_db, cache, make_user, make_product
+):
+    """interaction_ids[i] is the row recorded for items[i]."""
+    users = [await make_user() for _ in range(3)]
+    products = [await make_product() for _ in range(4)]
+    items = [
+        _item(users[i % len(users)], products[(i * 3) % len(products)], position=i)
+        for i in range(25)
+    ]
+
+    response = await _record(items, async_db, cache)
+
+    rows = await _interactions(async_db, response.interaction_ids)
+    assert [rows[i].position for i in response.interaction_ids] == list(range(25))
+    assert [rows[i].user_id for i in response.interaction_ids] == [
+        users[i % len(users)] for i in range(25)
+    ]
+
+
+async def test_batch_unknown_product_rejects_whole_batch(
+    async_db, cache, make_user, make_product
+):
+    """One unknown product fails the batch with 404 and records nothing."""
+    user_id = await make_user()
+    product_id = await make_product()
+    unknown_product = uuid4()
+
+    with pytest.raises(APIError) as exc_info:
+        await _record(
+            [_item(user_id, product_id), _item(user_id, unknown_product)], async_db, cache
+        )
+
+    assert exc_info.value.status_code == 404
+    assert exc_info.value.details == {"product_ids": [str(unknown_product)]}
+
+    recorded = (
+        await async_db.execute(
+            select(UserInteraction.id).where(UserInteraction.user_id == user_id)
+        )
+    ).all()
+    assert recorded == []
+
+
+async def test_batch_invalid_product_id_format(async_db, cache, make_user):
+    """A product ID that is not a UUID fails the batch with 400."""
+    user_id = await make_user()
+
+    with pytest.raises(APIError) as exc_info:
+        await _record([_item(user_id, "not-a-uuid")], async_db, cache)
+
+    assert exc_info.value.status_code == 400
+    assert exc_info.value.details == {"product_ids": ["not-a-uuid"]}
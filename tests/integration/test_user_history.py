@@ -0,0 +1,141 @@
+"""
+Integration tests for GET /api/v1/users/me/history keyset pagination.
+"""
+
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import orjson
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import insert
+
+from backend.api.routers.users import get_interaction_history
+from backend.db.models import UserInteraction
+
+pytestmark = [pytest.mark.integration, pytest.mark.database, pytest.mark.api]
+
+
+async def _page(db, user_id, limit, cursor=None, include_total=False, interaction_type=None):
+    response = await get_interaction_history(
+        current_user=SimpleNamespace(id=user_id),
+        db=db,
+        interaction_type=interaction_type,
+        limit=limit,
+        cursor=cursor,
+        include_total=include_total,
+        if_none_match=None,
+    )
+    assert response.status_code == 200
+    return orjson.loads(response.body)
+
+
+async def _all_pages(db, user_id, limit, **kwargs):
+    pages = [await _page(db, user_id, limit, **kwargs)]
+    while pages[-1]["next_cursor"] is not None:
+        pages.append(await _page(db, user_id, limit, cursor=pages[-1]["next_cursor"], **kwargs))
+    return pages
+
+
+async def _add_interactions(db, user_id, product_id, created_ats, interaction_type="view"):
+    ids = (
+        await db.execute(
+            insert(UserInteraction)
+            .values(
+                [
+                    {
+                        "user_id": user_id,
+                        "product_id": product_id,
+                        "interaction_type": interaction_type,
+                        "created_at": created_at,
+                    }
+                    for created_at in created_ats
+                ]
+            )
+            .returning(UserInteraction.id)
+        )
+    ).scalars().all()
+    await db.commit()
+    return [str(i) for i in ids]
+
+
+async def test_history_pages_newest_first(async_db, make_user, make_product):
+    """Pages walk the history newest first and the last page has no cursor."""
+    user_id = await make_user()
+    product_id = await make_product()
+    start = datetime(2025, 11, 1, tzinfo=timezone.utc)
+    ids = await _add_interactions(
+        async_db, user_id, product_id, [start + timedelta(minutes=i) for i in range(5)]
+    )
+
+    pages = await _all_pages(async_db, user_id, limit=2)
+
+    assert [len(page["interactions"]) for page in pages] == [2, 2, 1]
+    assert [i["interaction_id"] for page in pages for i in page["interactions"]] == ids[::-1]
+    assert pages[-1]["next_cursor"] is None
+
+
+async def test_history_ties_on_created_at(async_db, make_user, make_product):
+    """Rows sharing a created_at are neither skipped nor repeated across pages."""
+    user_id = await make_user()
+    product_id = await make_product()
+    same_time = datetime(2025, 11, 1, 12, 0, tzinfo=timezone.utc)
+    ids = await _add_interactions(async_db, user_id, product_id, [same_time] * 7)
+
+    for limit in (1, 2, 3):
+        pages = await _all_pages(async_db, user_id, limit=limit)
+        seen = [i["interaction_id"] for page in pages for i in page["interactions"]]
+
+        assert len(seen) == len(set(seen)) == 7
+        assert set(seen) == set(ids)
+        # Ties are broken by id, descending
+        assert seen == sorted(seen, reverse=True)
+
+
+async def test_history_full_last_page_has_no_cursor(async_db, make_user, make_product):
+    """A last page that exactly fills the limit does not point at an empty page."""
+    user_id = await make_user()
+    product_id = await make_product()
+    start = datetime(2025, 11, 1, tzinfo=timezone.utc)
+    await _add_interactions(
+        async_db, user_id, product_id, [start + timedelta(minutes=i) for i in range(4)]
+    )
+
+    first = await _page(async_db, user_id, limit=2)
+    second = await _page(async_db, user_id, limit=2, cursor=first["next_cursor"])
+
+    assert first["next_cursor"] is not None
+    assert len(second["interactions"]) == 2
+    assert second["next_cursor"] is None
+
+
+async def test_history_total_only_on_request(async_db, make_user, make_product):
+    """total is null unless include_total is set, and ignores the cursor."""
+    user_id = await make_user()
+    product_id = await make_product()
+    start = datetime(2025, 11, 1, tzinfo=timezone.utc)
+    await _add_interactions(
+        async_db, user_id, product_id, [start + timedelta(minutes=i) for i in range(3)]
+    )
+    await _add_interactions(async_db, user_id, product_id, [start], interaction_type="like")
+
+    first = await _page(async_db, user_id, limit=2)
+    counted = await _page(
+        async_db, user_id, limit=2, cursor=first["next_cursor"], include_total=True
+    )
+    views = await _page(async_db, user_id, limit=10, include_total=True, interaction_type="view")
+
+    assert first["total"] is None
+    assert counted["total"] == 4
+    assert views["total"] == 3
+    assert {i["interaction_type"] for i in views["interactions"]} == {"view"}
+
+
+async def test_history_malformed_cursor(async_db, make_user):
+    """A cursor that does not decode is a 400, not a 500."""
+    user_id = await make_user()
+
+    with pytest.raises(HTTPException) as exc_info:
+        await _page(async_db, user_id, limit=2, cursor="not-a-cursor")
+
+    assert exc_info.value.status_code == 400
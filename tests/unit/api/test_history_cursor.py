@@ -0,0 +1,63 @@
+"""
+Unit tests for the interaction history cursor.
+"""
+
+import base64
+from datetime import datetime, timezone
+from uuid import uuid4
+
+import pytest
+from fastapi import HTTPException
+
+from backend.api.routers.users import _decode_history_cursor, _encode_history_cursor
+
+pytestmark = [pytest.mark.unit, pytest.mark.api]
+
+
+@pytest.mark.parametrize(
+    "created_at",
+    [
+        datetime(2025, 11, 10, 15, 0, 0, 123456, tzinfo=timezone.utc),
+        datetime(2025, 11, 10, 15, 0, 0),
+    ],
+)
+def test_cursor_round_trip(created_at):
+    """Decoding an encoded cursor gives back the same position."""
+    interaction_id = uuid4()
+
+    cursor = _encode_history_cursor(created_at, interaction_id)
+
+    assert _decode_history_cursor(cursor) == (created_at, interaction_id)
+
+
+def test_cursor_is_url_safe():
+    """Cursors can be passed in a query string as-is."""
+    cursor = _encode_history_cursor(datetime.now(timezone.utc), uuid4())
+
+    assert set(cursor) <= set(
+        "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-_="
+    )
+
+
+def _b64(raw: str) -> str:
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        "not a cursor",
+        "abc",
+        base64.urlsafe_b64encode(b"\xff\xfe\xfd").decode(),
+        _b64("no-separator"),
+        _b64(f"not-a-date|{uuid4()}"),
+        _b64("2025-11-10T15:00:00+00:00|not-a-uuid"),
+    ],
+)
+def test_malformed_cursor_is_rejected(cursor):
+    """Anything that is not an encoded (created_at, id) pair is a 400."""
+    with pytest.raises(HTTPException) as exc_info:
+        _decode_history_cursor(cursor)
+
+    assert exc_info.value.status_code == 400
+    assert exc_info.value.detail == "Invalid cursor"
@@ -0,0 +1,158 @@
+"""
+Unit tests for the verified token cache in backend/api/security.py.
+"""
+
+from types import SimpleNamespace
+
+import pytest
+
+from backend.api import security
+
+pytestmark = [pytest.mark.unit, pytest.mark.api]
+
+NOW = 1_700_000_000.0
+
+
+@pytest.fixture(autouse=True)
+def clean_token_cache():
+    """Start and end every test with an empty token cache."""
+    security.clear_token_cache()
+    yield
+    security.clear_token_cache()
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Controllable replacement for time.time() as seen by security.py."""
+    clock = SimpleNamespace(now=NOW)
+    monkeypatch.setattr(security, "time", SimpleNamespace(time=lambda: clock.now))
+    return clock
+
+
+@pytest.fixture
+def decoder(monkeypatch):
+    """
+    Stand-in for _decode_token.
+
+    Returns decoder.payloads[token] (None means the signature check failed)
+    and records every token it was asked to decode.
+    """
+    decoder = SimpleNamespace(payloads={}, calls=[])
+
+    def _decode(token):
+        decoder.calls.append(token)
+        return decoder.payloads.get(token)
+
+    monkeypatch.setattr(security, "_decode_token", _decode)
+    return decoder
+
+
+def test_valid_token_is_decoded_once(clock, decoder):
+    """Repeated verification of a valid token hits the cache."""
+    decoder.payloads["token"] = {"sub": "user", "exp": NOW + 600}
+
+    assert security.verify_token("token") == {"sub": "user", "exp": NOW + 600}
+    clock.now += 30
+    assert security.verify_token("token") == {"sub": "user", "exp": NOW + 600}
+
+    assert decoder.calls == ["token"]
+
+
+def test_cached_token_rejected_after_exp(clock, decoder):
+    """A cached payload is not returned once its exp has passed, even within the TTL."""
+    decoder.payloads["token"] = {"sub": "user", "exp": NOW + 10}
+    assert security.verify_token("token") is not None
+
+    # Still inside TOKEN_CACHE_TTL_SECONDS, but past the token's own expiry
+    clock.now += 11
+    assert clock.now - NOW < security.TOKEN_CACHE_TTL_SECONDS
+    del decoder.payloads["token"]  # jwt.decode rejects expired tokens
+
+    assert security.verify_token("token") is None
+    assert decoder.calls == ["token", "token"]
+
+
+def test_cached_token_rejected_at_exp(clock, decoder):
+    """exp is exclusive: a token is expired at exactly its exp time."""
+    decoder.payloads["token"] = {"sub": "user", "exp": NOW + 10}
+    security.verify_token("token")
+
+    clock.now = NOW + 10
+    del decoder.payloads["token"]
+
+    assert security.verify_token("token") is None
+
+
+def test_cached_entry_refreshed_after_ttl(clock, decoder):
+    """After the TTL the token is verified again."""
+    decoder.payloads["token"] = {"sub": "user", "exp": NOW + 3600}
+    security.verify_token("token")
+
+    clock.now += security.TOKEN_CACHE_TTL_SECONDS
+
+    assert security.verify_token("token") is not None
+    assert decoder.calls == ["token", "token"]
+
+
+def test_cached_invalid_token_stays_invalid(clock, decoder):
+    """A failed verification is cached as a failure, not retried within the TTL."""
+    assert security.verify_token("token") is None
+
+    # Even if the same string would now decode, the cached failure wins
+    decoder.payloads["token"] = {"sub": "user", "exp": NOW + 3600}
+    clock.now += security.TOKEN_CACHE_TTL_SECONDS - 1
+
+    assert security.verify_token("token") is None
+    assert decoder.calls == ["token"]
+
+
+def test_cached_invalid_token_expires_with_ttl(clock, decoder):
+    """Cached failures are dropped after the TTL like any other entry."""
+    assert security.verify_token("token") is None
+
+    decoder.payloads["token"] = {"sub": "user", "exp": NOW + 3600}
+    clock.now += security.TOKEN_CACHE_TTL_SECONDS
+
+    assert security.verify_token("token") is not None
+    assert decoder.calls == ["token", "token"]
+
+
+def test_eviction_at_capacity(clock, decoder, monkeypatch):
+    """Past TOKEN_CACHE_MAX_SIZE the oldest entry is evicted."""
+    monkeypatch.setattr(security, "TOKEN_CACHE_MAX_SIZE", 2)
+    for token in ("a", "b", "c"):
+        decoder.payloads[token] = {"sub": token, "exp": NOW + 3600}
+        security.verify_token(token)
+
+    assert list(security._token_cache) == ["b", "c"]
+
+    # "a" has to be verified again; "c" is still cached
+    security.verify_token("a")
+    security.verify_token("c")
+    assert decoder.calls == ["a", "b", "c", "a"]
+    assert len(security._token_cache) == 2
+
+
+def test_eviction_is_least_recently_used(clock, decoder, monkeypatch):
+    """A cache hit moves the token to the back of the eviction order."""
+    monkeypatch.setattr(security, "TOKEN_CACHE_MAX_SIZE", 2)
+    for token in ("a", "b", "c"):
+        decoder.payloads[token] = {"sub": token, "exp": NOW + 3600}
+
+    security.verify_token("a")
+    security.verify_token("b")
+    security.verify_token("a")  # hit: "b" is now the oldest
+    security.verify_token("c")
+
+    assert list(security._token_cache) == ["a", "c"]
+
+
+def test_invalid_tokens_count_towards_capacity(clock, decoder, monkeypatch):
+    """Cached failures are evicted like valid entries, so garbage tokens can't grow the cache."""
+    monkeypatch.setattr(security, "TOKEN_CACHE_MAX_SIZE", 2)
+
+    for i in range(10):
+        assert security.verify_token(f"garbage-{i}") is None
+
+    assert list(security._token_cache) == ["garbage-8", "garbage-9"]
+
@@ -0,0 +1,85 @@
+"""
+Unit tests for int8 session embedding quantization.
+"""
+
+import struct
+
+import numpy as np
+import pytest
+
+from backend.ml.caching.embedding_cache import EmbeddingCache, dequantize_int8, quantize_int8
+
+pytestmark = pytest.mark.unit
+
+DIM = 384
+
+
+@pytest.fixture
+def embedding():
+    """Random unit-norm float32 embedding."""
+    vector = np.random.default_rng(0).standard_normal(DIM).astype(np.float32)
+    return vector / np.linalg.norm(vector)
+
+
+def test_quantize_layout(embedding):
+    """A float32 scale followed by one int8 per dimension."""
+    data = quantize_int8(embedding)
+
+    assert len(data) == 4 + DIM
+    (scale,) = struct.unpack_from("<f", data)
+    assert scale == pytest.approx(np.abs(embedding).max() / 127.0)
+
+
+def test_round_trip_shape_and_dtype(embedding):
+    """Dequantizing gives back a float32 vector of the same length."""
+    restored = dequantize_int8(quantize_int8(embedding))
+
+    assert restored.dtype == np.float32
+    assert restored.shape == embedding.shape
+
+
+def test_round_trip_error_bound(embedding):
+    """Each component is off by at most half a quantization step."""
+    restored = dequantize_int8(quantize_int8(embedding))
+    step = np.abs(embedding).max() / 127.0
+
+    assert np.abs(restored - embedding).max() <= step / 2 * (1 + 1e-5)
+    cosine = restored @ embedding / (np.linalg.norm(restored) * np.linalg.norm(embedding))
+    assert cosine > 0.999
+
+
+def test_largest_component_is_exact(embedding):
+    """The component that sets the scale maps to +/-127 and survives exactly."""
+    restored = dequantize_int8(quantize_int8(embedding))
+    i = int(np.abs(embedding).argmax())
+
+    assert restored[i] == pytest.approx(embedding[i], rel=1e-6)
+
+
+def test_zero_vector():
+    """A zero vector round-trips to zeros instead of dividing by zero."""
+    restored = dequantize_int8(quantize_int8(np.zeros(DIM, dtype=np.float32)))
+
+    assert restored.shape == (DIM,)
+    assert not restored.any()
+
+
+def test_accepts_float64_and_lists():
+    """Inputs are converted to float32 before quantizing."""
+    values = [0.5, -1.0, 0.25, 0.0]
+
+    from_list = dequantize_int8(quantize_int8(values))
+    from_float64 = dequantize_int8(quantize_int8(np.array(values, dtype=np.float64)))
+
+    np.testing.assert_array_equal(from_list, from_float64)
+    np.testing.assert_allclose(from_list, values, atol=1.0 / 127 / 2)
+
+
+def test_decode_session_embedding(embedding):
+    """Quantized bytes are dequantized; older float arrays pass through."""
+    np.testing.assert_array_equal(
+        EmbeddingCache.decode_session_embedding(quantize_int8(embedding)),
+        dequantize_int8(quantize_int8(embedding)),
+    )
+    assert EmbeddingCache.decode_session_embedding(embedding) is embedding
+    assert EmbeddingCache.decode_session_embedding(None) is None
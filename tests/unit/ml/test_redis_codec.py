@@ -0,0 +1,156 @@
+"""
+Unit tests for the Redis value codec.
+"""
+
+import pickle
+
+import numpy as np
+import pytest
+
+from backend.ml.caching.redis_cache import (
+    EMBEDDING_FORMAT_F16,
+    EMBEDDING_FORMAT_V1,
+    RAW_BYTES_FORMAT,
+    _dumps,
+    _loads,
+)
+
+pytestmark = pytest.mark.unit
+
+DIM = 384
+
+
+@pytest.fixture
+def embedding():
+    """Random unit-norm float32 embedding."""
+    vector = np.random.default_rng(0).standard_normal(DIM).astype(np.float32)
+    return vector / np.linalg.norm(vector)
+
+
+def test_float32_round_trip_is_exact(embedding):
+    """Float32 embeddings are stored raw and decoded unchanged."""
+    data = _dumps(embedding)
+
+    assert data[:1] == EMBEDDING_FORMAT_V1
+    assert len(data) == 1 + 4 * DIM
+    restored = _loads(data)
+    assert restored.dtype == np.float32
+    np.testing.assert_array_equal(restored, embedding)
+
+
+def test_float32_decode_is_read_only(embedding):
+    """Decoded float32 embeddings are zero-copy views of the payload."""
+    restored = _loads(_dumps(embedding))
+
+    assert not restored.flags.writeable
+
+
+def test_float64_stored_as_float32(embedding):
+    """Other float dtypes are narrowed to float32."""
+    data = _dumps(embedding.astype(np.float64))
+
+    assert data[:1] == EMBEDDING_FORMAT_V1
+    np.testing.assert_array_equal(_loads(data), embedding)
+
+
+def test_float16_round_trip(embedding):
+    """Float16 embeddings keep half precision and come back as float32."""
+    half = embedding.astype(np.float16)
+    data = _dumps(half)
+
+    assert data[:1] == EMBEDDING_FORMAT_F16
+    assert len(data) == 1 + 2 * DIM
+    restored = _loads(data)
+    assert restored.dtype == np.float32
+    assert restored.shape == (DIM,)
+    np.testing.assert_array_equal(restored, half.astype(np.float32))
+
+
+def test_float16_decode_is_writable(embedding):
+    """Widening to float32 makes a new array that can be modified."""
+    restored = _loads(_dumps(embedding.astype(np.float16)))
+
+    assert restored.flags.writeable
+
+
+def test_float16_error_bound(embedding):
+    """Half precision is within float16 rounding of the float32 original."""
+    restored = _loads(_dumps(embedding.astype(np.float16)))
+
+    # float16 has an 11-bit significand: relative rounding error <= 2**-11,
+    # plus half the smallest subnormal step for values near zero
+    bound = np.abs(embedding) * 2.0**-11 + 2.0**-25
+    assert np.all(np.abs(restored - embedding) <= bound)
+    cosine = restored @ embedding / (np.linalg.norm(restored) * np.linalg.norm(embedding))
+    assert cosine > 0.99999
+
+
+@pytest.mark.parametrize("dtype", [np.float16, np.float32])
+def test_zero_vector(dtype):
+    """Zero vectors round-trip as zeros in either precision."""
+    restored = _loads(_dumps(np.zeros(DIM, dtype=dtype)))
+
+    assert restored.dtype == np.float32
+    assert restored.shape == (DIM,)
+    assert not restored.any()
+
+
+@pytest.mark.parametrize("dtype", [np.float16, np.float32])
+def test_empty_vector(dtype):
+    """An empty embedding still decodes to an empty float32 array."""
+    restored = _loads(_dumps(np.zeros(0, dtype=dtype)))
+
+    assert restored.dtype == np.float32
+    assert restored.shape == (0,)
+
+
+@pytest.mark.parametrize("value", [b"", b"\x00\x01\x02", b"\x80pickle-looking"])
+def test_bytes_round_trip(value):
+    """Bytes values are stored behind a marker byte and returned as-is."""
+    data = _dumps(value)
+
+    assert data[:1] == RAW_BYTES_FORMAT
+    assert _loads(data) == value
+
+
+@pytest.mark.parametrize(
+    "value",
+    [
+        {"user_id": "abc", "score": 0.5},
+        [1, 2, 3],
+        "text",
+        42,
+        None,
+        (1.0, b"bytes"),
+    ],
+)
+def test_other_values_are_pickled(value):
+    """Anything that is not bytes or a 1-D float array falls back to pickle."""
+    data = _dumps(value)
+
+    assert data[:1] not in (RAW_BYTES_FORMAT, EMBEDDING_FORMAT_V1, EMBEDDING_FORMAT_F16)
+    assert _loads(data) == value
+
+
+@pytest.mark.parametrize(
+    "value",
+    [
+        np.ones((2, 3), dtype=np.float32),
+        np.arange(5, dtype=np.int64),
+        np.float32(1.5),
+    ],
+)
+def test_non_embedding_arrays_are_pickled(value):
+    """Multi-dimensional, integer and scalar arrays keep their shape and dtype via pickle."""
+    restored = _loads(_dumps(value))
+
+    assert restored.dtype == value.dtype
+    np.testing.assert_array_equal(restored, value)
+
+
+@pytest.mark.parametrize("protocol", range(pickle.HIGHEST_PROTOCOL + 1))
+def test_unknown_format_falls_back_to_pickle(protocol):
+    """Values without a known format byte (e.g. written before the codec) are unpickled."""
+    value = {"legacy": [1, 2, 3]}
+
+    assert _loads(pickle.dumps(value, protocol=protocol)) == value